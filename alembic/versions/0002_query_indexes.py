@@ -0,0 +1,49 @@
+"""Composite and partial indexes for hot query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# On Postgres the indexes are built CONCURRENTLY so writes to the large
+# tables are not blocked, which cannot happen inside a transaction.
+def _create_index(name: str, table: str, columns: list, **kwargs) -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            name, table, columns,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            **kwargs
+        )
+
+def upgrade() -> None:
+    _create_index("ix_orders_user_id_updated_at", "orders", ["user_id", sa.text("updated_at DESC")])
+    _create_index("ix_orders_status_created_at", "orders", ["status", "created_at"])
+    _create_index("ix_orders_created_at", "orders", ["created_at"])
+    _create_index("ix_order_items_order_id", "order_items", ["order_id"])
+    _create_index("ix_order_items_product_id", "order_items", ["product_id"])
+    _create_index("ix_payments_status", "payments", ["status"])
+    _create_index(
+        "ix_products_low_stock", "products", ["stock"],
+        postgresql_where=sa.text("stock < 10"),
+        sqlite_where=sa.text("stock < 10")
+    )
+
+def downgrade() -> None:
+    for name, table in (
+        ("ix_products_low_stock", "products"),
+        ("ix_payments_status", "payments"),
+        ("ix_order_items_product_id", "order_items"),
+        ("ix_order_items_order_id", "order_items"),
+        ("ix_orders_created_at", "orders"),
+        ("ix_orders_status_created_at", "orders"),
+        ("ix_orders_user_id_updated_at", "orders"),
+    ):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,130 @@
+"""Partition orders by created_at month
+
+PostgreSQL only; other databases keep the plain table. The table is
+rebuilt as a partitioned one and its rows copied over, so run this in a
+maintenance window. Unique keys of a partitioned table must include the
+partition key, so the primary key becomes (id, created_at) and the
+order_number index (order_number, created_at). That index no longer keeps
+order numbers unique, so they are also written to an order_numbers table
+keyed by order number, on every database, in the same transaction as the
+order; retried order intake relies on that uniqueness. The table is
+filled from the existing orders and keeps the numbers of archived ones.
+Foreign keys from order_items and payments to orders are dropped, since
+they could only reference such a key and would stop old partitions from
+being detached.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitions import add_months, create_partition, ensure_partitions
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Secondary indexes of orders, recreated on the partitioned table
+INDEXES = (
+    "CREATE INDEX ix_orders_reservation_id ON orders (reservation_id)",
+    "CREATE INDEX ix_orders_status_created_at ON orders (status, created_at)",
+    "CREATE INDEX ix_orders_created_at ON orders (created_at)",
+    "CREATE INDEX ix_orders_user_id_updated_at ON orders (user_id, updated_at DESC)",
+)
+INDEX_NAMES = (
+    "ix_orders_id",
+    "ix_orders_order_number",
+    "ix_orders_reservation_id",
+    "ix_orders_status_created_at",
+    "ix_orders_created_at",
+    "ix_orders_user_id_updated_at",
+)
+
+def _drop_indexes() -> None:
+    # Index names are unique per schema, so the old table's go first
+    for name in INDEX_NAMES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+def upgrade() -> None:
+    op.create_table(
+        "order_numbers",
+        sa.Column("order_number", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("order_number"),
+    )
+    op.execute(
+        "INSERT INTO order_numbers (order_number) "
+        "SELECT order_number FROM orders WHERE order_number IS NOT NULL"
+    )
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE order_items DROP CONSTRAINT IF EXISTS order_items_order_id_fkey")
+    op.execute("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_order_id_fkey")
+    op.execute("UPDATE orders SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL")
+    op.execute("ALTER TABLE orders RENAME TO orders_unpartitioned")
+    op.execute("ALTER TABLE orders_unpartitioned RENAME CONSTRAINT orders_pkey TO orders_unpartitioned_pkey")
+    # Keep the id sequence when the old table is dropped
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    _drop_indexes()
+
+    op.execute(
+        "CREATE TABLE orders (LIKE orders_unpartitioned INCLUDING DEFAULTS, PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER TABLE orders ADD CONSTRAINT orders_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    # The primary key serves lookups by id, so ix_orders_id is not recreated
+    op.execute("CREATE UNIQUE INDEX ix_orders_order_number ON orders (order_number, created_at)")
+    for statement in INDEXES:
+        op.execute(statement)
+
+    first = bind.execute(sa.text(
+        "SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC')::date FROM orders_unpartitioned"
+    )).scalar()
+    current = datetime.utcnow().date().replace(day=1)
+    month = first or current
+    while month < current:
+        create_partition(bind, month)
+        month = add_months(month, 1)
+    ensure_partitions(bind, settings.ORDER_PARTITIONS_PREMAKE_MONTHS)
+
+    op.execute("INSERT INTO orders SELECT * FROM orders_unpartitioned")
+    op.execute("DROP TABLE orders_unpartitioned")
+    op.execute("ANALYZE orders")
+
+def downgrade() -> None:
+    op.drop_table("order_numbers")
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE orders RENAME TO orders_partitioned")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY NONE")
+    _drop_indexes()
+    op.execute("CREATE TABLE orders (LIKE orders_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO orders SELECT * FROM orders_partitioned")
+    op.execute("DROP TABLE orders_partitioned")
+
+    op.execute("ALTER TABLE orders ALTER COLUMN created_at DROP NOT NULL")
+    op.execute("ALTER TABLE orders ADD CONSTRAINT orders_pkey PRIMARY KEY (id)")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER TABLE orders ADD CONSTRAINT orders_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("CREATE INDEX ix_orders_id ON orders (id)")
+    op.execute("CREATE UNIQUE INDEX ix_orders_order_number ON orders (order_number)")
+    for statement in INDEXES:
+        op.execute(statement)
+    # Archived orders may still have payments, so existing rows are not validated
+    op.execute(
+        "ALTER TABLE order_items ADD CONSTRAINT order_items_order_id_fkey "
+        "FOREIGN KEY (order_id) REFERENCES orders (id) NOT VALID"
+    )
+    op.execute(
+        "ALTER TABLE payments ADD CONSTRAINT payments_order_id_fkey "
+        "FOREIGN KEY (order_id) REFERENCES orders (id) NOT VALID"
+    )
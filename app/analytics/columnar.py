@@ -0,0 +1,324 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import BigInteger, cast, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only the columnar engine needs it
+    np = None
+
+STATUSES = list(OrderStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+CANCELLED = STATUS_CODES[OrderStatus.CANCELLED]
+DELIVERED = STATUS_CODES[OrderStatus.DELIVERED]
+PROCESSING = STATUS_CODES[OrderStatus.PROCESSING]
+
+# Order ids looked up per query when loading the items of new orders
+ITEM_CHUNK_SIZE = 10_000
+
+def _epoch(column):
+    return cast(func.extract("epoch", column), BigInteger)
+
+class _Columns:
+    """Equal-length NumPy columns that grow by doubling
+
+    Views handed out by view() never change afterwards: appends write past
+    their end, and updates and reorders replace the arrays they touch
+    instead of writing into them.
+    """
+
+    def __init__(self, dtypes: Dict[str, str], capacity: int = 1024):
+        self.size = 0
+        self._arrays = {name: np.zeros(capacity, dtype) for name, dtype in dtypes.items()}
+
+    def __getitem__(self, name: str) -> "np.ndarray":
+        return self._arrays[name][:self.size]
+
+    def view(self) -> Dict[str, "np.ndarray"]:
+        return {name: array[:self.size] for name, array in self._arrays.items()}
+
+    def set(self, name: str, rows, values) -> None:
+        """Write values at rows (indices, mask or slice) of a copy of the column"""
+        column = self._arrays[name].copy()
+        column[:self.size][rows] = values
+        self._arrays[name] = column
+
+    def append(self, columns: Dict[str, "np.ndarray"]) -> None:
+        count = len(next(iter(columns.values())))
+        needed = self.size + count
+        capacity = len(next(iter(self._arrays.values())))
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+            for name, array in self._arrays.items():
+                grown = np.zeros(capacity, array.dtype)
+                grown[:self.size] = array[:self.size]
+                self._arrays[name] = grown
+        for name, values in columns.items():
+            self._arrays[name][self.size:needed] = values
+        self.size = needed
+
+    def reorder(self, order: "np.ndarray") -> None:
+        for name, array in self._arrays.items():
+            reordered = np.zeros_like(array)
+            reordered[:self.size] = array[:self.size][order]
+            self._arrays[name] = reordered
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Order and item columns as of one refresh"""
+    orders: Dict[str, "np.ndarray"]
+    items: Dict[str, "np.ndarray"]
+
+class ColumnarOrderFacts:
+    """Order and order-item facts held in compact NumPy columns
+
+    The first refresh scans both tables. Later refreshes only read orders
+    created or updated since the watermark, minus an overlap that covers
+    transactions committing late. They also read the items of orders seen
+    for the first time. Orders stay sorted by id, so an update is a binary
+    search plus a write to a copy of the changed columns.
+
+    Each refresh publishes an immutable snapshot of the columns, and every
+    query reads the snapshot it started with, so queries never lock or see
+    a refresh half done. Incremental refreshes cannot see deleted rows, so
+    every reload_interval seconds the columns are rebuilt from scratch,
+    which drops archived or deleted orders.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 5.0,
+        overlap: int = 60,
+        batch_size: int = 100_000,
+        reload_interval: float = 3600
+    ):
+        if np is None:
+            raise RuntimeError("The columnar analytics engine requires numpy")
+        self.refresh_interval = refresh_interval
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.reload_interval = reload_interval
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._reset()
+        self._snapshot = _Snapshot(self.orders.view(), self.items.view())
+
+    def _reset(self) -> None:
+        self.orders = _Columns({
+            "id": "int32",
+            "created": "uint32",
+            "updated": "uint32",  # 0 while the order was never updated
+            "status": "int8",
+            "amount": "float64",
+        })
+        self.items = _Columns({
+            "order_pos": "int32",  # Row of the item's order in self.orders
+            "product_id": "int32",
+            "quantity": "int32",
+            "revenue": "float64",
+        })
+        self.max_order_id = 0
+        self.watermark = 0
+        self.loaded_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_interval
+
+    def _reload_due(self) -> bool:
+        return 0 < self.reload_interval <= time.monotonic() - self.loaded_at
+
+    def refresh(self, db: Session, force: bool = False) -> "ColumnarOrderFacts":
+        """Pull changes since the watermark unless refreshed within refresh_interval"""
+        if force or self._stale():
+            with self._lock:
+                if force or self._stale():
+                    if self._reload_due():
+                        self._reset()
+                    self._load(db)
+                    self._snapshot = _Snapshot(self.orders.view(), self.items.view())
+                    self.refreshed_at = time.monotonic()
+        return self
+
+    def _load(self, db: Session) -> None:
+        initial = self.orders.size == 0
+        started = int(time.time())
+        query = (
+            select(Order.id, _epoch(Order.created_at), _epoch(Order.updated_at), Order.status, Order.total_amount)
+            .order_by(Order.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        if not initial:
+            since = datetime.utcfromtimestamp(max(0, self.watermark - self.overlap))
+            query = query.where(or_(
+                Order.id > self.max_order_id,
+                Order.created_at >= since,
+                Order.updated_at >= since
+            ))
+
+        new_ids = []
+        for rows in db.execute(query).partitions():
+            ids, created, updated, statuses, amounts = zip(*rows)
+            new_ids.append(self._upsert_orders(
+                np.array(ids, dtype=np.int32),
+                np.array(created, dtype=np.uint32),
+                np.array([value or 0 for value in updated], dtype=np.uint32),
+                np.array([STATUS_CODES[status] for status in statuses], dtype=np.int8),
+                np.array(amounts, dtype=np.float64)
+            ))
+
+        item_columns = (OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.final_price)
+        if initial:
+            query = select(*item_columns).execution_options(yield_per=self.batch_size)
+            for rows in db.execute(query).partitions():
+                self._append_items(rows)
+        elif new_ids:
+            ids = np.concatenate(new_ids).tolist()
+            for start in range(0, len(ids), ITEM_CHUNK_SIZE):
+                rows = db.execute(
+                    select(*item_columns).where(OrderItem.order_id.in_(ids[start:start + ITEM_CHUNK_SIZE]))
+                ).all()
+                if rows:
+                    self._append_items(rows)
+        # Timestamps ahead of the clock must not push the watermark past changes still to come
+        self.watermark = min(self.watermark, started)
+
+    def _upsert_orders(self, ids, created, updated, status, amount) -> "np.ndarray":
+        """Update known orders in place and append new ones; returns the new ids"""
+        known = self.orders["id"]
+        positions = np.searchsorted(known, ids)
+        found = positions < len(known)
+        found[found] = known[positions[found]] == ids[found]
+        if found.any():
+            rows = positions[found]
+            self.orders.set("updated", rows, updated[found])
+            self.orders.set("status", rows, status[found])
+            self.orders.set("amount", rows, amount[found])
+
+        fresh = ~found
+        if fresh.any():
+            late = len(known) and ids[fresh].min() < known[-1]
+            self.orders.append({
+                "id": ids[fresh],
+                "created": created[fresh],
+                "updated": updated[fresh],
+                "status": status[fresh],
+                "amount": amount[fresh],
+            })
+            if late:
+                self._restore_order()
+            self.max_order_id = max(self.max_order_id, int(ids[fresh].max()))
+        self.watermark = max(self.watermark, int(created.max()), int(updated.max()))
+        return ids[fresh]
+
+    def _restore_order(self) -> None:
+        """Re-sort orders by id after a late commit and remap item positions"""
+        order = np.argsort(self.orders["id"], kind="stable")
+        self.orders.reorder(order)
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        self.items.set("order_pos", slice(None), remap[self.items["order_pos"]])
+
+    def _append_items(self, rows) -> None:
+        order_ids, product_ids, quantities, revenues = (np.array(column) for column in zip(*rows))
+        known = self.orders["id"]
+        positions = np.searchsorted(known, order_ids)
+        found = positions < len(known)
+        found[found] = known[positions[found]] == order_ids[found]
+        # Items of orders committed after the order scan arrive with their order next time
+        self.items.append({
+            "order_pos": positions[found],
+            "product_id": product_ids[found],
+            "quantity": quantities[found],
+            "revenue": revenues[found],
+        })
+
+    @staticmethod
+    def _created_since(orders: Dict[str, "np.ndarray"], days: Optional[int]):
+        """Selects orders created in the past days, or all of them when days is None"""
+        if days is None:
+            return slice(None)
+        start = int((datetime.utcnow() - timedelta(days=days)).replace(tzinfo=timezone.utc).timestamp())
+        return orders["created"] >= start
+
+    def volume_by_status(self, days: Optional[int] = None) -> Dict[str, int]:
+        orders = self._snapshot.orders
+        counts = np.bincount(orders["status"][self._created_since(orders, days)], minlength=len(STATUSES))
+        return {status.value: int(counts[code]) for code, status in enumerate(STATUSES) if counts[code]}
+
+    def daily_revenue(self, days: int = 30) -> List[Tuple[datetime, float]]:
+        orders = self._snapshot.orders
+        start = int((datetime.utcnow() - timedelta(days=days)).replace(tzinfo=timezone.utc).timestamp())
+        created = orders["created"]
+        mask = (created >= start) & (orders["status"] != CANCELLED)
+        first_day = start // 86400
+        day_offsets = (created[mask] // 86400).astype(np.int64) - first_day
+        revenue = np.bincount(day_offsets, weights=orders["amount"][mask])
+        counts = np.bincount(day_offsets)
+        return [
+            (datetime.utcfromtimestamp((first_day + int(offset)) * 86400), float(revenue[offset]))
+            for offset in np.flatnonzero(counts)
+        ]
+
+    def top_sellers(self, limit: int = 10) -> List[Tuple[int, int, float]]:
+        """(product_id, quantity, revenue) of the best sellers by quantity"""
+        snapshot = self._snapshot
+        items = snapshot.items
+        live = snapshot.orders["status"][items["order_pos"]] != CANCELLED
+        product_ids = items["product_id"][live]
+        if not len(product_ids):
+            return []
+        quantity = np.bincount(product_ids, weights=items["quantity"][live])
+        revenue = np.bincount(product_ids, weights=items["revenue"][live])
+        if limit < len(quantity):
+            candidates = np.argpartition(-quantity, limit)[:limit]
+        else:
+            candidates = np.arange(len(quantity))
+        top = candidates[np.argsort(-quantity[candidates], kind="stable")]
+        return [
+            (int(product_id), int(quantity[product_id]), float(revenue[product_id]))
+            for product_id in top
+            if quantity[product_id] > 0
+        ]
+
+    def processing_metrics(self, days: Optional[int] = None) -> Dict:
+        orders = self._snapshot.orders
+        window = self._created_since(orders, days)
+        status = orders["status"][window]
+        updated = orders["updated"][window]
+        delivered = (status == DELIVERED) & (updated > 0)
+        durations = updated[delivered].astype(np.int64) - orders["created"][window][delivered]
+        if len(durations):
+            avg = timedelta(seconds=float(durations.mean()))
+            low = timedelta(seconds=int(durations.min()))
+            high = timedelta(seconds=int(durations.max()))
+        else:
+            avg = low = high = None
+        return {
+            'avg_processing_time': avg,
+            'min_processing_time': low,
+            'max_processing_time': high,
+            'orders_in_processing': int(np.count_nonzero(status == PROCESSING))
+        }
+
+_order_facts: Optional[ColumnarOrderFacts] = None
+_order_facts_lock = threading.Lock()
+
+def get_order_facts() -> ColumnarOrderFacts:
+    """Process-wide columnar facts, created on first use"""
+    global _order_facts
+    with _order_facts_lock:
+        if _order_facts is None:
+            _order_facts = ColumnarOrderFacts(
+                refresh_interval=settings.ANALYTICS_REFRESH_SECONDS,
+                overlap=settings.ANALYTICS_REFRESH_OVERLAP_SECONDS,
+                reload_interval=settings.ANALYTICS_RELOAD_SECONDS
+            )
+        return _order_facts
@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from redis import Redis
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.celery import celery_app
+from app.core.config import settings
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+
+DAY_KEY = "bestsellers:{}:{}"  # metric, day
+WINDOW_KEY = "bestsellers:{}:window:{}:{}"  # metric, days, last day
+METRICS = ("units", "revenue")
+
+class BestSellerLeaderboard:
+    """Units and revenue per product in per-day Redis sorted sets
+
+    Orders add their lines to the sets of the day they were placed and
+    cancellations, through cancel_order or a status update, subtract them
+    again, so the sets track OrderItem writes.
+    Rolling windows are the ZUNIONSTORE of their days, cached for a few
+    seconds, and top-N reads are a ZREVRANGE on the window.
+    """
+
+    def __init__(self, redis: Redis, windows: Iterable[int] = (7, 30, 90), window_ttl: int = 30):
+        self.redis = redis
+        self.windows = tuple(windows)
+        self.window_ttl = window_ttl
+        # Daily sets outlive the longest window by a day
+        self.retention = (max(self.windows) + 1) * 86400
+
+    def record(self, lines: Iterable[Tuple[int, int, float]], day: date, sign: int = 1) -> None:
+        """Apply (product_id, units, revenue) lines to a day; sign=-1 reverses them"""
+        day = day.isoformat()
+        pipeline = self.redis.pipeline()
+        for product_id, units, revenue in lines:
+            pipeline.zincrby(DAY_KEY.format("units", day), sign * units, product_id)
+            pipeline.zincrby(DAY_KEY.format("revenue", day), sign * revenue, product_id)
+        for metric in METRICS:
+            key = DAY_KEY.format(metric, day)
+            if sign < 0:
+                # Products cancelled down to nothing drop out of the ranking
+                pipeline.zremrangebyscore(key, "-inf", 0)
+            pipeline.expire(key, self.retention)
+        pipeline.execute()
+
+    def record_order(self, order: Order, sign: int = 1) -> None:
+        # Revenue is what was charged, after line discounts
+        lines = [(item.product_id, item.quantity, item.final_price) for item in order.items]
+        self.record(lines, (order.created_at or datetime.utcnow()).date(), sign)
+
+    def _window(self, metric: str, days: int, today: date) -> str:
+        key = WINDOW_KEY.format(metric, days, today.isoformat())
+        if not self.redis.exists(key):
+            day_keys = [
+                DAY_KEY.format(metric, (today - timedelta(days=offset)).isoformat())
+                for offset in range(days)
+            ]
+            pipeline = self.redis.pipeline()
+            pipeline.zunionstore(key, day_keys)
+            pipeline.expire(key, self.window_ttl)
+            pipeline.execute()
+        return key
+
+    def top(self, days: int, limit: int = 10, by: str = "units", today: Optional[date] = None) -> List[Dict]:
+        """Top products over the last days, ranked by units or revenue"""
+        if days not in self.windows:
+            raise ValueError(f"Window must be one of {self.windows}")
+        if by not in METRICS:
+            raise ValueError(f"Ranking must be one of {METRICS}")
+        today = today or datetime.utcnow().date()
+        other = "revenue" if by == "units" else "units"
+        ranked = self.redis.zrevrange(self._window(by, days, today), 0, limit - 1, withscores=True)
+        if not ranked:
+            return []
+        product_ids = [member for member, _ in ranked]
+        other_scores = self.redis.zmscore(self._window(other, days, today), product_ids)
+        return [
+            {
+                "product_id": int(member),
+                by: score,
+                other: other_score or 0.0,
+            }
+            for (member, score), other_score in zip(ranked, other_scores)
+        ]
+
+    def scores(self, days: Optional[int] = None, by: str = "units", today: Optional[date] = None) -> Dict[int, float]:
+        """Every product's units or revenue over the last days, the longest window by default"""
+        days = days or max(self.windows)
+        today = today or datetime.utcnow().date()
+        ranked = self.redis.zrange(self._window(by, days, today), 0, -1, withscores=True)
+        return {int(member): score for member, score in ranked}
+
+    def rebuild(self, db: Session, days: Optional[int] = None) -> None:
+        """Recompute the daily sets from order items, e.g. after enabling the leaderboard"""
+        days = days or max(self.windows)
+        start = datetime.utcnow().date() - timedelta(days=days - 1)
+        day = func.date(Order.created_at)
+        rows = (
+            db.query(
+                day.label("day"),
+                OrderItem.product_id,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.final_price)
+            )
+            .join(Order, OrderItem.order_id == Order.id)
+            .filter(Order.created_at >= start)
+            .filter(Order.status != OrderStatus.CANCELLED)
+            .group_by(day, OrderItem.product_id)
+            .all()
+        )
+        pipeline = self.redis.pipeline()
+        for offset in range(days):
+            for metric in METRICS:
+                pipeline.delete(DAY_KEY.format(metric, (start + timedelta(days=offset)).isoformat()))
+        pipeline.execute()
+
+        by_day: Dict[date, List[Tuple[int, int, float]]] = {}
+        for row_day, product_id, units, revenue in rows:
+            if isinstance(row_day, str):
+                row_day = date.fromisoformat(row_day)
+            by_day.setdefault(row_day, []).append((product_id, int(units), float(revenue)))
+        for row_day, lines in by_day.items():
+            self.record(lines, row_day)
+
+# Shared leaderboard on the Redis used for product caching
+leaderboard = BestSellerLeaderboard(
+    celery_app.backend.client,
+    windows=settings.LEADERBOARD_WINDOWS,
+    window_ttl=settings.LEADERBOARD_WINDOW_TTL_SECONDS
+)
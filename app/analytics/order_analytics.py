@@ -1,22 +1,46 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from app.analytics.columnar import ColumnarOrderFacts, get_order_facts
+from app.analytics.leaderboard import leaderboard
+from app.analytics.processing_times import processing_times
+from app.core.config import settings
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
 from app.models.product import Product
 
 class OrderAnalytics:
-    """Analytics service for order-related metrics and insights"""
+    """Analytics service for order-related metrics and insights
 
-    def __init__(self, db: Session):
+    Queries go to the database unless a columnar engine is passed in or
+    ANALYTICS_COLUMNAR_ENABLED is set, in which case they are answered from
+    in-memory NumPy columns refreshed incrementally from the database.
+
+    Windowed queries compare the raw created_at column with a lower bound, so
+    on PostgreSQL, where orders is partitioned by month, only the partitions
+    of the months in the window are scanned.
+    """
+
+    def __init__(self, db: Session, facts: Optional[ColumnarOrderFacts] = None):
         self.db = db
+        if facts is None and settings.ANALYTICS_COLUMNAR_ENABLED:
+            facts = get_order_facts()
+        self.facts = facts
+
+    @staticmethod
+    def _created_since(query, days: Optional[int]):
+        if days is None:
+            return query
+        return query.filter(Order.created_at >= datetime.utcnow() - timedelta(days=days))
 
-    def get_order_volume_by_status(self) -> Dict[str, int]:
-        """Get the count of orders grouped by their current status"""
+    def get_order_volume_by_status(self, days: Optional[int] = None) -> Dict[str, int]:
+        """Get the count of orders grouped by their current status, optionally for the past days only"""
+        if self.facts is not None:
+            return self.facts.refresh(self.db).volume_by_status(days)
         results = (
-            self.db.query(Order.status, func.count(Order.id))
+            self._created_since(self.db.query(Order.status, func.count(Order.id)), days)
             .group_by(Order.status)
             .all()
         )
@@ -24,6 +48,8 @@ class OrderAnalytics:
 
     def get_daily_revenue(self, days: int = 30) -> List[Tuple[datetime, float]]:
         """Get daily revenue for the specified number of past days"""
+        if self.facts is not None:
+            return self.facts.refresh(self.db).daily_revenue(days)
         start_date = datetime.utcnow() - timedelta(days=days)
         results = (
             self.db.query(
@@ -38,14 +64,49 @@ class OrderAnalytics:
         )
         return [(day, float(revenue or 0)) for day, revenue in results]
 
-    def get_top_selling_products(self, limit: int = 10) -> List[Dict]:
-        """Get the top selling products based on order quantity"""
+    def _product_names(self, product_ids: List[int]) -> Dict[int, str]:
+        return dict(
+            self.db.query(Product.id, Product.name)
+            .filter(Product.id.in_(product_ids))
+            .all()
+        )
+
+    def get_top_selling_products(self, limit: int = 10, days: Optional[int] = None) -> List[Dict]:
+        """Get the top selling products based on order quantity
+
+        With days (one of LEADERBOARD_WINDOWS) the ranking covers that rolling
+        window and is read from the Redis leaderboard instead of order items.
+        """
+        if days is not None:
+            top = leaderboard.top(days, limit, by="units")
+            names = self._product_names([entry["product_id"] for entry in top])
+            return [
+                {
+                    'product_id': entry["product_id"],
+                    'product_name': names.get(entry["product_id"]),
+                    'total_quantity': int(entry["units"]),
+                    'total_revenue': float(entry["revenue"])
+                }
+                for entry in top
+            ]
+        if self.facts is not None:
+            top = self.facts.refresh(self.db).top_sellers(limit)
+            names = self._product_names([product_id for product_id, _, _ in top])
+            return [
+                {
+                    'product_id': product_id,
+                    'product_name': names.get(product_id),
+                    'total_quantity': quantity,
+                    'total_revenue': revenue
+                }
+                for product_id, quantity, revenue in top
+            ]
         results = (
             self.db.query(
                 Product.id,
                 Product.name,
                 func.sum(OrderItem.quantity).label('total_quantity'),
-                func.sum(OrderItem.total_price).label('total_revenue')
+                func.sum(OrderItem.final_price).label('total_revenue')
             )
             .join(OrderItem)
             .join(Order)
@@ -65,13 +126,18 @@ class OrderAnalytics:
             for r in results
         ]
 
-    def get_order_processing_metrics(self) -> Dict:
-        """Get metrics about order processing times and efficiency"""
+    def get_order_processing_metrics(self, days: Optional[int] = None) -> Dict:
+        """Get metrics about order processing times and efficiency, optionally for orders of the past days"""
+        if self.facts is not None:
+            return self.facts.refresh(self.db).processing_metrics(days)
         processing_times = (
-            self.db.query(
-                func.avg(Order.updated_at - Order.created_at),
-                func.min(Order.updated_at - Order.created_at),
-                func.max(Order.updated_at - Order.created_at)
+            self._created_since(
+                self.db.query(
+                    func.avg(Order.updated_at - Order.created_at),
+                    func.min(Order.updated_at - Order.created_at),
+                    func.max(Order.updated_at - Order.created_at)
+                ),
+                days
             )
             .filter(Order.status == OrderStatus.DELIVERED)
             .first()
@@ -81,7 +147,16 @@ class OrderAnalytics:
             'avg_processing_time': processing_times[0],
             'min_processing_time': processing_times[1],
             'max_processing_time': processing_times[2],
-            'orders_in_processing': self.db.query(Order)
+            'orders_in_processing': self._created_since(self.db.query(Order), days)
                 .filter(Order.status == OrderStatus.PROCESSING)
                 .count()
-        }
\ No newline at end of file
+        }
+
+    def get_processing_time_percentiles(
+        self,
+        start: date,
+        end: date,
+        workers: Optional[List[str]] = None
+    ) -> Dict[str, Optional[timedelta]]:
+        """Get p50/p90/p99 processing times by merging per-day sketches, without scanning orders"""
+        return processing_times.percentiles(start, end, workers=workers)
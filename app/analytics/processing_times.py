@@ -0,0 +1,94 @@
+import socket
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+from redis import Redis
+
+from app.analytics.sketch import DDSketch
+from app.core.celery import celery_app
+from app.core.config import settings
+
+SKETCH_KEY = "processing_times:{}:{}"
+# Workers that recorded a sketch on a given day
+WORKERS_KEY = "processing_times:{}:workers"
+ZERO_FIELD = "zero"
+
+class ProcessingTimeSketches:
+    """Order processing-time sketches in Redis, one per day and worker
+
+    Each sketch is a hash of bucket index to count, so recording a delivery
+    is a pipelined HINCRBY with no read-modify-write, and concurrent workers
+    never lose updates. Percentiles over a date range merge the sketches of
+    every day and worker in it.
+    """
+
+    def __init__(self, redis: Redis, relative_accuracy: float = 0.01, retention_days: int = 400):
+        self.redis = redis
+        self.relative_accuracy = relative_accuracy
+        self.retention = retention_days * 86400
+        self._keys = DDSketch(relative_accuracy)
+
+    def record(self, seconds: float, day: date, worker: Optional[str] = None) -> None:
+        worker = worker or socket.gethostname()
+        key = SKETCH_KEY.format(day.isoformat(), worker)
+        bucket = self._keys.key(seconds)
+        pipeline = self.redis.pipeline()
+        pipeline.hincrby(key, ZERO_FIELD if bucket is None else bucket, 1)
+        pipeline.expire(key, self.retention)
+        pipeline.sadd(WORKERS_KEY.format(day.isoformat()), worker)
+        pipeline.expire(WORKERS_KEY.format(day.isoformat()), self.retention)
+        pipeline.execute()
+
+    def record_order(self, order, worker: Optional[str] = None) -> None:
+        """Record how long a delivered order took from placement to delivery"""
+        if order.created_at is None or order.updated_at is None:
+            return
+        seconds = (order.updated_at - order.created_at).total_seconds()
+        self.record(seconds, order.updated_at.date(), worker)
+
+    def sketch(self, start: date, end: date, workers: Optional[Iterable[str]] = None) -> DDSketch:
+        """Merge the sketches of every day in [start, end], optionally for some workers only"""
+        days = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+        pipeline = self.redis.pipeline()
+        for day in days:
+            pipeline.smembers(WORKERS_KEY.format(day))
+        keys = []
+        selected = set(workers) if workers is not None else None
+        for day, members in zip(days, pipeline.execute()):
+            for worker in sorted(member.decode() for member in members):
+                if selected is None or worker in selected:
+                    keys.append(SKETCH_KEY.format(day, worker))
+
+        pipeline = self.redis.pipeline()
+        for key in keys:
+            pipeline.hgetall(key)
+        merged = DDSketch(self.relative_accuracy)
+        for buckets in pipeline.execute():
+            for field, count in buckets.items():
+                count = int(count)
+                if field == ZERO_FIELD.encode():
+                    merged.zero_count += count
+                else:
+                    merged.bins[int(field)] = merged.bins.get(int(field), 0) + count
+                merged.count += count
+        return merged
+
+    def percentiles(
+        self,
+        start: date,
+        end: date,
+        quantiles: Iterable[float] = (0.5, 0.9, 0.99),
+        workers: Optional[Iterable[str]] = None
+    ) -> Dict[str, Optional[timedelta]]:
+        sketch = self.sketch(start, end, workers)
+        result = {}
+        for q in quantiles:
+            value = sketch.quantile(q)
+            result[f"p{q * 100:g}"] = timedelta(seconds=value) if value is not None else None
+        return result
+
+# Shared sketches on the Redis used for product caching
+processing_times = ProcessingTimeSketches(
+    celery_app.backend.client,
+    relative_accuracy=settings.PROCESSING_SKETCH_ACCURACY,
+    retention_days=settings.PROCESSING_SKETCH_RETENTION_DAYS
+)
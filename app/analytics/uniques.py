@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+from redis import Redis
+
+from app.core.celery import celery_app
+from app.core.config import settings
+
+DAY_KEY = "uniques:{}:{}"  # metric, day
+RANGE_KEY = "uniques:{}:range:{}:{}"  # metric, first day, last day
+METRICS = ("customers", "products")
+
+class DistinctCounters:
+    """Per-day HyperLogLog sketches of buyers and purchased products
+
+    Each order adds its customer and products with PFADD, about 12 KB per
+    sketch regardless of volume. Counts over a range PFMERGE the daily
+    sketches into a short-lived key, so a dashboard read costs the same for
+    a day or a month, with a standard error of 0.81%.
+    """
+
+    def __init__(self, redis: Redis, retention_days: int = 400, range_ttl: int = 60):
+        self.redis = redis
+        self.retention = retention_days * 86400
+        self.range_ttl = range_ttl
+
+    def record(self, customer_id: int, product_ids: Iterable[int], day: date) -> None:
+        day = day.isoformat()
+        pipeline = self.redis.pipeline()
+        pipeline.pfadd(DAY_KEY.format("customers", day), customer_id)
+        product_ids = list(product_ids)
+        if product_ids:
+            pipeline.pfadd(DAY_KEY.format("products", day), *product_ids)
+        for metric in METRICS:
+            pipeline.expire(DAY_KEY.format(metric, day), self.retention)
+        pipeline.execute()
+
+    def count(self, metric: str, days: int = 1, today: Optional[date] = None) -> int:
+        """Approximate distinct count over the last days, today included"""
+        if metric not in METRICS:
+            raise ValueError(f"Metric must be one of {METRICS}")
+        today = today or datetime.utcnow().date()
+        if days == 1:
+            return self.redis.pfcount(DAY_KEY.format(metric, today.isoformat()))
+        first = today - timedelta(days=days - 1)
+        key = RANGE_KEY.format(metric, first.isoformat(), today.isoformat())
+        if not self.redis.exists(key):
+            pipeline = self.redis.pipeline()
+            pipeline.pfmerge(key, *[
+                DAY_KEY.format(metric, (first + timedelta(days=offset)).isoformat())
+                for offset in range(days)
+            ])
+            pipeline.expire(key, self.range_ttl)
+            pipeline.execute()
+        return self.redis.pfcount(key)
+
+# Shared counters on the Redis used for product caching
+distinct_counters = DistinctCounters(
+    celery_app.backend.client,
+    retention_days=settings.UNIQUES_RETENTION_DAYS,
+    range_ttl=settings.UNIQUES_RANGE_TTL_SECONDS
+)
@@ -0,0 +1,15 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_active_superuser
+from app.db.session import slow_query_log
+from app.schemas.user import UserInDB
+
+router = APIRouter()
+
+@router.get("/slow-queries", response_model=List[Dict[str, Any]])
+def read_slow_queries(
+    limit: int = 50,
+    current_user: UserInDB = Depends(get_current_active_superuser)
+) -> Any:
+    """Most recent slow queries with call sites and captured plans. Superusers only."""
+    return slow_query_log.recent(limit=limit)
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, literal
 from app.db.session import get_db
 from app.models.order import Order, OrderStatus
-from app.models.product import Product
+from app.models.product import LOW_STOCK_THRESHOLD, Product
 from app.models.user import User
-from app.core.auth import get_current_user
+from app.api.deps import get_current_user
+from app.analytics.leaderboard import leaderboard
+from app.analytics.processing_times import processing_times
+from app.analytics.uniques import distinct_counters
+from app.core.config import settings
+from app.core.result_cache import cached_result
 
 router = APIRouter()
 
+# Results are cached per endpoint and parameters until the end of their
+# ttl-sized time bucket; one request recomputes an expired entry while
+# concurrent ones get the stale value (see RESULT_CACHE_* settings).
+
 @router.get("/dashboard", response_model=Dict[str, Any])
+@cached_result("analytics:dashboard", ttl=60)
 async def get_dashboard_metrics(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -31,7 +41,20 @@ async def get_dashboard_metrics(
         filter(Order.created_at >= last_30_days).scalar() or 0.0
     
     # Inventory metrics
-    low_stock_products = db.query(Product).filter(Product.stock < 10).count()
+    low_stock_products = db.query(Product).filter(
+        Product.stock < literal(LOW_STOCK_THRESHOLD, literal_execute=True)
+    ).count()
+
+    # Unique buyers and products from HyperLogLog sketches, constant cost per range
+    today = now.date()
+    uniques = {
+        metric: {
+            "daily": distinct_counters.count(metric, 1, today),
+            "weekly": distinct_counters.count(metric, 7, today),
+            "monthly": distinct_counters.count(metric, 30, today)
+        }
+        for metric in ("customers", "products")
+    }
     
     return {
         "orders": {
@@ -46,10 +69,13 @@ async def get_dashboard_metrics(
         },
         "inventory": {
             "low_stock_count": low_stock_products
-        }
+        },
+        "unique_customers": uniques["customers"],
+        "unique_products": uniques["products"]
     }
 
 @router.get("/sales-trends", response_model=List[Dict[str, Any]])
+@cached_result("analytics:sales-trends", ttl=300)
 async def get_sales_trends(
     days: int = 30,
     db: Session = Depends(get_db),
@@ -73,7 +99,7 @@ async def get_sales_trends(
     
     return [
         {
-            "date": sale.date.isoformat(),
+            "date": str(sale.date),
             "order_count": sale.order_count,
             "revenue": float(sale.revenue or 0)
         }
@@ -81,34 +107,60 @@ async def get_sales_trends(
     ]
 
 @router.get("/product-performance", response_model=List[Dict[str, Any]])
+@cached_result("analytics:product-performance", ttl=60)
 async def get_product_performance(
     limit: int = 10,
+    days: int = 30,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> List[Dict[str, Any]]:
-    """Get performance metrics for top-selling products."""
-    from app.models.order_item import OrderItem
-    
-    top_products = db.query(
-        Product.id,
-        Product.name,
-        func.sum(OrderItem.quantity).label('units_sold'),
-        func.sum(OrderItem.total_price).label('revenue')
-    ).join(
-        OrderItem
-    ).group_by(
-        Product.id,
-        Product.name
-    ).order_by(
-        func.sum(OrderItem.total_price).desc()
-    ).limit(limit).all()
+    """Get performance metrics for top-selling products over a rolling window.
+
+    Served from the Redis best-seller leaderboard, ranked by revenue.
+    """
+    if days not in settings.LEADERBOARD_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"days must be one of {settings.LEADERBOARD_WINDOWS}"
+        )
+
+    top_products = leaderboard.top(days, limit, by="revenue")
+    names = dict(
+        db.query(Product.id, Product.name)
+        .filter(Product.id.in_([entry["product_id"] for entry in top_products]))
+        .all()
+    )
     
     return [
         {
-            "product_id": product.id,
-            "product_name": product.name,
-            "units_sold": product.units_sold,
-            "revenue": float(product.revenue or 0)
+            "product_id": entry["product_id"],
+            "product_name": names.get(entry["product_id"]),
+            "units_sold": int(entry["units"]),
+            "revenue": float(entry["revenue"])
         }
-        for product in top_products
-    ]
\ No newline at end of file
+        for entry in top_products
+    ]
+
+@router.get("/processing-times", response_model=Dict[str, Any])
+@cached_result("analytics:processing-times", ttl=300)
+async def get_processing_times(
+    start: date,
+    end: date,
+    worker: Optional[List[str]] = Query(None),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Get p50/p90/p99 order processing times in seconds for a date range."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days > 366:
+        raise HTTPException(status_code=400, detail="Cannot fetch data for more than 366 days")
+
+    percentiles = processing_times.percentiles(start, end, workers=worker)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **{
+            name: value.total_seconds() if value is not None else None
+            for name, value in percentiles.items()
+        }
+    }
@@ -0,0 +1,114 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+from app.schemas.cart import Cart, CartCheckout, CartItem, CartItemUpdate
+from app.schemas.order import Order, OrderCreate, OrderItemCreate
+from app.crud.product import product as crud_product
+from app.api.deps import get_current_active_user
+from app.api.v1.orders import create_order
+from app.core.cart import carts
+from app.core.config import settings
+from app.core.idempotency import idempotency_store, run_idempotent
+from app.core.responses import serialize
+from app.db.session import get_db
+from app.schemas.user import UserInDB
+
+router = APIRouter()
+
+def _cart(user_id: int) -> Cart:
+    return Cart(items=[
+        CartItem(product_id=product_id, quantity=quantity)
+        for product_id, quantity in carts.get(user_id).items()
+    ])
+
+@router.get("/", response_model=Cart)
+def read_cart(
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Get the current user's cart."""
+    return _cart(current_user.id)
+
+@router.post("/items", response_model=Cart)
+def add_cart_item(
+    *,
+    item_in: CartItem,
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Add units of a product to the cart."""
+    carts.add(current_user.id, item_in.product_id, item_in.quantity)
+    return _cart(current_user.id)
+
+@router.put("/items/{product_id}", response_model=Cart)
+def update_cart_item(
+    *,
+    product_id: int,
+    item_in: CartItemUpdate,
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Set the quantity of a cart line; 0 removes it."""
+    carts.set(current_user.id, product_id, item_in.quantity)
+    return _cart(current_user.id)
+
+@router.delete("/items/{product_id}", response_model=Cart)
+def remove_cart_item(
+    product_id: int,
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Remove a product from the cart."""
+    carts.remove(current_user.id, product_id)
+    return _cart(current_user.id)
+
+@router.delete("/", response_model=Cart)
+def clear_cart(
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Empty the cart."""
+    carts.clear(current_user.id)
+    return Cart(items=[])
+
+@router.post("/checkout", response_model=Order)
+def checkout_cart(
+    *,
+    db: Session = Depends(get_db),
+    checkout_in: CartCheckout,
+    current_user: UserInDB = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None)
+) -> Any:
+    """Turn the cart into an order and remove the ordered lines.
+
+    Products are loaded in one batch; the order then goes through the same
+    path as POST /orders/, including async intake. An Idempotency-Key covers
+    the whole checkout, so a retry replays the order even though the cart
+    has been emptied since.
+    """
+    def checkout() -> Any:
+        lines = carts.get(current_user.id)
+        if not lines:
+            raise HTTPException(status_code=400, detail="Cart is empty")
+        products = crud_product.get_many(db, list(lines))
+        missing = [product_id for product_id, product in zip(lines, products) if product is None]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Products no longer available: {missing}")
+
+        order_in = OrderCreate(
+            items=[OrderItemCreate(product_id=product_id, quantity=quantity) for product_id, quantity in lines.items()],
+            shipping_address=checkout_in.shipping_address
+        )
+        order = create_order(db=db, order_in=order_in, current_user=current_user, idempotency_key=None)
+        # Lines added while checking out stay in the cart
+        carts.remove_lines(current_user.id, list(lines))
+        return order
+
+    if idempotency_key is None:
+        return checkout()
+    if settings.ORDER_INTAKE_ASYNC:
+        handler, status_code = lambda: checkout().body, 202
+    else:
+        handler, status_code = lambda: serialize(Order, checkout()), 200
+    return run_idempotent(
+        idempotency_store,
+        f"checkout:{current_user.id}:{idempotency_key}",
+        idempotency_store.fingerprint(checkout_in.model_dump_json()),
+        handler,
+        status_code=status_code
+    )
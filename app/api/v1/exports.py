@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.crud.order import order as crud_order
+from app.crud.payment import payment as crud_payment
+from app.api.deps import get_current_active_superuser
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.order import OrderStatus
+from app.models.payment import PaymentStatus
+from app.schemas.user import UserInDB
+
+router = APIRouter()
+
+# Supported export formats and their media types
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Number of rows encoded into each chunk written to the client
+ROWS_PER_CHUNK = 500
+
+def _encode_value(value: Any) -> Any:
+    """Convert enum and datetime values into JSON/CSV friendly primitives"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _ndjson_stream(header: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON, one object per row"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(header, map(_encode_value, row)))))
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+def _csv_stream(header: Sequence[str], rows: Iterable[Tuple]) -> Iterator[str]:
+    """Encode rows as CSV with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow([_encode_value(value) for value in row])
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+def _streaming_export(
+    name: str,
+    fmt: str,
+    header: Sequence[str],
+    rows: Iterable[Tuple]
+) -> StreamingResponse:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid export format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    body = _ndjson_stream(header, rows) if fmt == "ndjson" else _csv_stream(header, rows)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@router.get("/orders")
+def export_orders(
+    format: str = "ndjson",
+    status: Optional[OrderStatus] = None,
+    db: Session = Depends(get_db),
+    current_user: UserInDB = Depends(get_current_active_superuser)
+) -> StreamingResponse:
+    """Stream the full order history as NDJSON or CSV."""
+    header = [column.key for column in crud_order.export_columns]
+    rows = crud_order.stream_rows(db, status=status, batch_size=settings.EXPORT_BATCH_SIZE)
+    return _streaming_export("orders", format, header, rows)
+
+@router.get("/payments")
+def export_payments(
+    format: str = "ndjson",
+    status: Optional[PaymentStatus] = None,
+    db: Session = Depends(get_db),
+    current_user: UserInDB = Depends(get_current_active_superuser)
+) -> StreamingResponse:
+    """Stream the full payment history as NDJSON or CSV."""
+    header = [column.key for column in crud_payment.export_columns]
+    rows = crud_payment.stream_rows(db, status=status, batch_size=settings.EXPORT_BATCH_SIZE)
+    return _streaming_export("payments", format, header, rows)
@@ -1,14 +1,23 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.schemas.order import Order, OrderCreate, OrderUpdate
 from app.crud.order import order as crud_order
 from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.core.idempotency import idempotency_store, run_idempotent
+from app.core.order_intake import QUEUED, order_intake
+from app.core.responses import fast_json_response, serialize
 from app.db.session import get_db
 from app.schemas.user import UserInDB
 
 router = APIRouter()
 
+# Clients may keep orders but must revalidate them on every use
+ORDER_CACHE_CONTROL = "private, no-cache"
+
 @router.get("/", response_model=List[Order])
 def read_orders(
     db: Session = Depends(get_db),
@@ -18,6 +27,8 @@ def read_orders(
 ) -> Any:
     """Retrieve orders. Users can only see their own orders."""
     orders = crud_order.get_multi(db, customer_id=current_user.id, skip=skip, limit=limit)
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(List[Order], orders)
     return orders
 
 @router.post("/", response_model=Order)
@@ -25,27 +36,91 @@ def create_order(
     *,
     db: Session = Depends(get_db),
     order_in: OrderCreate,
+    current_user: UserInDB = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None)
+) -> Any:
+    """Create new order.
+
+    With an Idempotency-Key header, retries replay the first response from
+    Redis instead of creating the order again. In async intake mode the order
+    is checked against cached products, queued and acknowledged with 202 and
+    a reference for GET /orders/intake/{reference}.
+    """
+    def create() -> Any:
+        try:
+            return crud_order.create(db, obj_in=order_in, customer_id=current_user.id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def accept() -> bytes:
+        try:
+            crud_order.validate(db, obj_in=order_in)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        reference = order_intake.enqueue(current_user.id, order_in.model_dump())
+        return json.dumps({"reference": reference, "status": QUEUED}).encode()
+
+    if settings.ORDER_INTAKE_ASYNC:
+        if idempotency_key is None:
+            return Response(content=accept(), status_code=202, media_type="application/json")
+        return run_idempotent(
+            idempotency_store,
+            f"orders:{current_user.id}:{idempotency_key}",
+            idempotency_store.fingerprint(order_in.model_dump_json()),
+            accept,
+            status_code=202
+        )
+    if idempotency_key is None:
+        return create()
+    return run_idempotent(
+        idempotency_store,
+        f"orders:{current_user.id}:{idempotency_key}",
+        idempotency_store.fingerprint(order_in.model_dump_json()),
+        lambda: serialize(Order, create())
+    )
+
+@router.get("/intake/{reference}")
+def read_order_intake(
+    reference: str,
+    wait: float = Query(0, ge=0, le=30),
     current_user: UserInDB = Depends(get_current_active_user)
 ) -> Any:
-    """Create new order."""
-    try:
-        order = crud_order.create(db, obj_in=order_in, customer_id=current_user.id)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return order
+    """Status of an order accepted in async intake mode.
+
+    With wait, blocks up to that many seconds for the order to be created or
+    rejected instead of returning the queued status straight away.
+    """
+    if wait:
+        status = order_intake.wait_for_status(reference, wait)
+    else:
+        status = order_intake.get_status(reference)
+    if not status or status["customer_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Order reference not found")
+    return status
 
 @router.get("/{order_id}", response_model=Order)
 def read_order(
     order_id: int,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_active_user)
+    current_user: UserInDB = Depends(get_current_active_user),
+    if_none_match: Optional[str] = Header(None)
 ) -> Any:
-    """Get order by ID."""
-    order = crud_order.get(db, id=order_id)
-    if not order:
+    """Get order by ID. Honors If-None-Match with 304 Not Modified."""
+    version = crud_order.get_version(db, id=order_id)
+    if not version:
         raise HTTPException(status_code=404, detail="Order not found")
-    if order.customer_id != current_user.id:
+    customer_id, token = version
+    if customer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    # Orders are per-user, so shared caches must not store them
+    etag = make_etag("order", order_id, token)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, ORDER_CACHE_CONTROL)
+
+    order = crud_order.get(db, id=order_id)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ORDER_CACHE_CONTROL
     return order
 
 @router.put("/{order_id}", response_model=Order)
@@ -60,7 +135,7 @@ def update_order(
     order = crud_order.get(db, id=order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if order.customer_id != current_user.id:
+    if order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     order = crud_order.update(db, db_obj=order, obj_in=order_in)
     return order
@@ -76,7 +151,7 @@ def cancel_order(
     order = crud_order.get(db, id=order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if order.customer_id != current_user.id:
+    if order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     try:
         order = crud_order.cancel_order(db, db_obj=order)
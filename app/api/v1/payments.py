@@ -0,0 +1,57 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+from app.schemas.payment import Payment, PaymentCreate
+from app.crud.order import order as crud_order
+from app.crud.payment import payment as crud_payment
+from app.api.deps import get_current_active_user
+from app.core.idempotency import idempotency_store, run_idempotent
+from app.core.responses import serialize
+from app.db.session import get_db
+from app.schemas.user import UserInDB
+
+router = APIRouter()
+
+@router.post("/", response_model=Payment)
+def create_payment(
+    *,
+    db: Session = Depends(get_db),
+    payment_in: PaymentCreate,
+    current_user: UserInDB = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None)
+) -> Any:
+    """Create a payment for one of the current user's orders.
+
+    With an Idempotency-Key header, retries replay the first response from
+    Redis instead of recording the payment again.
+    """
+    def create() -> Any:
+        order = crud_order.get(db, id=payment_in.order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if order.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return crud_payment.create(db, obj_in=payment_in)
+
+    if idempotency_key is None:
+        return create()
+    return run_idempotent(
+        idempotency_store,
+        f"payments:{current_user.id}:{idempotency_key}",
+        idempotency_store.fingerprint(payment_in.model_dump_json()),
+        lambda: serialize(Payment, create())
+    )
+
+@router.get("/{payment_id}", response_model=Payment)
+def read_payment(
+    payment_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserInDB = Depends(get_current_active_user)
+) -> Any:
+    """Get payment by ID."""
+    payment = crud_payment.get(db, id=payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    if payment.order.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return payment
@@ -1,25 +1,99 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.schemas.product import Product, ProductCreate, ProductUpdate
 from app.crud.product import product as crud_product
 from app.api.deps import get_current_active_user, get_current_active_superuser
+from app.core.config import settings
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.core.responses import fast_json_response
 from app.db.session import get_db
 from app.schemas.user import UserInDB
 
 router = APIRouter()
 
+def catalog_cache_control() -> str:
+    return f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}"
+
 @router.get("/", response_model=List[Product])
 def read_products(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ) -> Any:
-    """Retrieve products with optional category filter."""
+    """Retrieve products with optional category filter.
+
+    Listings carry an ETag derived from the per-category catalog version, so
+    revalidation costs a single Redis read. Sales only move the version when
+    a product sells out or comes back, so listed stock counts may lag.
+    """
+    version = crud_product.get_listing_version(category)
+    etag = make_etag("products", version, category, skip, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, catalog_cache_control())
+
+    headers = {"ETag": etag, "Cache-Control": catalog_cache_control()}
     products = crud_product.get_multi(db, skip=skip, limit=limit, category=category)
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(List[Product], products, headers=headers)
+    response.headers.update(headers)
+    return products
+
+@router.get("/search", response_model=List[Product])
+def search_products(
+    response: Response,
+    db: Session = Depends(get_db),
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> Any:
+    """Ranked full-text search over product names and descriptions.
+
+    Match counts per category are returned in the X-Search-Facets header.
+    """
+    products, facets = crud_product.search(
+        db, query=query, category=category, skip=skip, limit=limit
+    )
+    response.headers["X-Search-Facets"] = json.dumps(facets)
     return products
 
+@router.get("/autocomplete", response_model=List[Dict[str, Any]])
+def autocomplete_products(
+    q: str,
+    limit: int = 10
+) -> Any:
+    """Suggest product names for a search-box prefix, served from memory."""
+    return [
+        {"id": id, "name": name}
+        for id, name in crud_product.autocomplete(q, limit=limit)
+    ]
+
+@router.get("/batch", response_model=List[Product])
+def read_products_batch(
+    ids: str = Query(..., description="Comma-separated product ids"),
+    db: Session = Depends(get_db)
+) -> Any:
+    """Retrieve several products at once, in the requested order.
+
+    Ids that do not exist are left out. Costs one Redis MGET, at most one
+    database query and one cache backfill, however many ids are asked for.
+    """
+    try:
+        product_ids = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(product_ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot fetch more than {settings.PRODUCT_BATCH_MAX_IDS} products at once"
+        )
+    return [product for product in crud_product.get_many(db, product_ids) if product is not None]
+
 @router.post("/", response_model=Product)
 def create_product(
     *,
@@ -40,12 +114,23 @@ def create_product(
 @router.get("/{product_id}", response_model=Product)
 def read_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
 ) -> Any:
-    """Get product by ID."""
+    """Get product by ID. Honors If-None-Match with 304 Not Modified."""
+    version = crud_product.get_version(db, id=product_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    etag = make_etag("product", product_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, catalog_cache_control())
+
     product = crud_product.get(db, id=product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = catalog_cache_control()
     return product
 
 @router.put("/{product_id}", response_model=Product)
@@ -57,7 +142,7 @@ def update_product(
     current_user: UserInDB = Depends(get_current_active_user)
 ) -> Any:
     """Update product. Only the seller or superuser can update the product."""
-    product = crud_product.get(db, id=product_id)
+    product = crud_product.get_for_write(db, id=product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     if product.seller_id != current_user.id and not current_user.is_superuser:
@@ -73,10 +158,36 @@ def delete_product(
     current_user: UserInDB = Depends(get_current_active_user)
 ) -> Any:
     """Delete product. Only the seller or superuser can delete the product."""
-    product = crud_product.get(db, id=product_id)
+    product = crud_product.get_for_write(db, id=product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     if product.seller_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     product = crud_product.remove(db, id=product_id)
-    return product
\ No newline at end of file
+    return product
+
+@router.post("/{product_id}/reservations", response_model=Dict[str, Any])
+def enable_product_reservations(
+    *,
+    db: Session = Depends(get_db),
+    product_id: int,
+    current_user: UserInDB = Depends(get_current_active_superuser)
+) -> Any:
+    """Serve a hot product's stock from Redis reservations, e.g. for a flash sale."""
+    if crud_product.enable_reservations(db, id=product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return {"product_id": product_id, "reservations": True}
+
+@router.delete("/{product_id}/reservations", response_model=Dict[str, Any])
+def disable_product_reservations(
+    *,
+    db: Session = Depends(get_db),
+    product_id: int,
+    current_user: UserInDB = Depends(get_current_active_superuser)
+) -> Any:
+    """Stop serving a product's stock from Redis reservations."""
+    product = crud_product.get(db, id=product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    crud_product.disable_reservations(product)
+    return {"product_id": product_id, "reservations": False}
@@ -0,0 +1,153 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.search import tokenize
+
+# Separates the indexed term from the product id inside a sorted key
+KEY_SEPARATOR = "\x00"
+
+class PrefixIndex:
+    """In-process autocomplete index over active product names
+
+    Every word suffix of a name ("gaming laptop" -> "gaming laptop", "laptop")
+    is stored as a key in one sorted list, so a prefix lookup is two binary
+    searches plus a scan of the matching slice. Matches are ranked by sales
+    popularity. Results for very short prefixes, whose slices are the largest,
+    are memoized; they are invalidated when a product under them is added,
+    renamed or removed, and re-ranked in place when its popularity changes.
+
+    The index lives in one process and only sees that process's writes, so
+    each worker reloads it periodically (AUTOCOMPLETE_REFRESH_SECONDS), with
+    popularity taken from the shared best-seller leaderboard.
+    """
+
+    def __init__(self, cached_prefix_length: int = 2, max_suggestions: int = 10):
+        self.cached_prefix_length = cached_prefix_length
+        self.max_suggestions = max_suggestions
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._names: Dict[int, str] = {}
+        self._popularity: Dict[int, float] = {}
+        self._top_cache: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _terms(name: str) -> List[str]:
+        words = tokenize(name)
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def load(self, rows: Iterable[Tuple[int, str, float]]) -> None:
+        """Replace the index contents from a (id, name, popularity) snapshot"""
+        keys = []
+        names = {}
+        popularity = {}
+        for id, name, score in rows:
+            names[id] = name
+            popularity[id] = float(score or 0)
+            keys.extend(f"{term}{KEY_SEPARATOR}{id}" for term in self._terms(name))
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._names = names
+            self._popularity = popularity
+            self._top_cache.clear()
+
+    def snapshot(self) -> List[Tuple[int, str, float]]:
+        """Return the compact (id, name, popularity) rows the index was built from"""
+        with self._lock:
+            return [(id, name, self._popularity.get(id, 0.0)) for id, name in self._names.items()]
+
+    def upsert(self, id: int, name: str) -> None:
+        """Add a product or replace its name, keeping its popularity"""
+        with self._lock:
+            self._remove(id)
+            self._names[id] = name
+            self._popularity.setdefault(id, 0.0)
+            for term in self._terms(name):
+                insort(self._keys, f"{term}{KEY_SEPARATOR}{id}")
+            self._invalidate(name)
+
+    def remove(self, id: int) -> None:
+        """Drop a product from suggestions"""
+        with self._lock:
+            self._remove(id)
+            self._popularity.pop(id, None)
+
+    def bump(self, id: int, amount: float) -> None:
+        """Adjust a product's popularity, e.g. by units sold or cancelled"""
+        with self._lock:
+            if id not in self._names:
+                return
+            self._popularity[id] = self._popularity.get(id, 0.0) + amount
+            self._rerank(id, amount)
+
+    def _remove(self, id: int) -> None:
+        name = self._names.pop(id, None)
+        if name is None:
+            return
+        for term in self._terms(name):
+            key = f"{term}{KEY_SEPARATOR}{id}"
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        self._invalidate(name)
+
+    def _cached_prefixes(self, name: str) -> set:
+        return {
+            term[:length]
+            for term in self._terms(name)
+            for length in range(1, self.cached_prefix_length + 1)
+        }
+
+    def _invalidate(self, name: str) -> None:
+        for prefix in self._cached_prefixes(name):
+            self._top_cache.pop(prefix, None)
+
+    def _rerank(self, id: int, amount: float) -> None:
+        """Update memoized results after a popularity change without rescanning"""
+        popularity = self._popularity
+        rank = lambda id: (popularity.get(id, 0.0), -id)
+        for prefix in self._cached_prefixes(self._names[id]):
+            top = self._top_cache.get(prefix)
+            if top is None:
+                continue
+            if id in top:
+                if amount < 0:
+                    # It may now rank below a match that was cut from the list
+                    del self._top_cache[prefix]
+                    continue
+            elif amount > 0 and (len(top) < self.max_suggestions or rank(id) > rank(top[-1])):
+                top.append(id)
+            else:
+                continue
+            top.sort(key=rank, reverse=True)
+            del top[self.max_suggestions:]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Return up to limit (id, name) suggestions for a typed prefix"""
+        prefix = " ".join(tokenize(prefix))
+        if not prefix:
+            return []
+        limit = min(limit, self.max_suggestions)
+        with self._lock:
+            cacheable = len(prefix) <= self.cached_prefix_length
+            top = self._top_cache.get(prefix) if cacheable else None
+            if top is None:
+                start = bisect_left(self._keys, prefix)
+                end = bisect_left(self._keys, prefix + "\uffff", start)
+                candidates = {
+                    int(key.rpartition(KEY_SEPARATOR)[2]) for key in self._keys[start:end]
+                }
+                popularity = self._popularity
+                top = heapq.nlargest(
+                    self.max_suggestions,
+                    candidates,
+                    key=lambda id: (popularity.get(id, 0.0), -id)
+                )
+                if cacheable:
+                    self._top_cache[prefix] = top
+            return [(id, self._names[id]) for id in top[:limit]]
+
+# Process-wide index, loaded at startup and kept current by the CRUD layer
+product_autocomplete = PrefixIndex()
@@ -0,0 +1,57 @@
+from typing import Dict, List
+from redis import Redis
+from app.core.celery import celery_app
+from app.core.config import settings
+
+CART_KEY = "cart:{}"
+
+class CartStore:
+    """Shopping carts as per-user Redis hashes of product_id -> quantity
+
+    Every change is a single O(1) hash command pipelined with a refresh of
+    the cart's TTL, so abandoned carts expire on their own. Carts never
+    touch Postgres; products are only loaded at checkout.
+    """
+
+    def __init__(self, redis: Redis, ttl: int = 604800):
+        self.redis = redis
+        self.ttl = ttl
+
+    def get(self, user_id: int) -> Dict[int, int]:
+        return {
+            int(product_id): int(quantity)
+            for product_id, quantity in self.redis.hgetall(CART_KEY.format(user_id)).items()
+        }
+
+    def add(self, user_id: int, product_id: int, quantity: int) -> int:
+        """Add units of a product; returns the line's new quantity"""
+        key = CART_KEY.format(user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.hincrby(key, product_id, quantity)
+        pipeline.expire(key, self.ttl)
+        return pipeline.execute()[0]
+
+    def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        """Set a line's quantity; zero removes it"""
+        if quantity <= 0:
+            self.remove(user_id, product_id)
+            return
+        key = CART_KEY.format(user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.hset(key, product_id, quantity)
+        pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        self.redis.hdel(CART_KEY.format(user_id), product_id)
+
+    def remove_lines(self, user_id: int, product_ids: List[int]) -> None:
+        """Drop the given lines, keeping any added since they were read"""
+        if product_ids:
+            self.redis.hdel(CART_KEY.format(user_id), *product_ids)
+
+    def clear(self, user_id: int) -> None:
+        self.redis.delete(CART_KEY.format(user_id))
+
+# Shared carts on the Redis used for product caching
+carts = CartStore(celery_app.backend.client, ttl=settings.CART_TTL_SECONDS)
@@ -5,7 +5,7 @@ celery_app = Celery(
     'quickshop',
     broker=f'redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0',
     backend=f'redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/1',
-    include=['app.tasks.orders']
+    include=['app.tasks.orders', 'app.tasks.inventory', 'app.tasks.partitions', 'app.tasks.payments']
 )
 
 celery_app.conf.update(
@@ -14,4 +14,22 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        'release-expired-reservations': {
+            'task': 'app.tasks.inventory.release_expired_reservations',
+            'schedule': settings.INVENTORY_SWEEP_INTERVAL_SECONDS,
+        },
+        'materialize-order-intake': {
+            'task': 'app.tasks.orders.materialize_order_intake',
+            'schedule': settings.ORDER_INTAKE_POLL_SECONDS,
+        },
+        'create-order-partitions': {
+            'task': 'app.tasks.partitions.create_order_partitions',
+            'schedule': settings.ORDER_PARTITIONS_INTERVAL_SECONDS,
+        },
+        'archive-order-partitions': {
+            'task': 'app.tasks.partitions.archive_order_partitions',
+            'schedule': settings.ORDER_PARTITIONS_INTERVAL_SECONDS,
+        },
+    },
 )
\ No newline at end of file
@@ -42,11 +42,145 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Rate Limiting Configuration
+    RATE_LIMIT_REQUESTS_PER_MINUTE: int = 60
+    # Paths that bypass rate limiting (and Redis) entirely
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/health", "/metrics"]
+
+    # Record per-route request metrics and expose them at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Debug mode adds Server-Timing headers with per-request SQL cost
+    DEBUG: bool = False
+    # Count SQL statements and database time per request
+    QUERY_STATS_ENABLED: bool = True
+    # Executions of one statement within a request that flag an N+1 suspect
+    N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Slow Query Log Configuration
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    # Capture EXPLAIN plans for the first slow occurrence of each statement
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAINS_PER_MINUTE: int = 10
+    # Number of slow queries kept for the admin endpoint
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+
     # JWT Configuration
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Serialize list endpoints through precompiled schema adapters
+    FAST_JSON_RESPONSES: bool = False
+
+    # HTTP caching of catalog reads (seconds a CDN or browser may reuse them)
+    CATALOG_CACHE_MAX_AGE: int = 60
+
+    # Product Cache Configuration
+    PRODUCT_CACHE_TTL_SECONDS: int = 3600
+    # Nonexistent ids are remembered this long so they stop reaching the database
+    PRODUCT_NEGATIVE_CACHE_SECONDS: int = 30
+    # XFetch eagerness; above 1 refreshes earlier, below 1 later
+    PRODUCT_CACHE_XFETCH_BETA: float = 1.0
+    # Lock held by the request rebuilding an entry
+    PRODUCT_CACHE_LOCK_SECONDS: int = 5
+    # How long other requests wait for the rebuilt entry before reading the database
+    PRODUCT_CACHE_WAIT_SECONDS: float = 0.5
+    # Most ids accepted by GET /products/batch
+    PRODUCT_BATCH_MAX_IDS: int = 100
+
+    # Autocomplete Configuration
+    # Seconds between reloads of each worker's in-process index: names from the database,
+    # popularity from the best-seller leaderboard; 0 disables
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 300
+
+    # Cart Configuration
+    # Seconds an untouched cart is kept in Redis
+    CART_TTL_SECONDS: int = 604800
+
+    # Inventory Reservations for hot products
+    INVENTORY_RESERVATIONS_ENABLED: bool = True
+    # Seconds an unconfirmed order holds its reserved stock
+    INVENTORY_RESERVATION_TTL_SECONDS: int = 900
+    # How often the sweeper releases expired reservations
+    INVENTORY_SWEEP_INTERVAL_SECONDS: int = 60
+
+    # Idempotency-Key Configuration
+    # How long stored responses can be replayed
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    # Lock held while the first request with a key executes
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    # How long a concurrent duplicate waits for the first response
+    IDEMPOTENCY_WAIT_SECONDS: float = 10
+
+    # Order Intake Configuration
+    # Accept orders with 202 and materialize them from a Redis stream
+    ORDER_INTAKE_ASYNC: bool = False
+    # Stream entries a worker turns into orders per read
+    ORDER_INTAKE_BATCH_SIZE: int = 100
+    # How often beat triggers the materializer
+    ORDER_INTAKE_POLL_SECONDS: float = 1.0
+    # How long clients can look up an intake reference
+    ORDER_INTAKE_STATUS_TTL_SECONDS: int = 86400
+
+    # Order Number Configuration
+    # Lease on the Redis-assigned worker id, renewed every third of it
+    ORDER_NUMBER_LEASE_SECONDS: int = 60
+
+    # Analytics Configuration
+    # Answer OrderAnalytics from in-memory NumPy columns (requires numpy, see requirements-analytics.txt)
+    ANALYTICS_COLUMNAR_ENABLED: bool = False
+    # Minimum seconds between incremental refreshes of the columns
+    ANALYTICS_REFRESH_SECONDS: float = 5.0
+    # Re-read this many seconds before the watermark to catch late commits
+    ANALYTICS_REFRESH_OVERLAP_SECONDS: int = 60
+    # Seconds between full reloads of the columns, which drop archived or deleted orders (0 disables)
+    ANALYTICS_RELOAD_SECONDS: int = 3600
+
+    # Rolling best-seller windows in days, served from Redis sorted sets
+    LEADERBOARD_WINDOWS: List[int] = [7, 30, 90]
+    # Seconds a merged window is reused before it is rebuilt with ZUNIONSTORE
+    LEADERBOARD_WINDOW_TTL_SECONDS: int = 30
+    # Days of per-day HyperLogLog sketches of buyers and products kept in Redis
+    UNIQUES_RETENTION_DAYS: int = 400
+    # Seconds a merged weekly/monthly sketch is reused
+    UNIQUES_RANGE_TTL_SECONDS: int = 60
+    # Share computed analytics results across workers and requests
+    RESULT_CACHE_ENABLED: bool = True
+    # Seconds an expired result may still be served while one request recomputes it (0 disables)
+    RESULT_CACHE_STALE_SECONDS: int = 300
+    # Lock held by the request recomputing a result
+    RESULT_CACHE_LOCK_SECONDS: int = 30
+    # How long a request without a stale value waits for the recomputed one
+    RESULT_CACHE_WAIT_SECONDS: float = 10
+    # Relative error of processing-time percentiles
+    PROCESSING_SKETCH_ACCURACY: float = 0.01
+    # Days of per-day processing-time sketches kept in Redis
+    PROCESSING_SKETCH_RETENTION_DAYS: int = 400
+
+    # Order Partition Configuration
+    # Monthly orders partitions kept created ahead of the current month (PostgreSQL)
+    ORDER_PARTITIONS_PREMAKE_MONTHS: int = 3
+    # How often partitions are created and old ones archived
+    ORDER_PARTITIONS_INTERVAL_SECONDS: int = 86400
+    # Months of orders kept in the database before archival (0 disables archival)
+    ORDER_ARCHIVE_AFTER_MONTHS: int = 0
+    # Directory receiving archived partitions as gzipped CSV
+    ORDER_ARCHIVE_DIR: str = "archive/orders"
+
+    # Payment Reconciliation Configuration
+    # Settlement lines matched per lookup and bulk update
+    RECONCILIATION_CHUNK_SIZE: int = 5000
+    # Hours a payment may stay pending before it is reported as missing from the settlement
+    RECONCILIATION_PENDING_GRACE_HOURS: int = 72
+    # Directory receiving discrepancy reports
+    RECONCILIATION_REPORT_DIR: str = "reports/reconciliation"
+
+    # Export Configuration
+    # Rows fetched per round trip from the server-side cursor
+    EXPORT_BATCH_SIZE: int = 1000
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,60 @@
+import hashlib
+import time
+from typing import Any, Callable, Optional
+from fastapi import Response
+from redis import Redis
+
+# How long version tokens live in Redis before being re-derived
+VERSION_TTL = 86400
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that identify a representation"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the validator and caching policy"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def get_version(
+    redis: Redis,
+    key: str,
+    loader: Optional[Callable[[], Optional[str]]] = None
+) -> Optional[str]:
+    """Read a version token, initializing it when missing
+
+    The loader derives the token from the database (e.g. from updated_at) and
+    may return None when the resource does not exist. Without a loader a fresh
+    time-based token is minted, so an evicted key can never resurrect an old
+    ETag.
+    """
+    version = redis.get(key)
+    if version is not None:
+        return version.decode()
+    version = loader() if loader else str(time.time_ns())
+    if version is None:
+        return None
+    redis.set(key, version, ex=VERSION_TTL, nx=True)
+    return version
+
+def bump_version(redis: Redis, *keys: str) -> None:
+    """Move version tokens forward so previously issued ETags stop matching"""
+    version = str(time.time_ns())
+    pipeline = redis.pipeline()
+    for key in keys:
+        pipeline.set(key, version, ex=VERSION_TTL)
+    pipeline.execute()
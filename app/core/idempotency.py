@@ -0,0 +1,164 @@
+import hashlib
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, Response
+from redis import Redis
+from app.core.celery import celery_app
+from app.core.config import settings
+
+# Store a response only while the caller still holds the key's lock, then release it.
+# KEYS: response key, lock key; ARGV: lock token, response, ttl
+COMPLETE_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('DEL', KEYS[2])
+return 1
+"""
+
+# Release a lock only if the caller still holds it
+ABORT_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    fingerprint: str
+
+class IdempotencyStore:
+    """Stores responses of non-idempotent requests keyed by Idempotency-Key
+
+    The first request with a key takes a short lock and runs; its response is
+    stored for ttl seconds. Concurrent duplicates wait for the stored response
+    instead of executing again, and later retries replay it straight from
+    Redis.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int = 86400,
+        lock_ttl: int = 30,
+        wait_timeout: float = 10,
+        poll_interval: float = 0.05
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._complete = redis.register_script(COMPLETE_SCRIPT)
+        self._abort = redis.register_script(ABORT_SCRIPT)
+
+    @staticmethod
+    def fingerprint(payload: str) -> str:
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get(self, key: str) -> Optional[StoredResponse]:
+        stored = self.redis.get(f"idempotency:{key}")
+        if stored is None:
+            return None
+        data = json.loads(stored)
+        return StoredResponse(data["status_code"], data["body"].encode(), data["fingerprint"])
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[Optional[StoredResponse], Optional[str]]:
+        """Return (stored response, None) for a replay, or (None, lock token) once the caller holds the lock"""
+        deadline = time.monotonic() + self.wait_timeout
+        token = uuid.uuid4().hex
+        while True:
+            stored = self._get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used with a different request"
+                    )
+                return stored, None
+            if self.redis.set(f"idempotency:{key}:lock", token, nx=True, ex=self.lock_ttl):
+                return None, token
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress"
+                )
+            time.sleep(self.poll_interval)
+
+    def complete(self, key: str, token: str, response: StoredResponse) -> bool:
+        """Store the response and release the lock
+
+        Returns False without storing when the lock expired and another
+        request took it over; that request's response is the one kept.
+        """
+        stored = self._complete(
+            keys=[f"idempotency:{key}", f"idempotency:{key}:lock"],
+            args=[
+                token,
+                json.dumps({
+                    "status_code": response.status_code,
+                    "body": response.body.decode(),
+                    "fingerprint": response.fingerprint
+                }),
+                self.ttl
+            ]
+        )
+        return bool(stored)
+
+    def abort(self, key: str, token: str) -> None:
+        """Release the lock without storing, so a retry executes again"""
+        self._abort(keys=[f"idempotency:{key}:lock"], args=[token])
+
+def _json_response(stored: StoredResponse, replayed: bool) -> Response:
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers=headers
+    )
+
+def run_idempotent(
+    store: IdempotencyStore,
+    key: str,
+    fingerprint: str,
+    handler: Callable[[], bytes],
+    status_code: int = 200
+) -> Response:
+    """Execute handler at most once per key and return its JSON response
+
+    handler returns the serialized response body. HTTPExceptions below 500
+    are stored like successes, since repeating the request would fail the
+    same way; any other error releases the key so the client can retry.
+    """
+    stored, token = store.begin(key, fingerprint)
+    if stored is not None:
+        return _json_response(stored, replayed=True)
+    try:
+        body = handler()
+        stored = StoredResponse(status_code, body, fingerprint)
+    except HTTPException as e:
+        if e.status_code >= 500:
+            store.abort(key, token)
+            raise
+        stored = StoredResponse(e.status_code, json.dumps({"detail": e.detail}).encode(), fingerprint)
+    except Exception:
+        store.abort(key, token)
+        raise
+    store.complete(key, token, stored)
+    return _json_response(stored, replayed=False)
+
+# Shared store on the Redis used for product caching
+idempotency_store = IdempotencyStore(
+    celery_app.backend.client,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_ttl=settings.IDEMPOTENCY_LOCK_SECONDS,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS
+)
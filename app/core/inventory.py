@@ -0,0 +1,145 @@
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from redis import Redis
+from app.core.celery import celery_app
+from app.core.config import settings
+
+STOCK_KEY = "inventory:stock:{}"
+RESERVATION_KEY = "inventory:reservation:{}"
+# Sorted set of open reservation ids scored by expiry time
+EXPIRY_KEY = "inventory:reservations"
+
+# Reserve the mirrored lines of an order, all or nothing.
+# Lines whose product is not mirrored are skipped and left to the database path.
+# KEYS: reservation hash, expiry zset, then one stock key per line
+# ARGV: reservation id, expires_at, then (product_id, quantity) per line
+# Returns 0 when a mirrored line lacks stock, otherwise the reserved product ids
+RESERVE_SCRIPT = """
+local lines = #KEYS - 2
+for i = 1, lines do
+    local stock = redis.call('GET', KEYS[i + 2])
+    if stock and tonumber(stock) < tonumber(ARGV[2 + i * 2]) then
+        return 0
+    end
+end
+local reserved = {}
+for i = 1, lines do
+    if redis.call('EXISTS', KEYS[i + 2]) == 1 then
+        redis.call('DECRBY', KEYS[i + 2], ARGV[2 + i * 2])
+        redis.call('HINCRBY', KEYS[1], ARGV[1 + i * 2], ARGV[2 + i * 2])
+        table.insert(reserved, ARGV[1 + i * 2])
+    end
+end
+if #reserved > 0 then
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+end
+return reserved
+"""
+
+# Give reserved units back to the mirrored stock. Idempotent.
+# KEYS: reservation hash, expiry zset; ARGV: reservation id, stock key prefix
+RELEASE_SCRIPT = """
+local lines = redis.call('HGETALL', KEYS[1])
+for i = 1, #lines, 2 do
+    local stock_key = ARGV[2] .. lines[i]
+    if redis.call('EXISTS', stock_key) == 1 then
+        redis.call('INCRBY', stock_key, lines[i + 1])
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return lines
+"""
+
+# Close a reservation whose units are now owned by a confirmed order.
+# KEYS: reservation hash, expiry zset; ARGV: reservation id
+COMMIT_SCRIPT = """
+local lines = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return lines
+"""
+
+def _pairs(flat: Sequence[bytes]) -> Dict[int, int]:
+    return {int(flat[i]): int(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+class InventoryReservations:
+    """Atomic stock reservations for hot products, mirrored in Redis
+
+    Stock for hot products lives in Redis while a sale runs. Checkout reserves
+    units with a single Lua call instead of locking the products row.
+    Reservations expire after ttl seconds unless the order is confirmed, at
+    which point the units are committed to Postgres.
+    """
+
+    def __init__(self, redis: Redis, ttl: int = 900):
+        self.redis = redis
+        self.ttl = ttl
+        self._reserve = redis.register_script(RESERVE_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+        self._commit = redis.register_script(COMMIT_SCRIPT)
+
+    def mirror(self, product_id: int, stock: int) -> bool:
+        """Start serving a product's stock from Redis; no-op if already mirrored"""
+        return bool(self.redis.set(STOCK_KEY.format(product_id), stock, nx=True))
+
+    def unmirror(self, product_id: int) -> None:
+        self.redis.delete(STOCK_KEY.format(product_id))
+
+    def is_mirrored(self, product_id: int) -> bool:
+        return bool(self.redis.exists(STOCK_KEY.format(product_id)))
+
+    def available(self, product_id: int) -> Optional[int]:
+        stock = self.redis.get(STOCK_KEY.format(product_id))
+        return int(stock) if stock is not None else None
+
+    def adjust(self, product_id: int, delta: int) -> None:
+        """Apply an out-of-band stock change (e.g. restock) to a mirrored product"""
+        if delta:
+            self.redis.incrby(STOCK_KEY.format(product_id), delta)
+
+    def reserve(self, lines: Dict[int, int]) -> Optional[Tuple[str, Set[int]]]:
+        """Reserve product_id -> quantity lines in one atomic call
+
+        Returns the reservation id with the set of product ids it covers
+        (empty when no product is mirrored), or None when a mirrored product
+        lacks stock.
+        """
+        reservation_id = uuid.uuid4().hex
+        keys = [RESERVATION_KEY.format(reservation_id), EXPIRY_KEY]
+        args = [reservation_id, time.time() + self.ttl]
+        for product_id, quantity in lines.items():
+            keys.append(STOCK_KEY.format(product_id))
+            args.extend([product_id, quantity])
+        result = self._reserve(keys=keys, args=args)
+        if result == 0:
+            return None
+        return reservation_id, {int(product_id) for product_id in result}
+
+    def release(self, reservation_id: str) -> Dict[int, int]:
+        """Return reserved units to stock; returns the released lines"""
+        lines = self._release(
+            keys=[RESERVATION_KEY.format(reservation_id), EXPIRY_KEY],
+            args=[reservation_id, STOCK_KEY.format("")]
+        )
+        return _pairs(lines)
+
+    def commit(self, reservation_id: str) -> Dict[int, int]:
+        """Close a reservation for a confirmed order; returns the units to persist"""
+        lines = self._commit(
+            keys=[RESERVATION_KEY.format(reservation_id), EXPIRY_KEY],
+            args=[reservation_id]
+        )
+        return _pairs(lines)
+
+    def expired(self, now: Optional[float] = None, limit: int = 1000) -> List[str]:
+        """Reservation ids past their TTL"""
+        ids = self.redis.zrangebyscore(EXPIRY_KEY, 0, now or time.time(), start=0, num=limit)
+        return [id.decode() for id in ids]
+
+# Shared instance on the Redis used for product caching
+reservations = InventoryReservations(
+    celery_app.backend.client,
+    ttl=settings.INVENTORY_RESERVATION_TTL_SECONDS
+)
@@ -0,0 +1,161 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds (bytes) of the response size histogram buckets
+SIZE_BUCKETS = (128, 1024, 8192, 65536, 524288, 4194304, 33554432)
+
+class _Series:
+    """Histogram state for one (method, route, status) combination"""
+    __slots__ = ("latency", "latency_sum", "size", "size_sum")
+
+    def __init__(self, latency_buckets: int, size_buckets: int):
+        # One slot per bucket plus a final +Inf slot; counts are not cumulative
+        self.latency = [0] * (latency_buckets + 1)
+        self.latency_sum = 0.0
+        self.size = [0] * (size_buckets + 1)
+        self.size_sum = 0
+
+class _Shard:
+    """Accumulators written by exactly one thread"""
+    __slots__ = ("series", "in_flight", "counters")
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, int], _Series] = {}
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        # (metric name, sorted label pairs) -> running total
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+class MetricsRegistry:
+    """Per-route HTTP metrics with lock-free recording
+
+    Each thread records into its own shard, so the request path never takes a
+    lock; the shards are merged only when /metrics is scraped. Under asyncio
+    all requests of a worker share the event loop thread's shard.
+    """
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        size_buckets: Sequence[int] = SIZE_BUCKETS
+    ):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Only taken the first time a thread records anything
+        self._shards_lock = threading.Lock()
+        # Counter name -> help text, in registration order
+        self._counters: Dict[str, str] = {}
+
+    def describe_counter(self, name: str, help: str) -> None:
+        """Register a counter so it is rendered on scrape"""
+        self._counters[name] = help
+
+    def increment(self, shard: "_Shard", name: str, value: float = 1, **labels: str) -> None:
+        """Add to a counter in the calling thread's shard"""
+        shard.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(
+        self,
+        shard: _Shard,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        size: int
+    ) -> None:
+        """Record one finished request into the calling thread's shard"""
+        key = (method, route, status)
+        series = shard.series.get(key)
+        if series is None:
+            series = shard.series[key] = _Series(len(self.latency_buckets), len(self.size_buckets))
+        series.latency[bisect_left(self.latency_buckets, duration)] += 1
+        series.latency_sum += duration
+        series.size[bisect_left(self.size_buckets, size)] += 1
+        series.size_sum += size
+
+    def _merge(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple[str, str, int], _Series] = {}
+        in_flight: Dict[str, int] = defaultdict(int)
+        counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        for shard in shards:
+            for key, series in list(shard.series.items()):
+                total = merged.get(key)
+                if total is None:
+                    total = merged[key] = _Series(len(self.latency_buckets), len(self.size_buckets))
+                total.latency = [a + b for a, b in zip(total.latency, series.latency)]
+                total.latency_sum += series.latency_sum
+                total.size = [a + b for a, b in zip(total.size, series.size)]
+                total.size_sum += series.size_sum
+            for method, count in list(shard.in_flight.items()):
+                in_flight[method] += count
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+        return merged, in_flight, counters
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        merged, in_flight, counters = self._merge()
+        lines = []
+
+        def histogram(name: str, help: str, buckets: Sequence[float], attribute: str) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route, status), series in sorted(merged.items()):
+                labels = _labels(method=method, route=route, status=status)
+                counts = getattr(series, attribute)
+                cumulative = 0
+                for bound, count in zip(buckets, counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {getattr(series, attribute + '_sum')}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route and status.",
+            self.latency_buckets,
+            "latency"
+        )
+        histogram(
+            "http_response_size_bytes",
+            "HTTP response body size by route and status.",
+            self.size_buckets,
+            "size"
+        )
+        lines.append("# HELP http_requests_in_flight HTTP requests currently being served.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for method, count in sorted(in_flight.items()):
+            lines.append(f"http_requests_in_flight{{{_labels(method=method)}}} {count}")
+        for name, help in self._counters.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"{name}{{{_labels(**dict(labels))}}} {value}")
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry shared by the middleware and the /metrics endpoint
+registry = MetricsRegistry()
@@ -0,0 +1,128 @@
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from redis import Redis
+from redis.exceptions import ResponseError
+from app.core.celery import celery_app
+from app.core.config import settings
+from app.core.order_numbers import order_numbers
+
+STREAM_KEY = "orders:intake"
+GROUP = "order-materializers"
+STATUS_KEY = "order_intake:{}"
+CHANNEL = "order_intake:{}"
+
+# Intake lifecycle: queued -> created | rejected
+QUEUED = "queued"
+CREATED = "created"
+REJECTED = "rejected"
+
+class OrderIntake:
+    """Durable intake queue for orders accepted with 202
+
+    Accepted orders are appended to a Redis stream together with their queued
+    status in a single MULTI round trip. Celery workers read the stream through
+    a consumer group, materialize orders in batches and publish the outcome on
+    a per-reference channel that status requests can wait on.
+
+    Each entry is given its order number when accepted. The order is created
+    under that number, so an entry redelivered after a worker died between
+    committing the order and recording the outcome is recognized instead of
+    creating a second order.
+    """
+
+    def __init__(self, redis: Redis, status_ttl: int = 86400):
+        self.redis = redis
+        self.status_ttl = status_ttl
+
+    def enqueue(self, customer_id: int, payload: Dict[str, Any]) -> str:
+        """Queue a validated order and return its reference"""
+        reference = uuid.uuid4().hex
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.xadd(STREAM_KEY, {
+            "reference": reference,
+            "customer_id": customer_id,
+            "order_number": order_numbers.next(),
+            "payload": json.dumps(payload),
+        })
+        pipeline.set(
+            STATUS_KEY.format(reference),
+            json.dumps({"reference": reference, "customer_id": customer_id, "status": QUEUED}),
+            ex=self.status_ttl
+        )
+        pipeline.execute()
+        return reference
+
+    def get_status(self, reference: str) -> Optional[Dict[str, Any]]:
+        status = self.redis.get(STATUS_KEY.format(reference))
+        return json.loads(status) if status else None
+
+    def wait_for_status(self, reference: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the status once it leaves queued, or the current one after timeout"""
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CHANNEL.format(reference))
+        try:
+            deadline = time.monotonic() + timeout
+            status = self.get_status(reference)
+            while status and status["status"] == QUEUED:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = pubsub.get_message(timeout=remaining)
+                if message is not None:
+                    status = json.loads(message["data"])
+            return status
+        finally:
+            pubsub.close()
+
+    def set_result(self, reference: str, customer_id: int, status: str, **fields: Any) -> None:
+        """Record the outcome of a materialized entry and notify waiting clients"""
+        result = json.dumps({"reference": reference, "customer_id": customer_id, "status": status, **fields})
+        pipeline = self.redis.pipeline()
+        pipeline.set(STATUS_KEY.format(reference), result, ex=self.status_ttl)
+        pipeline.publish(CHANNEL.format(reference), result)
+        pipeline.execute()
+
+    def _ensure_group(self) -> None:
+        try:
+            self.redis.xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read_batch(self, consumer: str, count: int, min_idle_ms: int = 60000) -> List[Tuple[str, Dict[str, Any]]]:
+        """Claim entries abandoned by dead consumers, then read new ones"""
+        self._ensure_group()
+        _, claimed, *_ = self.redis.xautoclaim(
+            STREAM_KEY, GROUP, consumer, min_idle_time=min_idle_ms, start_id="0-0", count=count
+        )
+        entries = [entry for entry in claimed if entry[1]]
+        if len(entries) < count:
+            for _, stream_entries in self.redis.xreadgroup(
+                GROUP, consumer, {STREAM_KEY: ">"}, count=count - len(entries)
+            ) or []:
+                entries.extend(stream_entries)
+        return [
+            (
+                entry_id.decode(),
+                {
+                    "reference": fields[b"reference"].decode(),
+                    "customer_id": int(fields[b"customer_id"]),
+                    # Absent from entries queued before order numbers were assigned at intake
+                    "order_number": fields[b"order_number"].decode() if b"order_number" in fields else None,
+                    "payload": json.loads(fields[b"payload"]),
+                }
+            )
+            for entry_id, fields in entries
+        ]
+
+    def ack(self, entry_ids: List[str]) -> None:
+        if entry_ids:
+            pipeline = self.redis.pipeline()
+            pipeline.xack(STREAM_KEY, GROUP, *entry_ids)
+            pipeline.xdel(STREAM_KEY, *entry_ids)
+            pipeline.execute()
+
+# Shared intake queue on the Redis used for product caching
+order_intake = OrderIntake(celery_app.backend.client, status_ttl=settings.ORDER_INTAKE_STATUS_TTL_SECONDS)
@@ -0,0 +1,183 @@
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Iterator, Optional, Tuple
+from redis import Redis
+from app.core.celery import celery_app
+from app.core.config import settings
+
+# 41 bits of milliseconds since EPOCH_MS, 10 bits of worker id, 12 bits of sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, so numbers survive being read aloud
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+DECODE = {char: value for value, char in enumerate(ALPHABET)}
+PREFIX = "QS"
+
+LEASE_KEY = "order_numbers:worker:{}"
+
+# Extend a lease only while this process still holds it
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Two base32 digits per 10 bits, so encoding is seven lookups
+PAIRS = [first + second for first in ALPHABET for second in ALPHABET]
+
+def encode(value: int) -> str:
+    """Fixed-width base32 form of an id; sorts like the integer"""
+    return "".join((
+        PREFIX,
+        ALPHABET[value >> 60],
+        PAIRS[(value >> 50) & 1023],
+        PAIRS[(value >> 40) & 1023],
+        PAIRS[(value >> 30) & 1023],
+        PAIRS[(value >> 20) & 1023],
+        PAIRS[(value >> 10) & 1023],
+        PAIRS[value & 1023],
+    ))
+
+def decode(order_number: str) -> int:
+    value = 0
+    for char in order_number[len(PREFIX):].upper():
+        value = (value << 5) | DECODE[char]
+    return value
+
+class SnowflakeGenerator:
+    """Time-ordered 63-bit ids for a single worker id
+
+    Each millisecond is a block with its own atomic counter, so the hot path
+    reads the clock and takes the next sequence without a lock; only moving
+    to a new block is serialized. When the clock stalls or steps back, or a
+    block runs out of sequence numbers, the generator continues on a logical
+    clock ahead of the wall clock instead of sleeping. Ids increase within
+    each thread and never repeat.
+    """
+
+    def __init__(self, worker_id: int, clock: Callable[[], int] = time.time_ns):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (milliseconds, id without sequence, sequence counter); starts exhausted
+        self._block = (-1, 0, itertools.count(MAX_SEQUENCE + 1))
+
+    def _advance(self, block: Tuple[int, int, Iterator[int]], now: int) -> Tuple[int, int, Iterator[int]]:
+        with self._lock:
+            if self._block is block:
+                ms = max(now, block[0] + 1)
+                self._block = (
+                    ms,
+                    (ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS),
+                    itertools.count()
+                )
+            return self._block
+
+    def next_id(self) -> int:
+        now = self._clock() // 1_000_000 - EPOCH_MS
+        block = self._block
+        if now > block[0]:
+            block = self._advance(block, now)
+        sequence = next(block[2])
+        while sequence > MAX_SEQUENCE:
+            block = self._advance(block, now)
+            sequence = next(block[2])
+        return block[1] | sequence
+
+class WorkerIdLease:
+    """Exclusive worker id held in Redis for ttl seconds and renewed in the background"""
+
+    def __init__(self, redis: Redis, ttl: int = 60):
+        self.redis = redis
+        self.ttl = ttl
+        self.worker_id: Optional[int] = None
+        self._token = uuid.uuid4().hex
+        self._renew = redis.register_script(RENEW_SCRIPT)
+        self._stopped = threading.Event()
+
+    def acquire(self) -> int:
+        start = random.randint(0, MAX_WORKER_ID)
+        for offset in range(MAX_WORKER_ID + 1):
+            worker_id = (start + offset) & MAX_WORKER_ID
+            if self.redis.set(LEASE_KEY.format(worker_id), self._token, nx=True, ex=self.ttl):
+                self.worker_id = worker_id
+                self._stopped.clear()
+                threading.Thread(target=self._keep_alive, daemon=True).start()
+                return worker_id
+        raise RuntimeError("No order number worker id is free")
+
+    def renew(self) -> bool:
+        """Extend the lease; False once it has been lost"""
+        if self.worker_id is None:
+            return False
+        if self._renew(keys=[LEASE_KEY.format(self.worker_id)], args=[self._token, self.ttl]):
+            return True
+        self.worker_id = None
+        return False
+
+    def release(self) -> None:
+        self._stopped.set()
+        if self.worker_id is not None:
+            self.redis.eval(
+                "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0",
+                1, LEASE_KEY.format(self.worker_id), self._token
+            )
+            self.worker_id = None
+
+    def _keep_alive(self) -> None:
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                if not self.renew():
+                    return
+            except Exception:
+                # Redis blips are retried on the next tick; the lease outlives a few misses
+                continue
+
+class OrderNumberGenerator:
+    """Order numbers from a Snowflake generator bound to a leased worker id
+
+    The worker id is leased on first use, so importing the module never
+    touches Redis. Forked children (e.g. Celery prefork workers) drop the
+    inherited generator and lease their own id.
+    """
+
+    def __init__(self, redis: Redis, lease_ttl: int = 60):
+        self.redis = redis
+        self.lease_ttl = lease_ttl
+        self._lease: Optional[WorkerIdLease] = None
+        self._generator: Optional[SnowflakeGenerator] = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._lease = None
+        self._generator = None
+
+    def _bind(self) -> SnowflakeGenerator:
+        with self._lock:
+            if self._generator is None or self._lease.worker_id is None:
+                self._lease = WorkerIdLease(self.redis, ttl=self.lease_ttl)
+                self._generator = SnowflakeGenerator(self._lease.acquire())
+            return self._generator
+
+    def next(self) -> str:
+        generator = self._generator
+        if generator is None or self._lease.worker_id is None:
+            generator = self._bind()
+        return encode(generator.next_id())
+
+# Shared generator on the Redis used for product caching
+order_numbers = OrderNumberGenerator(celery_app.backend.client, lease_ttl=settings.ORDER_NUMBER_LEASE_SECONDS)
@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+import sqlite3
+from collections import Counter, defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+
+from app.crud.payment import payment as crud_payment
+from app.models.payment import PaymentStatus
+
+# Processor settlement statuses and the payment status each one means
+SETTLEMENT_STATUSES = {
+    "settled": PaymentStatus.COMPLETED,
+    "completed": PaymentStatus.COMPLETED,
+    "failed": PaymentStatus.FAILED,
+    "declined": PaymentStatus.FAILED,
+    "refunded": PaymentStatus.REFUNDED,
+}
+# Status changes a settlement may apply; anything else is a discrepancy
+TRANSITIONS = {
+    PaymentStatus.PENDING: {PaymentStatus.COMPLETED, PaymentStatus.FAILED, PaymentStatus.REFUNDED},
+    PaymentStatus.COMPLETED: {PaymentStatus.REFUNDED},
+}
+REPORT_COLUMNS = (
+    "line", "transaction_id", "reason", "payment_id",
+    "amount", "settled_amount", "status", "settled_status",
+)
+# Amounts closer than this are the same amount
+AMOUNT_TOLERANCE = 0.005
+
+# Line number and the raw record, or None for a line that could not be parsed
+SettlementLine = Tuple[int, Optional[Dict]]
+
+def read_settlement(path: str, format: Optional[str] = None) -> Iterator[SettlementLine]:
+    """Stream a settlement file as (line, record), from CSV with a header or NDJSON
+
+    The format is taken from the file extension unless given.
+    """
+    format = format or ("csv" if path.endswith(".csv") else "ndjson")
+    with open(path, newline="" if format == "csv" else None, encoding="utf-8") as settlement:
+        if format == "csv":
+            reader = csv.DictReader(settlement)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line, text in enumerate(settlement, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                record = None
+            yield line, record if isinstance(record, dict) else None
+
+def _parse(record: Optional[Dict]) -> Optional[Tuple[str, float, Optional[PaymentStatus], str]]:
+    try:
+        transaction_id = str(record["transaction_id"]).strip()
+        settled_status = str(record["status"]).strip().lower()
+        amount = float(record["amount"])
+    except (TypeError, KeyError, ValueError):
+        return None
+    if not transaction_id:
+        return None
+    return transaction_id, amount, SETTLEMENT_STATUSES.get(settled_status), settled_status
+
+class SettlementReconciler:
+    """Matches a processor settlement file against payments, chunk by chunk
+
+    Each chunk of lines is looked up with one IN query on transaction_id,
+    then the status changes it settles are applied with one UPDATE per
+    (from, to) pair and committed. Lines that do not match are written to
+    the report as they are found, so memory is bounded by chunk_size
+    whatever the size of the file.
+
+    Transaction ids already reconciled are kept in a private on-disk SQLite
+    database, so a line repeating one from an earlier chunk is reported as
+    a duplicate rather than matched again.
+    """
+
+    def __init__(self, db: Session, report, chunk_size: int = 5000):
+        self.db = db
+        self.report = csv.writer(report)
+        self.report.writerow(REPORT_COLUMNS)
+        self.chunk_size = chunk_size
+        self.summary: Counter = Counter()
+        # An empty path is a temporary database SQLite deletes on close
+        self.seen = sqlite3.connect("")
+        self.seen.execute("CREATE TABLE seen (transaction_id TEXT PRIMARY KEY)")
+        self.seen.execute("CREATE TABLE chunk (transaction_id TEXT PRIMARY KEY)")
+
+    def close(self) -> None:
+        self.seen.close()
+
+    def _seen_before(self, transaction_ids: Iterable[str]) -> Set[str]:
+        """Record a chunk's transaction ids, returning those seen in earlier chunks"""
+        self.seen.executemany("INSERT INTO chunk VALUES (?)", ((id,) for id in transaction_ids))
+        repeated = {
+            id for (id,) in self.seen.execute("SELECT transaction_id FROM chunk JOIN seen USING (transaction_id)")
+        }
+        self.seen.execute("INSERT OR IGNORE INTO seen SELECT transaction_id FROM chunk")
+        self.seen.execute("DELETE FROM chunk")
+        self.seen.commit()
+        return repeated
+
+    def _discrepancy(self, reason: str, line=None, transaction_id=None, payment=None, settled=None) -> None:
+        self.summary[reason] += 1
+        payment_id, amount, status = payment or (None, None, None)
+        settled_amount, settled_status = settled or (None, None)
+        self.report.writerow((
+            line, transaction_id, reason, payment_id, amount, settled_amount,
+            status.value if status is not None else None, settled_status,
+        ))
+
+    def reconcile(self, lines: Iterator[SettlementLine]) -> Counter:
+        while True:
+            chunk = list(islice(lines, self.chunk_size))
+            if not chunk:
+                return self.summary
+            self._reconcile_chunk(chunk)
+
+    def _reconcile_chunk(self, chunk: List[SettlementLine]) -> None:
+        settled = {}
+        for line, record in chunk:
+            self.summary["lines"] += 1
+            parsed = _parse(record)
+            if parsed is None:
+                self._discrepancy("malformed", line)
+            elif parsed[0] in settled:
+                self._discrepancy("duplicate", line, parsed[0], settled=parsed[1:2] + parsed[3:])
+            else:
+                settled[parsed[0]] = (line,) + parsed[1:]
+        for transaction_id in self._seen_before(settled):
+            line, settled_amount, _, settled_status = settled.pop(transaction_id)
+            self._discrepancy("duplicate", line, transaction_id, settled=(settled_amount, settled_status))
+
+        payments = {
+            transaction_id: (payment_id, amount, status)
+            for payment_id, transaction_id, amount, status
+            in crud_payment.get_by_transaction_ids(self.db, settled)
+        }
+        transitions = defaultdict(list)
+        for transaction_id, (line, settled_amount, target, settled_status) in settled.items():
+            payment = payments.get(transaction_id)
+            details = dict(
+                line=line,
+                transaction_id=transaction_id,
+                payment=payment,
+                settled=(settled_amount, settled_status)
+            )
+            if payment is None:
+                self._discrepancy("unknown_transaction", **details)
+            elif target is None:
+                self._discrepancy("unknown_status", **details)
+            elif abs(payment[1] - settled_amount) > AMOUNT_TOLERANCE:
+                self._discrepancy("amount_mismatch", **details)
+            elif payment[2] == target:
+                self.summary["matched"] += 1
+            elif target in TRANSITIONS.get(payment[2], ()):
+                transitions[payment[2], target].append(payment[0])
+            else:
+                self._discrepancy("status_conflict", **details)
+
+        for (from_status, to_status), ids in transitions.items():
+            updated = crud_payment.bulk_update_status(self.db, ids, from_status=from_status, to_status=to_status)
+            self.summary["updated"] += updated
+            # Payments changed by someone else since the lookup are checked again next run
+            self.summary["changed_concurrently"] += len(ids) - updated
+        self.db.commit()
+
+    def report_unsettled(self, created_before: datetime, batch_size: int = 1000) -> None:
+        """Report payments still pending that were created before the cutoff"""
+        columns = [column.key for column in crud_payment.export_columns]
+        for row in crud_payment.stream_rows(
+            self.db, status=PaymentStatus.PENDING, created_before=created_before, batch_size=batch_size
+        ):
+            payment = dict(zip(columns, row))
+            self._discrepancy(
+                "missing_from_settlement",
+                transaction_id=payment["transaction_id"],
+                payment=(payment["id"], payment["amount"], payment["status"])
+            )
+
+def reconcile_settlement(
+    db: Session,
+    settlement_path: str,
+    report_path: str,
+    *,
+    format: Optional[str] = None,
+    chunk_size: int = 5000,
+    unsettled_before: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Reconcile a settlement file, writing discrepancies to a CSV report; returns counts by outcome"""
+    directory = os.path.dirname(report_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(report_path, "w", newline="", encoding="utf-8") as report:
+        reconciler = SettlementReconciler(db, report, chunk_size)
+        try:
+            reconciler.reconcile(read_settlement(settlement_path, format))
+            if unsettled_before is not None:
+                reconciler.report_unsettled(unsettled_before, chunk_size)
+        finally:
+            reconciler.close()
+    return dict(reconciler.summary)
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# One compiled adapter per response type, built on first use
+_adapters: Dict[Any, TypeAdapter] = {}
+
+def get_type_adapter(response_type: Any) -> TypeAdapter:
+    """Return the cached TypeAdapter for a response type"""
+    adapter = _adapters.get(response_type)
+    if adapter is None:
+        adapter = _adapters[response_type] = TypeAdapter(response_type)
+    return adapter
+
+def serialize(response_type: Any, content: Any) -> bytes:
+    """Validate ORM objects once against a schema and dump them straight to JSON bytes"""
+    adapter = get_type_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+class PrevalidatedJSONResponse(Response):
+    """JSON response whose body has already been validated and serialized
+
+    Returning a Response instance from an endpoint makes FastAPI skip its own
+    response_model validation and jsonable_encoder pass, so the body is only
+    processed once.
+    """
+    media_type = "application/json"
+
+def fast_json_response(response_type: Any, content: Any, **kwargs: Any) -> PrevalidatedJSONResponse:
+    """Build a response for content serialized through the compiled schema adapter"""
+    return PrevalidatedJSONResponse(serialize(response_type, content), **kwargs)
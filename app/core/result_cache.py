@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from redis import Redis
+from app.core.celery import celery_app
+from app.core.config import settings
+
+class ResultCache:
+    """Shared cache of computed results with single-flight recomputation
+
+    An entry is fresh until the end of its ttl-sized time bucket, so every
+    worker agrees on when it expires. Once it expires, one caller takes a
+    short Redis lock and recomputes it. With stale-while-revalidate the
+    other callers get the previous value during that time. Without it, or
+    when no value exists, they wait for the new one.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        stale_ttl: int = 300,
+        lock_ttl: int = 30,
+        wait_timeout: float = 10,
+        poll_interval: float = 0.05
+    ):
+        self.redis = redis
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def key(namespace: str, params: Dict[str, Any]) -> str:
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        return f"results:{namespace}:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.redis.get(key)
+        if entry is None:
+            return None
+        data = json.loads(entry)
+        return data["value"], data["fresh_until"]
+
+    def _write(self, key: str, value: Any, ttl: int) -> None:
+        fresh_until = (time.time() // ttl + 1) * ttl
+        self.redis.set(
+            key,
+            json.dumps({"value": value, "fresh_until": fresh_until}, default=str),
+            exat=int(fresh_until) + max(self.stale_ttl, 1)
+        )
+
+    async def _recompute(self, key: str, ttl: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            self._write(key, value, ttl)
+            return value
+        finally:
+            self.redis.delete(f"{key}:lock")
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int
+    ) -> Any:
+        key = self.key(namespace, params)
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            entry = self._read(key)
+            if entry is not None and entry[1] > time.time():
+                return entry[0]
+            if self.redis.set(f"{key}:lock", 1, nx=True, ex=self.lock_ttl):
+                return await self._recompute(key, ttl, compute)
+            # Someone else is recomputing
+            if entry is not None and self.stale_ttl > 0:
+                return entry[0]
+            if time.monotonic() >= deadline:
+                # The recomputing worker is stuck; compute without caching
+                return await compute()
+            await asyncio.sleep(self.poll_interval)
+
+def cached_result(
+    namespace: str,
+    ttl: int,
+    exclude: Iterable[str] = ("db", "current_user"),
+    cache: Optional[ResultCache] = None
+) -> Callable:
+    """Cache an async endpoint's result keyed by its parameters
+
+    Dependencies named in exclude are not part of the key. The wrapped
+    endpoint keeps its signature, so FastAPI resolves parameters as before,
+    and the uncached function stays available as __wrapped__.
+    """
+    exclude = set(exclude)
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> Any:
+            if not settings.RESULT_CACHE_ENABLED:
+                return await func(**kwargs)
+            params = {name: value for name, value in kwargs.items() if name not in exclude}
+            return await (cache or result_cache).get_or_compute(
+                namespace, params, lambda: func(**kwargs), ttl
+            )
+        return wrapper
+    return decorator
+
+# Shared cache on the Redis used for product caching
+result_cache = ResultCache(
+    celery_app.backend.client,
+    stale_ttl=settings.RESULT_CACHE_STALE_SECONDS,
+    lock_ttl=settings.RESULT_CACHE_LOCK_SECONDS,
+    wait_timeout=settings.RESULT_CACHE_WAIT_SECONDS
+)
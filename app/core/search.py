@@ -0,0 +1,120 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+class InvertedIndex:
+    """In-memory inverted index over product names and descriptions
+
+    Used as the full-text search backend when the database is not PostgreSQL
+    (e.g. the SQLite test database). Matching uses AND semantics over the query
+    terms, like websearch_to_tsquery, and hits are ranked with BM25.
+    """
+
+    # BM25 tuning constants
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        # term -> {product_id: term frequency}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        # product_id -> (category, document length, terms)
+        self._documents: Dict[int, Tuple[Optional[str], int, Set[str]]] = {}
+        self._total_length = 0
+
+    def build(self, rows: Iterable[Tuple[int, str, Optional[str], Optional[str], bool]]) -> None:
+        """Rebuild the index from (id, name, description, category, is_active) rows"""
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._total_length = 0
+            for row in rows:
+                self._add(*row)
+            self.built = True
+
+    def add(self, id: int, name: str, description: Optional[str], category: Optional[str], is_active: bool = True) -> None:
+        """Index a product, replacing any previous entry for the same id"""
+        with self._lock:
+            self._discard(id)
+            self._add(id, name, description, category, is_active)
+
+    def discard(self, id: int) -> None:
+        """Remove a product from the index if present"""
+        with self._lock:
+            self._discard(id)
+
+    def _add(self, id: int, name: str, description: Optional[str], category: Optional[str], is_active: bool) -> None:
+        if not is_active:
+            return
+        terms = Counter(tokenize(name) + tokenize(description))
+        for term, frequency in terms.items():
+            self._postings[term][id] = frequency
+        length = sum(terms.values())
+        self._documents[id] = (category, length, set(terms))
+        self._total_length += length
+
+    def _discard(self, id: int) -> None:
+        document = self._documents.pop(id, None)
+        if document is None:
+            return
+        _, length, terms = document
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= length
+
+    def search(self, query: str, category: Optional[str] = None) -> Tuple[List[Tuple[int, float]], Dict[str, int]]:
+        """Return ranked (product_id, score) hits and per-category facet counts
+
+        Facets are counted over every match; the category filter only narrows
+        the returned hits.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._documents:
+                return [], {}
+            postings = [self._postings.get(term, {}) for term in terms]
+            postings.sort(key=len)
+            # Intersect starting from the rarest term
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches.intersection_update(posting)
+                if not matches:
+                    return [], {}
+
+            count = len(self._documents)
+            average_length = self._total_length / count
+            scores = []
+            facets: Counter = Counter()
+            for id in matches:
+                document_category, length, _ = self._documents[id]
+                facets[document_category or ""] += 1
+                if category is not None and document_category != category:
+                    continue
+                score = 0.0
+                for posting in postings:
+                    frequency = posting[id]
+                    idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    norm = frequency + self.k1 * (1 - self.b + self.b * length / average_length)
+                    score += idf * frequency * (self.k1 + 1) / norm
+                scores.append((id, score))
+
+        scores.sort(key=lambda hit: (-hit[1], hit[0]))
+        return scores, dict(facets)
+
+# Process-wide fallback index used by CRUDProduct.search
+product_index = InvertedIndex()
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.crud.product import product as crud_product
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def load_product_autocomplete() -> None:
+    """Build the in-process autocomplete index from the database"""
+    db = SessionLocal()
+    try:
+        crud_product.load_autocomplete(db)
+    except Exception as e:
+        # Suggestions fill in incrementally as products are written
+        logger.error(f"Error loading autocomplete index: {str(e)}")
+    finally:
+        db.close()
+
+async def refresh_product_autocomplete(interval: float) -> None:
+    """Reload the index periodically, picking up products and sales from other workers"""
+    while True:
+        await asyncio.sleep(interval)
+        await run_in_threadpool(load_product_autocomplete)
+
+@asynccontextmanager
+async def autocomplete_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Load the autocomplete index before an app serves traffic and keep it fresh"""
+    await run_in_threadpool(load_product_autocomplete)
+    refresh = None
+    if settings.AUTOCOMPLETE_REFRESH_SECONDS > 0:
+        refresh = asyncio.create_task(refresh_product_autocomplete(settings.AUTOCOMPLETE_REFRESH_SECONDS))
+    app.state.autocomplete_refresh = refresh
+    try:
+        yield
+    finally:
+        if refresh is not None:
+            refresh.cancel()
@@ -1,5 +1,6 @@
 from app.crud.crud_user import user as crud_user
 from app.crud.order import order as crud_order
 from app.crud.product import product as crud_product
+from app.crud.payment import payment as crud_payment
 
-__all__ = ["crud_user", "crud_order", "crud_product"]
\ No newline at end of file
+__all__ = ["crud_user", "crud_order", "crud_product", "crud_payment"]
\ No newline at end of file
@@ -1,14 +1,51 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from app.models.order import Order, OrderStatus
+from app.models.order import Order, OrderNumber, OrderStatus
 from app.models.order_item import OrderItem
 from app.models.product import Product
 from app.schemas.order import OrderCreate, OrderUpdate
+from app.analytics.leaderboard import leaderboard
+from app.analytics.processing_times import processing_times
+from app.analytics.uniques import distinct_counters
+from app.core.autocomplete import product_autocomplete
+from app.core.config import settings
+from app.core.inventory import reservations
+from app.core.order_numbers import order_numbers
+from app.crud.product import product as crud_product
+
+# Columns emitted by exports, in output order
+EXPORT_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.user_id,
+    Order.total_amount,
+    Order.status,
+    Order.payment_method,
+    Order.created_at,
+    Order.updated_at,
+)
 
 class CRUDOrder:
+    export_columns = EXPORT_COLUMNS
+
     def get(self, db: Session, id: int) -> Optional[Order]:
         return db.query(Order).filter(Order.id == id).first()
 
+    def get_by_order_number(self, db: Session, order_number: str) -> Optional[Order]:
+        return db.query(Order).filter(Order.order_number == order_number).first()
+
+    def get_version(self, db: Session, id: int) -> Optional[Tuple[int, str]]:
+        """Owner and version token of an order, read without loading the full row"""
+        row = (
+            db.query(Order.user_id, Order.updated_at, Order.created_at)
+            .filter(Order.id == id)
+            .first()
+        )
+        if row is None:
+            return None
+        return row.user_id, (row.updated_at or row.created_at).isoformat()
+
     def get_multi(
         self,
         db: Session,
@@ -19,54 +56,127 @@ class CRUDOrder:
     ) -> List[Order]:
         query = db.query(Order)
         if customer_id:
-            query = query.filter(Order.customer_id == customer_id)
+            query = query.filter(Order.user_id == customer_id)
         return query.offset(skip).limit(limit).all()
 
+    def stream_rows(
+        self,
+        db: Session,
+        *,
+        status: Optional[OrderStatus] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple]:
+        """Stream orders as plain tuples through a server-side cursor
+
+        Only the export columns are selected, so no ORM objects are built and
+        memory stays flat for arbitrarily large histories.
+        """
+        query = db.query(*self.export_columns).order_by(Order.id)
+        if status is not None:
+            query = query.filter(Order.status == status)
+        for row in query.yield_per(batch_size):
+            yield tuple(row)
+
+    def validate(self, db: Session, *, obj_in: OrderCreate) -> None:
+        """Check an order against cached product data before accepting it
+
+        Cached stock may be stale, so this only rejects orders that cannot
+        succeed; the authoritative check runs when the order is created.
+        """
+        quantities = {}
+        for item in obj_in.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        products = crud_product.get_many(db, list(quantities))
+        for (product_id, quantity), product in zip(quantities.items(), products):
+            if not product or product.stock < quantity:
+                raise ValueError(f"Product {product_id} not available in requested quantity")
+
     def create(
         self,
         db: Session,
         *,
         obj_in: OrderCreate,
-        customer_id: int
+        customer_id: int,
+        order_number: Optional[str] = None
     ) -> Order:
         total_amount = 0.0
         # Create order first
         db_obj = Order(
-            customer_id=customer_id,
+            order_number=order_number or order_numbers.next(),
+            user_id=customer_id,
             shipping_address=obj_in.shipping_address,
             status=OrderStatus.PENDING,
             total_amount=total_amount
         )
-        db.add(db_obj)
-        db.flush()
+        # Reserve stock of hot products in Redis, keeping their rows unlocked
+        reservation_id, reserved = None, set()
+        # Products whose rows had stock taken, by id, with their category
+        stock_changed = {}
+        sold_out = set()
+        if settings.INVENTORY_RESERVATIONS_ENABLED:
+            lines = {}
+            for item in obj_in.items:
+                lines[item.product_id] = lines.get(item.product_id, 0) + item.quantity
+            reservation = reservations.reserve(lines)
+            if reservation is None:
+                raise ValueError("Products not available in requested quantity")
+            reservation_id, reserved = reservation
+            if reserved:
+                db_obj.reservation_id = reservation_id
 
-        # Create order items and calculate total
-        for item in obj_in.items:
-            product = db.query(Product).get(item.product_id)
-            if not product or product.stock < item.quantity:
-                db.rollback()
-                raise ValueError(f"Product {item.product_id} not available in requested quantity")
-            
-            item_total = product.price * item.quantity
-            order_item = OrderItem(
-                order_id=db_obj.id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                unit_price=product.price,
-                total_price=item_total
-            )
-            total_amount += item_total
-            
-            # Update product stock
-            product.stock -= item.quantity
-            db.add(product)
-            db.add(order_item)
-
-        # Update order total
-        db_obj.total_amount = total_amount
-        db.add(db_obj)
-        db.commit()
+        try:
+            db.add(db_obj)
+            # Conflicts with an order of the same number in any partition
+            db.add(OrderNumber(order_number=db_obj.order_number))
+            db.flush()
+
+            # Create order items and calculate total
+            for item in obj_in.items:
+                product = db.query(Product).get(item.product_id)
+                if not product or (item.product_id not in reserved and product.stock < item.quantity):
+                    db.rollback()
+                    raise ValueError(f"Product {item.product_id} not available in requested quantity")
+                
+                item_total = product.price * item.quantity
+                order_item = OrderItem(
+                    order_id=db_obj.id,
+                    product_id=item.product_id,
+                    quantity=item.quantity,
+                    unit_price=product.price,
+                    subtotal=item_total,
+                    final_price=item_total
+                )
+                total_amount += item_total
+                
+                # Reserved stock is committed when the order is confirmed
+                if item.product_id not in reserved:
+                    if product.stock > 0 >= product.stock - item.quantity:
+                        sold_out.add(product.id)
+                    product.stock -= item.quantity
+                    db.add(product)
+                    stock_changed[product.id] = product.category
+                db.add(order_item)
+
+            # Update order total
+            db_obj.total_amount = total_amount
+            db.add(db_obj)
+            db.commit()
+        except Exception:
+            if reserved:
+                reservations.release(reservation_id)
+            raise
         db.refresh(db_obj)
+        crud_product.stock_changed(stock_changed, sold_out)
+
+        # Feed sales popularity into autocomplete ranking and the best-seller leaderboard
+        for item in obj_in.items:
+            product_autocomplete.bump(item.product_id, item.quantity)
+        leaderboard.record_order(db_obj)
+        distinct_counters.record(
+            customer_id,
+            {item.product_id for item in obj_in.items},
+            (db_obj.created_at or datetime.utcnow()).date()
+        )
         return db_obj
 
     def update(
@@ -77,33 +187,94 @@ class CRUDOrder:
         obj_in: OrderUpdate
     ) -> Order:
         update_data = obj_in.dict(exclude_unset=True)
+        previous_status = db_obj.status
+        status = update_data.get("status", previous_status)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        if status == OrderStatus.DELIVERED and previous_status != OrderStatus.DELIVERED:
+            processing_times.record_order(db_obj)
+        # Cancelled orders leave the best-seller ranking, and re-enter it if reinstated
+        if (status == OrderStatus.CANCELLED) != (previous_status == OrderStatus.CANCELLED):
+            leaderboard.record_order(db_obj, sign=-1 if status == OrderStatus.CANCELLED else 1)
+        return db_obj
+
+    def confirm_reservation(self, db: Session, *, db_obj: Order) -> Order:
+        """Commit an order's reserved stock to the products table
+
+        Called when the order is confirmed. The decrement is a single
+        set-based UPDATE per product, outside the checkout request.
+        """
+        if not db_obj.reservation_id:
+            return db_obj
+        lines = reservations.commit(db_obj.reservation_id)
+        if not lines:
+            raise ValueError(f"Stock reservation for order {db_obj.id} has expired")
+        for product_id, quantity in lines.items():
+            db.query(Product).filter(Product.id == product_id).update(
+                {Product.stock: Product.stock - quantity},
+                synchronize_session=False
+            )
+        db_obj.reservation_id = None
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        rows = db.query(Product.id, Product.category, Product.stock).filter(Product.id.in_(lines)).all()
+        crud_product.stock_changed(
+            {id: category for id, category, _ in rows},
+            [id for id, _, stock in rows if stock <= 0 < stock + lines[id]]
+        )
         return db_obj
 
     def cancel_order(
         self,
         db: Session,
         *,
-        db_obj: Order
+        db_obj: Order,
+        released: Optional[Dict[int, int]] = None
     ) -> Order:
+        """Cancel a pending order and give its stock back
+
+        released holds the reservation lines when the caller has already
+        returned them to the Redis mirror, as the expiry sweeper does.
+        """
         if db_obj.status != OrderStatus.PENDING:
             raise ValueError("Only pending orders can be cancelled")
         
+        # Units held in a reservation go back to the Redis mirror
+        if db_obj.reservation_id:
+            if released is None:
+                released = reservations.release(db_obj.reservation_id)
+            db_obj.reservation_id = None
+        released = released or {}
+
         # Restore product stock
+        stock_changed = {}
+        restocked = set()
         for item in db_obj.items:
+            if item.product_id in released:
+                continue
             product = db.query(Product).get(item.product_id)
             if product:
+                if product.stock <= 0 < product.stock + item.quantity:
+                    restocked.add(product.id)
                 product.stock += item.quantity
                 db.add(product)
+                stock_changed[product.id] = product.category
+                if reservations.is_mirrored(item.product_id):
+                    reservations.adjust(item.product_id, item.quantity)
         
         db_obj.status = OrderStatus.CANCELLED
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        crud_product.stock_changed(stock_changed, restocked)
+
+        for item in db_obj.items:
+            product_autocomplete.bump(item.product_id, -item.quantity)
+        leaderboard.record_order(db_obj, sign=-1)
         return db_obj
 
 order = CRUDOrder()
\ No newline at end of file
@@ -1,9 +1,24 @@
-from typing import List, Optional, Union
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment import PaymentCreate, PaymentUpdate
 
+# Columns emitted by exports, in output order
+EXPORT_COLUMNS = (
+    Payment.id,
+    Payment.order_id,
+    Payment.amount,
+    Payment.payment_method,
+    Payment.status,
+    Payment.transaction_id,
+    Payment.created_at,
+    Payment.updated_at,
+)
+
 class CRUDPayment:
+    export_columns = EXPORT_COLUMNS
+
     def create(self, db: Session, *, obj_in: PaymentCreate) -> Payment:
         """Create a new payment record"""
         db_obj = Payment(
@@ -44,8 +59,63 @@ class CRUDPayment:
         """Get all payments with a specific status"""
         return db.query(Payment).filter(Payment.status == status).all()
 
+    def get_by_transaction_ids(self, db: Session, transaction_ids: Iterable[str]) -> List[Tuple]:
+        """(id, transaction_id, amount, status) of the payments with the given processor ids, in one query"""
+        transaction_ids = list(transaction_ids)
+        if not transaction_ids:
+            return []
+        return [
+            tuple(row)
+            for row in db.query(Payment.id, Payment.transaction_id, Payment.amount, Payment.status)
+            .filter(Payment.transaction_id.in_(transaction_ids))
+            .all()
+        ]
+
+    def bulk_update_status(
+        self,
+        db: Session,
+        ids: Iterable[int],
+        *,
+        from_status: PaymentStatus,
+        to_status: PaymentStatus
+    ) -> int:
+        """Move payments still in from_status to to_status in one UPDATE; returns the rows changed
+
+        Payments whose status changed since they were read are left alone.
+        The caller commits.
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        return (
+            db.query(Payment)
+            .filter(Payment.id.in_(ids), Payment.status == from_status)
+            .update({Payment.status: to_status}, synchronize_session=False)
+        )
+
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Payment]:
         """Get multiple payments with pagination"""
         return db.query(Payment).offset(skip).limit(limit).all()
 
+    def stream_rows(
+        self,
+        db: Session,
+        *,
+        status: Optional[PaymentStatus] = None,
+        created_before: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Tuple]:
+        """Stream payments as plain tuples through a server-side cursor
+
+        Rows are fetched batch_size at a time, so memory stays flat no matter
+        how many payments match.
+        """
+        query = db.query(*self.export_columns).order_by(Payment.id)
+        if status is not None:
+            query = query.filter(Payment.status == status)
+        if created_before is not None:
+            query = query.filter(Payment.created_at < created_before)
+        for row in query.yield_per(batch_size):
+            yield tuple(row)
+
 payment = CRUDPayment()
\ No newline at end of file
@@ -1,61 +1,356 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, literal, literal_column, null, select
 from sqlalchemy.orm import Session
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
 from app.core.celery import celery_app
+from app.core.search import product_index
+from app.core.autocomplete import product_autocomplete
+from app.core.http_cache import bump_version, get_version
+from app.core.inventory import reservations
+from app.core.config import settings
+from app.analytics.leaderboard import leaderboard
 import json
+import math
+import random
+import time
+
+PRODUCT_CACHE_KEY = "product:{}"
+# Columns kept in the product cache: every field of the Product response schema
+CACHED_FIELDS = (
+    "id", "name", "description", "price", "stock", "category", "image_url",
+    "sku", "is_active", "seller_id", "created_at", "updated_at",
+)
+# Cached as ISO 8601 strings
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+def _read_cache_entry(raw: Optional[bytes]) -> Optional[Tuple[Optional[dict], float, float]]:
+    """Decode a cache entry into (product fields or None if missing, load time, expiry)"""
+    if raw is None:
+        return None
+    entry = json.loads(raw)
+    data = entry.get("product")
+    if "expiry" not in entry or (data is not None and not set(CACHED_FIELDS) <= data.keys()):
+        # Written by an older release with fewer fields; reload it as a miss
+        return None
+    return data, entry["delta"], entry["expiry"]
+
+def _cached_product(data: Optional[dict]) -> Optional[Product]:
+    """Rebuild a detached product from cached fields"""
+    if data is None:
+        return None
+    for field in DATETIME_FIELDS:
+        if data[field] is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    return Product(**data)
+
+def _cache_entry(product: Optional[Product], delta: float) -> Tuple[str, int]:
+    """Serialized cache entry and its TTL; a missing product gets a short negative entry"""
+    if product is not None:
+        data = {field: getattr(product, field) for field in CACHED_FIELDS}
+        for field in DATETIME_FIELDS:
+            if data[field] is not None:
+                data[field] = data[field].isoformat()
+        ttl = settings.PRODUCT_CACHE_TTL_SECONDS
+    else:
+        data = None
+        ttl = settings.PRODUCT_NEGATIVE_CACHE_SECONDS
+    return json.dumps({"product": data, "delta": delta, "expiry": time.time() + ttl}), ttl
+
+def _refresh_early(delta: float, expiry: float) -> bool:
+    """XFetch: refresh with a probability rising as expiry nears, scaled by load time"""
+    beta = settings.PRODUCT_CACHE_XFETCH_BETA
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expiry
 
 class CRUDProduct:
     def get(self, db: Session, id: int) -> Optional[Product]:
-        # Try to get product from Redis cache first
+        """Product by id, served from the Redis cache
+
+        Entries are refreshed early with XFetch. The closer an entry is to
+        expiry and the slower it was to load, the likelier a request is to
+        reload it, and a short lock lets only one request do so. On a hard
+        miss the lock holder loads while other requests wait briefly for its
+        result. Missing ids are cached briefly too, so they stop reaching
+        the database. Cache hits are detached copies; write paths load the
+        row with get_for_write instead.
+        """
         redis = celery_app.backend.client
-        cache_key = f"product:{id}"
-        cached_product = redis.get(cache_key)
-        
-        if cached_product:
-            product_data = json.loads(cached_product)
-            return Product(**product_data)
-        
-        # If not in cache, get from database and cache it
+        cache_key = PRODUCT_CACHE_KEY.format(id)
+        lock_key = f"{cache_key}:lock"
+        entry = _read_cache_entry(redis.get(cache_key))
+        if entry is not None:
+            data, delta, expiry = entry
+            if _refresh_early(delta, expiry) and redis.set(lock_key, 1, nx=True, ex=settings.PRODUCT_CACHE_LOCK_SECONDS):
+                return self._load(db, id)
+            return _cached_product(data)
+
+        if redis.set(lock_key, 1, nx=True, ex=settings.PRODUCT_CACHE_LOCK_SECONDS):
+            # The previous lock holder may have rebuilt the entry since the read above
+            entry = _read_cache_entry(redis.get(cache_key))
+            if entry is None:
+                return self._load(db, id)
+            redis.delete(lock_key)
+            return _cached_product(entry[0])
+        # Another request is loading this product; wait briefly for its result
+        deadline = time.monotonic() + settings.PRODUCT_CACHE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = _read_cache_entry(redis.get(cache_key))
+            if entry is not None:
+                return _cached_product(entry[0])
+        return self._load(db, id)
+
+    def _load(self, db: Session, id: int) -> Optional[Product]:
+        """Read a product from the database, cache it and release the rebuild lock"""
+        started = time.perf_counter()
         product = db.query(Product).filter(Product.id == id).first()
-        if product:
-            redis.setex(
-                cache_key,
-                3600,  # Cache for 1 hour
-                json.dumps({
-                    'id': product.id,
-                    'name': product.name,
-                    'description': product.description,
-                    'price': product.price,
-                    'stock': product.stock
-                })
-            )
+        delta = time.perf_counter() - started
+
+        cache_key = PRODUCT_CACHE_KEY.format(id)
+        pipeline = celery_app.backend.client.pipeline()
+        pipeline.set(cache_key, *_cache_entry(product, delta))
+        pipeline.delete(f"{cache_key}:lock")
+        pipeline.execute()
         return product
 
+    def get_for_write(self, db: Session, id: int) -> Optional[Product]:
+        """Product row by id from the session, bypassing the cache"""
+        return db.get(Product, id)
+
+    def get_many(self, db: Session, ids: List[int]) -> List[Optional[Product]]:
+        """Products for ids in the requested order, None where an id does not exist
+
+        Costs at most three round trips whatever the number of ids: one MGET,
+        one IN query for the misses, and one pipeline backfilling the cache,
+        including negative entries for ids that do not exist.
+        """
+        if not ids:
+            return []
+        redis = celery_app.backend.client
+        unique_ids = list(dict.fromkeys(ids))
+        found: Dict[int, Optional[Product]] = {}
+        misses = []
+        for id, raw in zip(unique_ids, redis.mget([PRODUCT_CACHE_KEY.format(id) for id in unique_ids])):
+            entry = _read_cache_entry(raw)
+            if entry is None:
+                misses.append(id)
+            else:
+                found[id] = _cached_product(entry[0])
+
+        if misses:
+            started = time.perf_counter()
+            loaded = {product.id: product for product in db.query(Product).filter(Product.id.in_(misses)).all()}
+            delta = (time.perf_counter() - started) / len(misses)
+            pipeline = redis.pipeline(transaction=False)
+            for id in misses:
+                product = loaded.get(id)
+                pipeline.set(PRODUCT_CACHE_KEY.format(id), *_cache_entry(product, delta))
+                found[id] = product
+            pipeline.execute()
+        return [found[id] for id in ids]
+
+    def get_version(self, db: Session, id: int) -> Optional[str]:
+        """Version token for a single product, used to derive its ETag
+
+        Served from Redis; on a miss only the timestamp columns are read.
+        """
+        def load() -> Optional[str]:
+            row = (
+                db.query(Product.updated_at, Product.created_at)
+                .filter(Product.id == id)
+                .first()
+            )
+            if row is None:
+                return None
+            return (row.updated_at or row.created_at).isoformat()
+
+        return get_version(celery_app.backend.client, f"product_version:{id}", load)
+
+    def get_listing_version(self, category: Optional[str] = None) -> str:
+        """Version token for the catalog listing, optionally per category"""
+        return get_version(celery_app.backend.client, f"catalog_version:{category or '*'}")
+
+    def _bump_versions(self, id: int, *categories: Optional[str]) -> None:
+        keys = [f"product_version:{id}", "catalog_version:*"]
+        keys.extend(f"catalog_version:{category}" for category in set(categories) if category)
+        bump_version(celery_app.backend.client, *keys)
+
+    def stock_changed(self, products: Dict[int, Optional[str]], availability_changed: Iterable[int] = ()) -> None:
+        """Drop cached copies and move the ETag versions of products (id -> category)
+
+        For stock written outside this class, e.g. by order placement and
+        cancellation. Every sale would otherwise invalidate every listing, so
+        listing versions only move for the products in availability_changed,
+        which went out of stock or back in; listed stock counts may lag until
+        then, while product ETags always follow stock.
+        """
+        if not products:
+            return
+        redis = celery_app.backend.client
+        redis.delete(*[PRODUCT_CACHE_KEY.format(id) for id in products])
+        keys = [f"product_version:{id}" for id in products]
+        categories = {products[id] for id in availability_changed if id in products}
+        if categories:
+            keys.append("catalog_version:*")
+            keys.extend(f"catalog_version:{category}" for category in categories if category)
+        bump_version(redis, *keys)
+
     def get_multi(
         self,
         db: Session,
         *,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        category: Optional[str] = None,
+        active_only: bool = False
     ) -> List[Product]:
-        return db.query(Product).offset(skip).limit(limit).all()
+        query = db.query(Product)
+        if category:
+            query = query.filter(Product.category == category)
+        if active_only:
+            query = query.filter(Product.is_active.is_(True))
+        return query.offset(skip).limit(limit).all()
+
+    def search(
+        self,
+        db: Session,
+        *,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Product], Dict[str, int]]:
+        """Ranked full-text search over product names and descriptions
+
+        Returns the requested page of active products together with match
+        counts per category. Facets cover every match, while the category
+        filter only narrows the returned page.
+        """
+        if not query:
+            products = self.get_multi(db, skip=skip, limit=limit, category=category, active_only=True)
+            facets = (
+                db.query(Product.category, func.count(Product.id))
+                .filter(Product.is_active.is_(True))
+                .group_by(Product.category)
+                .all()
+            )
+            return products, {facet or "": count for facet, count in facets}
+
+        if db.get_bind().dialect.name == "postgresql":
+            ranked_ids, facets = self._search_postgres(
+                db, query=query, category=category, skip=skip, limit=limit
+            )
+        else:
+            if not product_index.built:
+                product_index.build(
+                    db.query(
+                        Product.id,
+                        Product.name,
+                        Product.description,
+                        Product.category,
+                        Product.is_active
+                    ).yield_per(1000)
+                )
+            hits, facets = product_index.search(query, category=category)
+            ranked_ids = [id for id, _ in hits[skip:skip + limit]]
+
+        if not ranked_ids:
+            return [], facets
+        by_id = {
+            product.id: product
+            for product in db.query(Product).filter(Product.id.in_(ranked_ids)).all()
+        }
+        return [by_id[id] for id in ranked_ids if id in by_id], facets
+
+    def _search_postgres(
+        self,
+        db: Session,
+        *,
+        query: str,
+        category: Optional[str],
+        skip: int,
+        limit: int
+    ) -> Tuple[List[int], Dict[str, int]]:
+        """Match against the GIN-indexed search_vector column
+
+        The page of hits and the facet counts are computed from one shared
+        CTE and returned by a single statement.
+        """
+        ts_query = func.websearch_to_tsquery("english", query)
+        search_vector = literal_column("products.search_vector")
+        matches = (
+            select(
+                Product.id,
+                Product.category,
+                func.ts_rank_cd(search_vector, ts_query).label("rank")
+            )
+            .where(Product.is_active.is_(True))
+            .where(search_vector.op("@@")(ts_query))
+            .cte("matches")
+        )
+
+        page = select(matches.c.id, matches.c.rank)
+        if category:
+            page = page.where(matches.c.category == category)
+        page = (
+            page.order_by(matches.c.rank.desc(), matches.c.id)
+            .offset(skip)
+            .limit(limit)
+            .subquery("page")
+        )
+
+        statement = select(
+            literal("hit").label("kind"),
+            page.c.id,
+            page.c.rank,
+            null().label("category"),
+            null().label("count")
+        ).union_all(
+            select(
+                literal("facet"),
+                null(),
+                null(),
+                matches.c.category,
+                func.count()
+            ).group_by(matches.c.category)
+        )
+
+        hits = []
+        facets = {}
+        for kind, id, rank, facet_category, count in db.execute(statement):
+            if kind == "hit":
+                hits.append((rank, id))
+            else:
+                facets[facet_category or ""] = count
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        return [id for _, id in hits], facets
 
     def create(
         self,
         db: Session,
         *,
-        obj_in: ProductCreate
+        obj_in: ProductCreate,
+        seller_id: Optional[int] = None
     ) -> Product:
         db_obj = Product(
             name=obj_in.name,
             description=obj_in.description,
             price=obj_in.price,
-            stock=obj_in.stock
+            stock=obj_in.stock,
+            category=obj_in.category,
+            image_url=obj_in.image_url,
+            sku=obj_in.sku,
+            is_active=obj_in.is_active,
+            seller_id=seller_id
         )
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        # A negative cache entry may still claim this id does not exist
+        celery_app.backend.client.delete(PRODUCT_CACHE_KEY.format(db_obj.id))
+        self._bump_versions(db_obj.id, db_obj.category)
+        self._index(db_obj)
         return db_obj
 
     def update(
@@ -65,6 +360,8 @@ class CRUDProduct:
         db_obj: Product,
         obj_in: ProductUpdate
     ) -> Product:
+        previous_category = db_obj.category
+        previous_stock = db_obj.stock
         update_data = obj_in.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
@@ -74,8 +371,88 @@ class CRUDProduct:
         
         # Invalidate cache
         redis = celery_app.backend.client
-        redis.delete(f"product:{db_obj.id}")
+        redis.delete(PRODUCT_CACHE_KEY.format(db_obj.id))
+        self._bump_versions(db_obj.id, previous_category, db_obj.category)
+        self._index(db_obj)
+
+        # Restocks of a hot product must reach its Redis mirror too
+        if "stock" in update_data and reservations.is_mirrored(db_obj.id):
+            reservations.adjust(db_obj.id, db_obj.stock - previous_stock)
         
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Optional[Product]:
+        db_obj = db.query(Product).filter(Product.id == id).first()
+        if db_obj is None:
+            return None
+        db.delete(db_obj)
+        db.commit()
+
+        # Invalidate cache and drop the product from in-process indexes
+        redis = celery_app.backend.client
+        redis.delete(PRODUCT_CACHE_KEY.format(id))
+        self._bump_versions(id, db_obj.category)
+        product_index.discard(id)
+        product_autocomplete.remove(id)
+
+        return db_obj
+
+    def enable_reservations(self, db: Session, *, id: int) -> Optional[bool]:
+        """Mirror a hot product's stock into Redis so checkout reserves it there
+
+        The stock is read from the row under FOR UPDATE, never from the
+        product cache, and the lock is held until the mirror is written so no
+        row-level sale lands in between. Returns None if the product does
+        not exist.
+        """
+        db_obj = db.query(Product).filter(Product.id == id).with_for_update().first()
+        try:
+            if db_obj is None:
+                return None
+            return reservations.mirror(db_obj.id, db_obj.stock)
+        finally:
+            # Release the row lock
+            db.commit()
+
+    def disable_reservations(self, db_obj: Product) -> None:
+        """Return a product to row-level stock updates.
+
+        Only safe once its outstanding reservations are committed or released.
+        """
+        reservations.unmirror(db_obj.id)
+
+    def load_autocomplete(self, db: Session) -> None:
+        """Build the autocomplete index from a compact snapshot of active products
+
+        Only (id, name) pairs are read from the database. Popularity is units
+        sold over the longest best-seller window, read from the leaderboard's
+        Redis sorted sets, so order items are never aggregated here.
+        """
+        popularity = leaderboard.scores()
+        rows = (
+            db.query(Product.id, Product.name)
+            .filter(Product.is_active.is_(True))
+            .yield_per(10000)
+        )
+        product_autocomplete.load((id, name, popularity.get(id, 0)) for id, name in rows)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Suggest active product names for a typed prefix, most popular first"""
+        return product_autocomplete.suggest(prefix, limit=limit)
+
+    def _index(self, db_obj: Product) -> None:
+        if db_obj.is_active:
+            product_autocomplete.upsert(db_obj.id, db_obj.name)
+        else:
+            product_autocomplete.remove(db_obj.id)
+        # Keep the in-memory search fallback in step once it has been built
+        if product_index.built:
+            product_index.add(
+                db_obj.id,
+                db_obj.name,
+                db_obj.description,
+                db_obj.category,
+                db_obj.is_active
+            )
+
 product = CRUDProduct()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Monthly partitions of orders are named orders_yYYYYmMM
+PARTITION_NAME = re.compile(r"^orders_y(\d{4})m(\d{2})$")
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month a number of months after the month of a date"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"orders_y{month.year:04d}m{month.month:02d}"
+
+def partition_month(name: str) -> Optional[date]:
+    """Month held by a partition, or None if the name is not a monthly partition"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def is_partitioned(conn: Connection) -> bool:
+    """Whether orders is a partitioned table, i.e. PostgreSQL after migration 0003"""
+    if conn.dialect.name != "postgresql":
+        return False
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('orders')")).scalar()
+    return kind == "p"
+
+def create_partition(conn: Connection, month: date) -> bool:
+    """Create the partition for orders placed in a month (UTC); False if it exists"""
+    name = partition_name(month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF orders FOR VALUES "
+        f"FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    ))
+    return True
+
+def ensure_partitions(conn: Connection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Create any missing partition from the current month to months_ahead months later"""
+    current = (today or datetime.utcnow().date()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(conn, month):
+            created.append(partition_name(month))
+    return created
+
+def attached_partitions(conn: Connection) -> List[str]:
+    return sorted(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'orders'::regclass"
+    )).scalars())
+
+def detached_partitions(conn: Connection) -> List[str]:
+    """Monthly tables left detached by an archival run that did not finish"""
+    return sorted(conn.execute(text(
+        "SELECT relname FROM pg_class "
+        "WHERE relkind = 'r' AND NOT relispartition AND pg_table_is_visible(oid) "
+        "AND relname ~ '^orders_y[0-9]{4}m[0-9]{2}$'"
+    )).scalars())
+
+def _copy_out(cursor, query: str, path: str) -> None:
+    """COPY a query's rows into a gzipped CSV, replacing the file only when complete"""
+    partial = f"{path}.part"
+    with gzip.open(partial, "wb") as archive:
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+    os.replace(partial, path)
+
+def archive_partition(engine: Engine, name: str, archive_dir: str, lock_timeout: str = "5s") -> None:
+    """Detach a monthly partition, export it with its order items, then drop both
+
+    The partition and its items are written to orders_yYYYYmMM.csv.gz and
+    order_items_yYYYYmMM.csv.gz in archive_dir before anything is deleted,
+    so a run that fails part way is resumed from the detached table next
+    time. Payments are kept, as they are the financial record.
+    """
+    with engine.begin() as conn:
+        if name in attached_partitions(conn):
+            # DETACH locks orders briefly; give up rather than queue writes behind a long query
+            conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+            conn.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+
+    os.makedirs(archive_dir, exist_ok=True)
+    suffix = name[len("orders_"):]
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            _copy_out(cursor, f"SELECT * FROM {name} ORDER BY id", os.path.join(archive_dir, f"{name}.csv.gz"))
+            _copy_out(
+                cursor,
+                f"SELECT order_items.* FROM order_items JOIN {name} ON {name}.id = order_items.order_id "
+                f"ORDER BY order_items.id",
+                os.path.join(archive_dir, f"order_items_{suffix}.csv.gz")
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM order_items WHERE order_id IN (SELECT id FROM {name})"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    logger.info(f"Archived order partition {name} to {archive_dir}")
+
+def archive_partitions(
+    engine: Engine,
+    after_months: int,
+    archive_dir: str,
+    today: Optional[date] = None
+) -> List[str]:
+    """Archive partitions of months that ended more than after_months months ago"""
+    if after_months < 1:
+        raise ValueError("after_months must be at least 1")
+    cutoff = add_months((today or datetime.utcnow().date()).replace(day=1), -after_months)
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return []
+        names = detached_partitions(conn) + [
+            name for name in attached_partitions(conn)
+            if partition_month(name) is not None and partition_month(name) < cutoff
+        ]
+    for name in names:
+        archive_partition(engine, name, archive_dir)
+    return names
@@ -0,0 +1,62 @@
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats:
+    """SQL statements executed while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        # Parametrized statement text -> number of executions
+        self.statements: Counter = Counter()
+        # Parametrized statement text -> hashes of the parameter sets it ran with
+        self.parameter_sets: Dict[str, Set[int]] = defaultdict(set)
+
+    def record(self, statement: str, duration: float, parameters: Any = None) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+        self.parameter_sets[statement].add(hash(repr(parameters)))
+
+    def n_plus_one_suspects(self, threshold: int) -> Dict[str, int]:
+        """Statements run with at least threshold distinct parameter sets, with that number
+
+        Re-running a statement with the same parameters is a missing cache,
+        not the per-row lookups of an N+1, so repeats are not counted.
+        """
+        return {
+            statement: len(parameter_sets)
+            for statement, parameter_sets in self.parameter_sets.items()
+            if len(parameter_sets) >= threshold
+        }
+
+# Stats of the request being served; None outside of a request (e.g. Celery tasks)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    start_times: List[float] = conn.info.get("query_start_time")
+    if start_times:
+        stats.record(statement, time.perf_counter() - start_times.pop(), parameters)
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attach the per-request query accounting hooks to an engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
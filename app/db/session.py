@@ -1,6 +1,8 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.query_stats import install_query_hooks
+from app.db.slow_query_log import SlowQueryLog
 
 # Create database engine using connection settings from config
 # The pool_pre_ping option enables connection health checks
@@ -11,6 +13,20 @@ engine = create_engine(
     echo=False
 )
 
+# Count statements and database time for the request being served
+if settings.QUERY_STATS_ENABLED:
+    install_query_hooks(engine)
+
+# Log statements over the threshold and capture their plans
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    buffer_size=settings.SLOW_QUERY_BUFFER_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    explains_per_minute=settings.SLOW_QUERY_EXPLAINS_PER_MINUTE
+)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
+
 # Create a session factory that will be used to create database sessions
 # The factory ensures each request gets its own session
 SessionLocal = sessionmaker(
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Modules whose frames identify where a query was issued from
+CALL_SITE_MODULES = ("app.crud.", "app.analytics.", "app.tasks.")
+ENDPOINT_MODULES = ("app.api.",)
+
+def _frame_name(frame) -> str:
+    owner = frame.f_locals.get("self")
+    if owner is not None:
+        return f"{type(owner).__name__}.{frame.f_code.co_name}"
+    return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+
+def _call_site() -> Tuple[Optional[str], Optional[str]]:
+    """Find the CRUD/analytics method and the route handler on the current stack"""
+    call_site = endpoint = None
+    frame = sys._getframe(1)
+    while frame is not None and endpoint is None:
+        module = frame.f_globals.get("__name__", "")
+        if call_site is None and module.startswith(CALL_SITE_MODULES):
+            call_site = _frame_name(frame)
+        elif module.startswith(ENDPOINT_MODULES):
+            endpoint = _frame_name(frame)
+        frame = frame.f_back
+    return call_site, endpoint
+
+# Words that make a statement write or lock rows, so EXPLAIN ANALYZE must not run it again
+WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|SHARE)\b", re.IGNORECASE)
+
+def _is_read_only(statement: str) -> bool:
+    """Whether a statement only reads, so it is safe to execute again under EXPLAIN ANALYZE
+
+    A WITH may wrap DML in its CTEs (WITH moved AS (DELETE ... RETURNING *)
+    SELECT ...), and SELECT ... INTO or FOR UPDATE/SHARE writes or locks, so
+    any write keyword rules the statement out.
+    """
+    return (
+        statement.lstrip().upper().startswith(("SELECT", "WITH"))
+        and WRITE_KEYWORDS.search(statement) is None
+    )
+
+def _shape(statement: str) -> str:
+    """Identify a statement independent of whitespace and parameter values"""
+    return hashlib.blake2b(" ".join(statement.split()).encode(), digest_size=8).hexdigest()
+
+class SlowQueryLog:
+    """Logs statements slower than a threshold and keeps them in a ring buffer
+
+    The first time a statement shape is seen slow on PostgreSQL, its plan is
+    captured with EXPLAIN (ANALYZE, BUFFERS) for read-only queries, or plain
+    EXPLAIN for anything that writes or locks rows, including DML inside a
+    CTE, so it is not executed twice. Captures are limited to
+    explains_per_minute and run inside a savepoint so a failing EXPLAIN cannot
+    abort the caller's transaction.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 200,
+        buffer_size: int = 200,
+        explain: bool = True,
+        explains_per_minute: int = 10,
+        max_tracked_shapes: int = 10000
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explains_per_minute = explains_per_minute
+        self.max_tracked_shapes = max_tracked_shapes
+        self.entries: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._seen_shapes: "OrderedDict[str, None]" = OrderedDict()
+        self._explain_window = 0
+        self._explains_in_window = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_times: List[float] = conn.info.get("slow_query_start_time")
+        if not start_times:
+            return
+        duration = time.perf_counter() - start_times.pop()
+        if duration >= self.threshold:
+            self.record(conn, statement, parameters, duration, executemany)
+
+    def _handle_error(self, exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("slow_query_start_time"):
+            connection.info["slow_query_start_time"].pop()
+
+    def install(self, engine: Engine) -> None:
+        """Attach the slow query hooks to an engine"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def record(self, conn, statement: str, parameters: Any, duration: float, executemany: bool = False) -> None:
+        call_site, endpoint = _call_site()
+        shape = _shape(statement)
+        logger.warning(
+            f"Slow query ({duration * 1000:.1f} ms) from {call_site or 'unknown'} "
+            f"via {endpoint or 'no route'}: {' '.join(statement.split())} "
+            f"params={repr(parameters)[:500]}"
+        )
+        plan = None
+        if not executemany and self._should_explain(conn, shape):
+            plan = self._explain(conn, statement, parameters)
+        self.entries.append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "shape": shape,
+            "statement": statement,
+            "parameters": repr(parameters)[:500],
+            "call_site": call_site,
+            "endpoint": endpoint,
+            "plan": plan
+        })
+
+    def _should_explain(self, conn, shape: str) -> bool:
+        if not self.explain or conn.dialect.name != "postgresql":
+            return False
+        with self._lock:
+            if shape in self._seen_shapes:
+                return False
+            window = int(time.time() // 60)
+            if window != self._explain_window:
+                self._explain_window = window
+                self._explains_in_window = 0
+            if self._explains_in_window >= self.explains_per_minute:
+                return False
+            self._explains_in_window += 1
+            self._seen_shapes[shape] = None
+            if len(self._seen_shapes) > self.max_tracked_shapes:
+                self._seen_shapes.popitem(last=False)
+        return True
+
+    def _explain(self, conn, statement: str, parameters: Any) -> Optional[str]:
+        options = "(ANALYZE, BUFFERS)" if _is_read_only(statement) else ""
+        # Use a separate DBAPI cursor so the caller's result set is untouched
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN {options} {statement}", parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                logger.error(f"Error capturing plan for slow query: {str(e)}")
+                return None
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception as e:
+            # Savepoints need an open transaction; autocommit connections have none
+            logger.error(f"Error capturing plan for slow query: {str(e)}")
+            return None
+        finally:
+            cursor.close()
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow queries, newest first"""
+        return list(reversed(self.entries))[:limit]
@@ -1,10 +1,12 @@
 from fastapi import FastAPI
 from app.api.api import api_router
 from app.core.config import settings
+from app.core.startup import autocomplete_lifespan
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=autocomplete_lifespan
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,52 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import MetricsRegistry, registry as default_registry
+
+# Route label for requests that matched no route, keeping label cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency, status and response size
+
+    Routes are labelled by their path template (e.g. /api/v1/products/{product_id}),
+    which the router stores in the scope while matching.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = default_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        shard = self.registry.shard()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        shard.in_flight[method] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            shard.in_flight[method] -= 1
+            route = scope.get("route")
+            self.registry.observe(
+                shard,
+                method,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                duration,
+                size
+            )
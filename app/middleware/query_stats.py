@@ -0,0 +1,78 @@
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import MetricsRegistry, registry as default_registry
+from app.db.query_stats import QueryStats, current_query_stats
+from app.middleware.metrics import UNMATCHED_ROUTE
+
+logger = logging.getLogger(__name__)
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware accounting for the SQL executed by each request
+
+    In debug mode the query count and database time are returned in a
+    Server-Timing header. Otherwise they are aggregated per route into the
+    metrics registry. Statements run with at least n_plus_one_threshold
+    distinct parameter sets within one request are logged as N+1 suspects in
+    both modes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        debug: bool = False,
+        n_plus_one_threshold: int = 5,
+        registry: MetricsRegistry = default_registry
+    ):
+        self.app = app
+        self.debug = debug
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.registry = registry
+        registry.describe_counter("db_queries_total", "SQL statements executed, by route.")
+        registry.describe_counter("db_query_seconds_total", "Time spent executing SQL, by route.")
+        registry.describe_counter(
+            "db_n_plus_one_suspects_total",
+            "Requests that repeated one statement with different parameters, by route."
+        )
+
+    def _server_timing(self, stats: QueryStats) -> str:
+        timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        suspects = stats.n_plus_one_suspects(self.n_plus_one_threshold)
+        if suspects:
+            timing += f', n1;desc="{len(suspects)} repeated statements"'
+        return timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", self._server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing if self.debug else send)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        suspects = stats.n_plus_one_suspects(self.n_plus_one_threshold)
+        for statement, count in suspects.items():
+            logger.warning(
+                f"Possible N+1 on {scope['method']} {route}: statement executed with {count} parameter sets: "
+                f"{' '.join(statement.split())[:200]}"
+            )
+        if self.debug:
+            return
+        shard = self.registry.shard()
+        self.registry.increment(shard, "db_queries_total", stats.count, route=route)
+        self.registry.increment(shard, "db_query_seconds_total", stats.duration, route=route)
+        if suspects:
+            self.registry.increment(shard, "db_n_plus_one_suspects_total", route=route)
@@ -1,22 +1,75 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Optional, Dict, Tuple
-from datetime import datetime, timedelta
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional, Dict, Iterable, Tuple
+from dataclasses import dataclass
 import time
 from redis import Redis
-from app.core.config import settings
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, redis_client: Redis):
-        super().__init__(app)
-        self.limiter = RateLimiter(redis_client)
+@dataclass
+class RateLimitResult:
+    limited: bool
+    limit: int
+    remaining: int
+    reset: int
 
-    async def dispatch(self, request: Request, call_next):
-        is_limited, error_response = await self.limiter.is_rate_limited(request)
-        if is_limited:
-            return JSONResponse(status_code=429, content=error_response)
-        return await call_next(request)
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+
+class RateLimitMiddleware:
+    """Pure ASGI rate limiting middleware
+
+    The limit is checked before the wrapped app is called. Allowed responses
+    get X-RateLimit-* headers injected into their start message, so bodies
+    (including streaming responses) pass through untouched. Exempt paths
+    skip Redis entirely.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis_client: Redis,
+        exempt_paths: Iterable[str] = ("/health",),
+        **limiter_options
+    ):
+        self.app = app
+        self.limiter = RateLimiter(redis_client, **limiter_options)
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        result = await self.limiter.hit(Request(scope))
+        if result.limited:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": "Too many requests",
+                    "detail": "Rate limit exceeded",
+                    "retry_after": result.reset
+                },
+                headers={**result.headers(), "Retry-After": str(result.reset)}
+            )
+            await response(scope, receive, send)
+            return
+
+        rate_limit_headers = result.headers()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers.items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 class RateLimiter:
     def __init__(
@@ -40,7 +93,8 @@ class RateLimiter:
             client_ip = request.client.host
         return f"{self.key_prefix}{client_ip}"
 
-    async def is_rate_limited(self, request: Request) -> Tuple[bool, Optional[Dict]]:
+    async def hit(self, request: Request) -> RateLimitResult:
+        """Count a request against the client's current one-minute window"""
         identifier = await self._get_client_identifier(request)
         current = int(time.time())
         minute_window = current - (current % 60)
@@ -50,18 +104,20 @@ class RateLimiter:
         pipeline.expire(f"{identifier}:{minute_window}", 90)  # TTL slightly longer than window
         requests_in_window = pipeline.execute()[0]
 
-        if requests_in_window > self.burst_limit:
-            return True, {
-                "error": "Too many requests",
-                "detail": "Rate limit exceeded",
-                "retry_after": 60 - (current % 60)
-            }
+        limit = min(self.requests_per_minute, self.burst_limit)
+        return RateLimitResult(
+            limited=requests_in_window > limit,
+            limit=limit,
+            remaining=max(0, limit - requests_in_window),
+            reset=60 - (current % 60)
+        )
 
-        if requests_in_window > self.requests_per_minute:
+    async def is_rate_limited(self, request: Request) -> Tuple[bool, Optional[Dict]]:
+        result = await self.hit(request)
+        if result.limited:
             return True, {
                 "error": "Too many requests",
                 "detail": "Rate limit exceeded",
-                "retry_after": 60 - (current % 60)
+                "retry_after": result.reset
             }
-
-        return False, None
\ No newline at end of file
+        return False, None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -21,6 +21,15 @@ class Order(Base):
     This model tracks customer purchases from creation to delivery
     """
     __tablename__ = "orders"
+    # On PostgreSQL the table is partitioned by created_at month (migration
+    # 0003), which makes its primary key (id, created_at); ids stay unique,
+    # and order numbers through the order_numbers table.
+    __table_args__ = (
+        # Orders in a status, by age (dashboard, processing queues)
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        # Orders placed within a period (dashboard, sales trends)
+        Index("ix_orders_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # Unique order reference number for customer tracking
@@ -36,6 +45,8 @@ class Order(Base):
     shipping_address = Column(String, nullable=False)
     # Any special instructions from customer
     notes = Column(String, nullable=True)
+    # Redis stock reservation held until the order is confirmed
+    reservation_id = Column(String, nullable=True, index=True)
     # Payment method used (e.g., credit card, PayPal)
     payment_method = Column(String)
     # When the order was placed
@@ -43,4 +54,18 @@ class Order(Base):
     # When the order status was last updated
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     # Products included in this order
-    items = relationship("OrderItem", back_populates="order")
\ No newline at end of file
+    items = relationship("OrderItem", back_populates="order")
+    # Payments made towards this order
+    payments = relationship("Payment", back_populates="order")
+
+# A user's orders, most recently updated first (notifications)
+Index("ix_orders_user_id_updated_at", Order.user_id, Order.updated_at.desc())
+
+class OrderNumber(Base):
+    """Registry of every order number ever issued
+    Written in the same transaction as the order, so a number stays unique
+    across partitions and after its order is archived
+    """
+    __tablename__ = "order_numbers"
+
+    order_number = Column(String, primary_key=True)
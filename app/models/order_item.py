@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -8,9 +8,15 @@ class OrderItem(Base):
     tracking quantity and price at time of purchase
     """
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Items of an order, loaded with the order
+        Index("ix_order_items_order_id", "order_id"),
+        # Sales per product (analytics joins)
+        Index("ix_order_items_product_id", "product_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    # Reference to the parent order
+    # Reference to the parent order (not enforced on PostgreSQL, where orders is partitioned)
     order_id = Column(Integer, ForeignKey('orders.id'))
     order = relationship("Order", back_populates="items")
     # Reference to the product being purchased
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -27,9 +27,13 @@ class Payment(Base):
     This model tracks all payment transactions in the system
     """
     __tablename__ = "payments"
+    __table_args__ = (
+        # Payments in a status (get_by_status, reconciliation)
+        Index("ix_payments_status", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    # Order associated with this payment
+    # Order associated with this payment (not enforced on PostgreSQL, where orders is partitioned)
     order_id = Column(Integer, ForeignKey('orders.id'))
     order = relationship("Order", back_populates="payments")
     # Amount processed in this payment
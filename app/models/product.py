@@ -1,13 +1,26 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey, DDL, Index, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
+# Products with less stock than this count as low on stock. Queries must
+# compare against the literal value for the partial index to apply.
+LOW_STOCK_THRESHOLD = 10
+
 class Product(Base):
     """Product Model for storing product related details
     This model represents items available for purchase in the e-commerce system
     """
     __tablename__ = "products"
+    __table_args__ = (
+        # Partial index: only the few low-stock rows are indexed
+        Index(
+            "ix_products_low_stock",
+            "stock",
+            postgresql_where=text(f"stock < {LOW_STOCK_THRESHOLD}"),
+            sqlite_where=text(f"stock < {LOW_STOCK_THRESHOLD}")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # Name of the product as displayed to customers
@@ -32,4 +45,25 @@ class Product(Base):
     # Automatically track when the product was added
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     # Automatically track when the product was last updated
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+# Full-text search document over name and description.
+# Postgres maintains it as a generated tsvector column backed by a GIN index;
+# other databases fall back to the in-memory index in app.core.search.
+SEARCH_DOCUMENT = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL(
+        f"ALTER TABLE products ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)"
+    ).execute_if(dialect="postgresql")
+)
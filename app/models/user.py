@@ -1,4 +1,5 @@
 from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
@@ -22,4 +23,8 @@ class User(Base):
     # Automatically track when the user was created
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     # Automatically track when the user was last updated
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Orders placed by the user
+    orders = relationship("Order", back_populates="user")
+    # Products listed by the user as a seller
+    products = relationship("Product", back_populates="seller")
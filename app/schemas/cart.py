@@ -0,0 +1,19 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class CartItem(BaseModel):
+    """Schema for a cart line"""
+    product_id: int
+    quantity: int = Field(gt=0)
+
+class CartItemUpdate(BaseModel):
+    """Schema for setting a cart line's quantity; 0 removes the line"""
+    quantity: int = Field(ge=0)
+
+class Cart(BaseModel):
+    """Schema for returning a cart to the client"""
+    items: List[CartItem]
+
+class CartCheckout(BaseModel):
+    """Schema for checking out a cart"""
+    shipping_address: str
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from app.models.order import OrderStatus
 
@@ -17,7 +17,8 @@ class OrderItemInDB(OrderItemBase):
     id: int
     order_id: int
     unit_price: float
-    total_price: float
+    # Stored as final_price, after any discount
+    total_price: float = Field(validation_alias=AliasChoices("final_price", "total_price"))
 
     class Config:
         from_attributes = True
@@ -38,7 +39,8 @@ class OrderUpdate(BaseModel):
 class OrderInDBBase(OrderBase):
     """Base schema for Order in DB"""
     id: int
-    customer_id: int
+    # Stored as user_id
+    customer_id: int = Field(validation_alias=AliasChoices("user_id", "customer_id"))
     total_amount: float
     status: OrderStatus
     payment_id: Optional[str] = None
@@ -0,0 +1,41 @@
+from celery import shared_task
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderStatus
+from app.core.inventory import reservations
+from app.crud.order import order as crud_order
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def release_expired_reservations() -> int:
+    """Release stock reservations whose orders were never confirmed.
+
+    Reserved units go back to the Redis mirror and the pending orders that
+    held them are cancelled like any other cancellation, which restores the
+    database stock of their unreserved lines. An order confirmed concurrently
+    wins the race: its commit empties the reservation first, so the release
+    returns nothing and the order is left alone.
+
+    Returns:
+        The number of reservations released
+    """
+    db = SessionLocal()
+    released = 0
+    try:
+        for reservation_id in reservations.expired():
+            lines = reservations.release(reservation_id)
+            if not lines:
+                continue
+            released += 1
+            order = db.query(Order).filter(Order.reservation_id == reservation_id).first()
+            if order and order.status == OrderStatus.PENDING:
+                crud_order.cancel_order(db, db_obj=order, released=lines)
+                logger.info(f"Cancelled order {order.id} after its stock reservation expired")
+        return released
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error releasing expired reservations: {str(e)}")
+        raise
+    finally:
+        db.close()
@@ -1,10 +1,18 @@
+import os
+import socket
+from typing import Any, Dict
 from celery import shared_task
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.models.order import Order, OrderStatus
 from app.core.celery import celery_app
 from app.models.product import Product
 from app.core.config import settings
+from app.crud.order import order as crud_order
+from app.analytics.processing_times import processing_times
+from app.core.order_intake import CREATED, QUEUED, REJECTED, order_intake
+from app.schemas.order import OrderCreate
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +37,9 @@ def process_order(self, order_id: int) -> None:
             logger.error(f"Order {order_id} not found")
             return
         
+        # Confirming the order commits any reserved stock to the database
+        crud_order.confirm_reservation(db, db_obj=order)
+
         # Update order status to processing
         order.status = OrderStatus.PROCESSING
         db.add(order)
@@ -55,6 +66,7 @@ def process_order(self, order_id: int) -> None:
         order.status = OrderStatus.DELIVERED
         db.add(order)
         db.commit()
+        processing_times.record_order(order, worker=self.request.hostname)
         
         logger.info(f"Successfully processed order {order_id}")
         
@@ -66,6 +78,71 @@ def process_order(self, order_id: int) -> None:
     finally:
         db.close()
 
+def _materialize(db: Session, entry: Dict[str, Any]) -> bool:
+    """Create the order for an intake entry and record the outcome; True if it was created now"""
+    reference, customer_id, order_number = entry["reference"], entry["customer_id"], entry["order_number"]
+    order = crud_order.get_by_order_number(db, order_number) if order_number else None
+    if order is None:
+        try:
+            order = crud_order.create(
+                db,
+                obj_in=OrderCreate(**entry["payload"]),
+                customer_id=customer_id,
+                order_number=order_number
+            )
+        except ValueError as e:
+            order_intake.set_result(reference, customer_id, REJECTED, detail=str(e))
+            return False
+        except IntegrityError:
+            # Another worker created it under the same order number meanwhile
+            db.rollback()
+            order = crud_order.get_by_order_number(db, order_number)
+            if order is None:
+                raise
+        else:
+            order_intake.set_result(reference, customer_id, CREATED, order_id=order.id)
+            return True
+    order_intake.set_result(reference, customer_id, CREATED, order_id=order.id)
+    return False
+
+@shared_task
+def materialize_order_intake() -> int:
+    """Turn orders accepted in async intake mode into database rows.
+
+    Reads the intake stream in batches through a consumer group, so several
+    workers can drain it concurrently. Entries are acknowledged once their
+    outcome is recorded; entries left pending by a crashed worker are claimed
+    again later. A reference that already has an outcome is skipped, and one
+    whose order number already exists, because a worker died after
+    committing it, is recorded as created rather than materialized twice.
+
+    Returns:
+        The number of orders created
+    """
+    db = SessionLocal()
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    created = 0
+    try:
+        while True:
+            entries = order_intake.read_batch(consumer, settings.ORDER_INTAKE_BATCH_SIZE)
+            done = []
+            try:
+                for entry_id, entry in entries:
+                    status = order_intake.get_status(entry["reference"])
+                    if (status is None or status["status"] == QUEUED) and _materialize(db, entry):
+                        created += 1
+                    done.append(entry_id)
+            finally:
+                order_intake.ack(done)
+            if len(entries) < settings.ORDER_INTAKE_BATCH_SIZE:
+                return created
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error materializing order intake: {str(e)}")
+        raise
+    finally:
+        db.close()
+
 @shared_task
 def send_order_confirmation(order_id: int) -> None:
     """Send order confirmation email to customer.
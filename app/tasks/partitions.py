@@ -0,0 +1,49 @@
+from celery import shared_task
+from typing import List
+from app.core.config import settings
+from app.db.partitions import archive_partitions, ensure_partitions, is_partitioned
+from app.db.session import engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def create_order_partitions() -> List[str]:
+    """Create the monthly orders partitions for the coming months.
+
+    Orders are routed to their month's partition on insert and an order
+    without one fails, so partitions are created ORDER_PARTITIONS_PREMAKE_MONTHS
+    ahead. Does nothing unless orders is partitioned (PostgreSQL only).
+
+    Returns:
+        The names of the partitions created
+    """
+    try:
+        with engine.begin() as conn:
+            if not is_partitioned(conn):
+                return []
+            created = ensure_partitions(conn, settings.ORDER_PARTITIONS_PREMAKE_MONTHS)
+        for name in created:
+            logger.info(f"Created order partition {name}")
+        return created
+    except Exception as e:
+        logger.error(f"Error creating order partitions: {str(e)}")
+        raise
+
+@shared_task
+def archive_order_partitions() -> List[str]:
+    """Detach and archive orders partitions older than ORDER_ARCHIVE_AFTER_MONTHS.
+
+    Each partition is exported with its order items to gzipped CSV files in
+    ORDER_ARCHIVE_DIR, then dropped. Disabled while the setting is 0.
+
+    Returns:
+        The names of the partitions archived
+    """
+    if settings.ORDER_ARCHIVE_AFTER_MONTHS < 1:
+        return []
+    try:
+        return archive_partitions(engine, settings.ORDER_ARCHIVE_AFTER_MONTHS, settings.ORDER_ARCHIVE_DIR)
+    except Exception as e:
+        logger.error(f"Error archiving order partitions: {str(e)}")
+        raise
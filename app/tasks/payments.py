@@ -0,0 +1,49 @@
+import os
+from datetime import datetime, timedelta
+from celery import shared_task
+from typing import Dict, Optional
+from app.db.session import SessionLocal
+from app.core.config import settings
+from app.core.reconciliation import reconcile_settlement
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def reconcile_payments(settlement_path: str, report_path: Optional[str] = None) -> Dict[str, int]:
+    """Reconcile a processor settlement file against payments.
+
+    The file (CSV or NDJSON) is streamed in RECONCILIATION_CHUNK_SIZE lines,
+    settled statuses are applied in bulk, and every line that does not match
+    is written to the discrepancy report. Payments still pending
+    RECONCILIATION_PENDING_GRACE_HOURS after creation are reported as missing
+    from the settlement.
+
+    Args:
+        settlement_path: Path of the settlement file
+        report_path: Where to write the report; defaults to a file named after
+            the settlement in RECONCILIATION_REPORT_DIR
+
+    Returns:
+        Counts of lines, matched and updated payments, and discrepancies by reason
+    """
+    if report_path is None:
+        name = os.path.splitext(os.path.basename(settlement_path))[0]
+        report_path = os.path.join(settings.RECONCILIATION_REPORT_DIR, f"{name}.discrepancies.csv")
+    db = SessionLocal()
+    try:
+        summary = reconcile_settlement(
+            db,
+            settlement_path,
+            report_path,
+            chunk_size=settings.RECONCILIATION_CHUNK_SIZE,
+            unsettled_before=datetime.utcnow() - timedelta(hours=settings.RECONCILIATION_PENDING_GRACE_HOURS)
+        )
+        logger.info(f"Reconciled {settlement_path}: {summary}, report at {report_path}")
+        return summary
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error reconciling {settlement_path}: {str(e)}")
+        raise
+    finally:
+        db.close()
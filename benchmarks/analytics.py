@@ -0,0 +1,63 @@
+"""OrderAnalytics over SQL aggregates versus in-memory NumPy columns
+
+Times each OrderAnalytics query through both paths against a seeded
+database. The columnar engine's initial load and a no-op incremental
+refresh are reported separately, since queries only pay for the latter.
+Requires numpy and, for daily revenue, Postgres (date_trunc).
+
+Usage:
+    python -m benchmarks.seed --scale 10m
+    python -m benchmarks.analytics [--database-url postgresql://...] [--rounds 5]
+"""
+import argparse
+import time
+from typing import Callable
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.analytics.columnar import ColumnarOrderFacts
+from app.analytics.order_analytics import OrderAnalytics
+
+QUERIES = {
+    "volume_by_status": lambda analytics: analytics.get_order_volume_by_status(),
+    "daily_revenue": lambda analytics: analytics.get_daily_revenue(days=30),
+    "top_sellers": lambda analytics: analytics.get_top_selling_products(limit=10),
+    "processing_metrics": lambda analytics: analytics.get_order_processing_metrics(),
+}
+
+def best_of(operation: Callable[[], object], rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    db = sessionmaker(bind=create_engine(args.database_url))()
+    facts = ColumnarOrderFacts(refresh_interval=0)
+    start = time.perf_counter()
+    facts.refresh(db)
+    print(f"initial load: {facts.orders.size} orders, {facts.items.size} items "
+          f"in {time.perf_counter() - start:.2f} s")
+    print(f"no-op refresh: {best_of(lambda: facts.refresh(db, force=True), args.rounds) * 1000:.1f} ms")
+
+    sql = OrderAnalytics(db)
+    columnar = OrderAnalytics(db, facts=facts)
+    # Measure the vectorized queries alone; refresh cost is reported above
+    facts.refresh_interval = float("inf")
+    for name, query in QUERIES.items():
+        sql_time = best_of(lambda: query(sql), args.rounds)
+        columnar_time = best_of(lambda: query(columnar), args.rounds)
+        print(f"{name:<20} sql={sql_time * 1000:>10.1f} ms  columnar={columnar_time * 1000:>8.1f} ms  "
+              f"speedup={sql_time / columnar_time:>7.1f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Per-request overhead of MetricsMiddleware
+
+Drives a bare ASGI app with and without the metrics middleware and reports
+the difference, plus the cost of rendering a scrape.
+
+Usage:
+    python -m benchmarks.metrics [--requests 50000]
+"""
+import argparse
+import asyncio
+import time
+from app.core.metrics import MetricsRegistry
+from app.middleware.metrics import MetricsMiddleware
+from benchmarks.rate_limiter import endpoint, measure
+
+async def run(requests: int) -> None:
+    registry = MetricsRegistry()
+    baseline = await measure(endpoint, requests)
+    instrumented = await measure(MetricsMiddleware(endpoint, registry=registry), requests)
+
+    start = time.perf_counter()
+    registry.render()
+    scrape = (time.perf_counter() - start) * 1e3
+
+    print("Microseconds per request")
+    print(f"bare app       {baseline:8.2f}")
+    print(f"instrumented   {instrumented:8.2f}  (+{instrumented - baseline:.2f})")
+    print(f"scrape render  {scrape:8.3f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
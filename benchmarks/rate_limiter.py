@@ -0,0 +1,114 @@
+"""Per-request overhead of the rate limiting middleware
+
+Drives the ASGI stack directly (no server, no sockets) and compares the
+previous BaseHTTPMiddleware implementation with the pure ASGI
+RateLimitMiddleware. Redis is replaced by an in-process counter so only
+middleware overhead is measured.
+
+Usage:
+    python -m benchmarks.rate_limiter [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.middleware.rate_limiter import RateLimiter, RateLimitMiddleware
+
+class InProcessRedis:
+    """Minimal stand-in for the INCR/EXPIRE pipeline used by RateLimiter"""
+
+    def __init__(self):
+        self.counters = {}
+
+    def pipeline(self):
+        return InProcessPipeline(self)
+
+class InProcessPipeline:
+    def __init__(self, redis: InProcessRedis):
+        self.redis = redis
+        self.results = []
+
+    def incr(self, key):
+        # Keep counts below the limit so every request is allowed
+        self.redis.counters[key] = self.redis.counters.get(key, 0) % 50 + 1
+        self.results.append(self.redis.counters[key])
+
+    def expire(self, key, seconds):
+        self.results.append(True)
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation this benchmark compares against"""
+
+    def __init__(self, app, redis_client):
+        super().__init__(app)
+        self.limiter = RateLimiter(redis_client)
+
+    async def dispatch(self, request: Request, call_next):
+        is_limited, error_response = await self.limiter.is_rate_limited(request)
+        if is_limited:
+            return JSONResponse(status_code=429, content=error_response)
+        return await call_next(request)
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"status":"healthy"}'})
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+    "method": "GET", "scheme": "http", "path": "/api/v1/products/", "raw_path": b"/api/v1/products/",
+    "query_string": b"", "root_path": "", "headers": [(b"host", b"testserver")],
+    "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+}
+
+def receiver():
+    """ASGI receive for one request: the empty body, then a disconnect"""
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(0)
+        return {"type": "http.disconnect"}
+    return receive
+
+async def send(message):
+    pass
+
+async def measure(app, requests: int) -> float:
+    for _ in range(100):
+        await app(dict(SCOPE), receiver(), send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receiver(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def run(requests: int) -> None:
+    baseline = await measure(endpoint, requests)
+    legacy = await measure(LegacyRateLimitMiddleware(endpoint, InProcessRedis()), requests)
+    pure = await measure(RateLimitMiddleware(endpoint, InProcessRedis()), requests)
+    exempt = await measure(
+        RateLimitMiddleware(endpoint, InProcessRedis(), exempt_paths=[SCOPE["path"]]), requests
+    )
+    print("Microseconds per request (middleware overhead over bare app)")
+    print(f"bare app          {baseline:8.2f}")
+    print(f"BaseHTTPMiddleware{legacy:8.2f}  (+{legacy - baseline:.2f})")
+    print(f"pure ASGI         {pure:8.2f}  (+{pure - baseline:.2f})")
+    print(f"pure ASGI, exempt {exempt:8.2f}  (+{exempt - baseline:.2f})")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Seed a database with a synthetic catalog and order history
+
+Data is generated deterministically from a random seed and written with
+batched Core inserts, so the same scale always produces the same dataset.
+
+Usage:
+    python -m benchmarks.seed --scale 10k [--database-url postgresql://...]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+from app.db.base_class import Base
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.user import User
+
+# Number of orders per named scale; catalog and customers scale with it
+SCALES: Dict[str, int] = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+CATEGORIES = ["electronics", "accessories", "clothing", "home", "garden", "toys", "books", "sports"]
+STATUS_WEIGHTS = [
+    (OrderStatus.DELIVERED, 60),
+    (OrderStatus.SHIPPED, 10),
+    (OrderStatus.PROCESSING, 10),
+    (OrderStatus.PENDING, 15),
+    (OrderStatus.CANCELLED, 5),
+]
+BATCH_SIZE = 10_000
+HISTORY_DAYS = 365
+
+def sizes_for(orders: int) -> Dict[str, int]:
+    return {
+        "orders": orders,
+        "products": max(100, orders // 10),
+        "users": max(10, orders // 20),
+    }
+
+def _insert_batches(engine: Engine, table, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+
+def seed(engine: Engine, orders: int, items_per_order: int = 3, random_seed: int = 42) -> Dict[str, int]:
+    """Create the schema and fill it with a reproducible dataset"""
+    rng = random.Random(random_seed)
+    sizes = sizes_for(orders)
+    now = datetime.utcnow()
+    Base.metadata.create_all(bind=engine)
+
+    _insert_batches(engine, User.__table__, (
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "hashed_password": "x",
+            "full_name": f"User {i}",
+            "is_active": True,
+        }
+        for i in range(1, sizes["users"] + 1)
+    ))
+
+    prices = [round(rng.uniform(1, 500), 2) for _ in range(sizes["products"])]
+    _insert_batches(engine, Product.__table__, (
+        {
+            "id": i,
+            "name": f"Product {i} {rng.choice(CATEGORIES)} item",
+            "description": f"Synthetic product number {i}",
+            "price": prices[i - 1],
+            "stock": rng.randint(0, 1000),
+            "category": rng.choice(CATEGORIES),
+            "sku": f"SKU-{i:09d}",
+            "is_active": True,
+            "seller_id": rng.randint(1, sizes["users"]),
+        }
+        for i in range(1, sizes["products"] + 1)
+    ))
+
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    order_rows = []
+    item_rows = []
+    item_id = 0
+
+    def flush() -> None:
+        _insert_batches(engine, Order.__table__, order_rows)
+        _insert_batches(engine, OrderItem.__table__, item_rows)
+        order_rows.clear()
+        item_rows.clear()
+
+    for order_id in range(1, orders + 1):
+        created_at = now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+        total = 0.0
+        for _ in range(items_per_order):
+            item_id += 1
+            product_id = rng.randint(1, sizes["products"])
+            quantity = rng.randint(1, 5)
+            subtotal = prices[product_id - 1] * quantity
+            total += subtotal
+            item_rows.append({
+                "id": item_id,
+                "order_id": order_id,
+                "product_id": product_id,
+                "quantity": quantity,
+                "unit_price": prices[product_id - 1],
+                "subtotal": subtotal,
+                "discount": 0.0,
+                "final_price": subtotal,
+            })
+        order_rows.append({
+            "id": order_id,
+            "order_number": f"QS{order_id:010d}",
+            "user_id": rng.randint(1, sizes["users"]),
+            "total_amount": round(total, 2),
+            "status": rng.choices(statuses, weights)[0],
+            "shipping_address": "1 Benchmark Way",
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(hours=rng.randint(1, 240)),
+        })
+        if len(order_rows) >= BATCH_SIZE:
+            flush()
+    flush()
+
+    if engine.dialect.name == "postgresql":
+        # Rows were inserted with explicit ids; move the sequences past them
+        with engine.begin() as conn:
+            for table in (User.__table__, Product.__table__, Order.__table__, OrderItem.__table__):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT max(id) FROM {table.name}))"
+                ))
+    return sizes
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = seed(create_engine(args.database_url), SCALES[args.scale], random_seed=args.seed)
+    print(f"Seeded {sizes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""CPU cost of serializing one page of list results
+
+Compares FastAPI's default response_model path (validate, jsonable_encoder,
+json.dumps) against the precompiled TypeAdapter fast path in
+app.core.responses.
+
+Usage:
+    python -m benchmarks.serialization [--page-size 100] [--rounds 2000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import get_type_adapter, serialize
+from app.models.order import OrderStatus
+from app.schemas.order import Order
+from app.schemas.product import Product
+
+def make_products(count: int) -> List[SimpleNamespace]:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i, name=f"Product {i}", description="A test product " * 4,
+            price=9.99 + i, stock=100, category="electronics", image_url=None,
+            sku=f"SKU-{i}", is_active=True, seller_id=1, created_at=now, updated_at=now
+        )
+        for i in range(count)
+    ]
+
+def make_orders(count: int) -> List[SimpleNamespace]:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i, customer_id=1, shipping_address="123 Test St", total_amount=59.97,
+            status=OrderStatus.PENDING, payment_id=None, created_at=now, updated_at=now,
+            items=[
+                SimpleNamespace(id=i * 3 + j, order_id=i, product_id=j, quantity=1,
+                                unit_price=19.99, total_price=19.99)
+                for j in range(3)
+            ]
+        )
+        for i in range(count)
+    ]
+
+def default_path(response_type, content) -> bytes:
+    # Mirrors fastapi.routing.serialize_response followed by JSONResponse.render
+    adapter = get_type_adapter(response_type)
+    validated = adapter.validate_python(content, from_attributes=True)
+    encoded = jsonable_encoder(adapter.dump_python(validated, mode="python"))
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+def measure(func, response_type, content, rounds: int) -> float:
+    func(response_type, content)
+    start = time.process_time()
+    for _ in range(rounds):
+        func(response_type, content)
+    return (time.process_time() - start) / rounds * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = [
+        ("products", List[Product], make_products(args.page_size)),
+        ("orders", List[Order], make_orders(args.page_size)),
+    ]
+    print(f"CPU microseconds per {args.page_size}-item page")
+    for name, response_type, content in cases:
+        default = measure(default_path, response_type, content, args.rounds)
+        fast = measure(serialize, response_type, content, args.rounds)
+        print(f"{name:<10} default={default:9.1f}  fast={fast:9.1f}  speedup={default / fast:4.1f}x")
+
+if __name__ == "__main__":
+    main()
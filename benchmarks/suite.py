@@ -0,0 +1,185 @@
+"""Benchmark hot endpoints and CRUD paths against a seeded database
+
+Runs each scenario sequentially for a fixed number of iterations after a
+warm-up, and reports throughput with p50/p99 latency. Results are written as
+JSON; --compare checks them against a stored baseline and exits non-zero
+when any scenario regressed beyond the tolerance.
+
+Usage:
+    python -m benchmarks.seed --scale 10k
+    python -m benchmarks.suite --scale 10k --output results.json
+    python -m benchmarks.suite --scale 10k --compare baseline.json
+
+Requires PostgreSQL and a Redis reachable at the configured
+REDIS_HOST/REDIS_PORT, which backs the product cache and the stock
+reservations taken by order creation.
+
+Each scenario runs in its own transaction that is rolled back afterwards, so
+order creation leaves the seeded stock and history untouched and repeated
+runs measure the same data. Commits inside a scenario become savepoint
+releases, so order creation is timed without the final commit's flush.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from benchmarks.seed import SCALES, sizes_for
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+@contextmanager
+def rolled_back(engine: Engine) -> Iterator[Session]:
+    """Session whose commits are savepoints of a transaction rolled back on exit"""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+            transaction.rollback()
+
+def build_scenarios(db: Session, sizes: Dict[str, int], rng: random.Random) -> Dict[str, Callable[[], object]]:
+    from app.api.v1.analytics import get_dashboard_metrics, get_sales_trends
+    from app.crud.order import order as crud_order
+    from app.crud.product import product as crud_product
+    from app.schemas.order import OrderCreate, OrderItemCreate
+
+    loop = asyncio.new_event_loop()
+
+    def product_listing():
+        return crud_product.get_multi(db, skip=rng.randint(0, 1000), limit=100)
+
+    def product_detail():
+        return crud_product.get(db, id=rng.randint(1, sizes["products"]))
+
+    def order_creation():
+        order_in = OrderCreate(
+            items=[
+                OrderItemCreate(product_id=rng.randint(1, sizes["products"]), quantity=1)
+                for _ in range(3)
+            ],
+            shipping_address="1 Benchmark Way"
+        )
+        try:
+            return crud_order.create(db, obj_in=order_in, customer_id=rng.randint(1, sizes["users"]))
+        except ValueError:
+            # Out of stock; still a full round through the checkout path
+            return None
+
+    def order_listing():
+        return crud_order.get_multi(db, customer_id=rng.randint(1, sizes["users"]), limit=100)
+
+    # Measure the queries themselves, not the shared result cache in front of them
+    def dashboard():
+        return loop.run_until_complete(get_dashboard_metrics.__wrapped__(db=db, current_user=None))
+
+    def sales_trends():
+        return loop.run_until_complete(get_sales_trends.__wrapped__(days=30, db=db, current_user=None))
+
+    return {
+        "product_listing": product_listing,
+        "product_detail": product_detail,
+        "order_creation": order_creation,
+        "order_listing": order_listing,
+        "dashboard": dashboard,
+        "sales_trends": sales_trends,
+    }
+
+def measure(operation: Callable[[], object], iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        operation()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every scenario that regressed against the baseline"""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']} ms -> {current['p99_ms']} ms")
+        if current["ops_per_sec"] < previous["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['ops_per_sec']}/s -> {current['ops_per_sec']}/s"
+            )
+    return regressions
+
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="10k",
+                        help="Scale the database was seeded with")
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--scenario", action="append", help="Run only the named scenario(s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    sizes = sizes_for(SCALES[args.scale])
+    with rolled_back(engine) as db:
+        selected = args.scenario or list(build_scenarios(db, sizes, random.Random(args.seed)))
+
+    results = {
+        "scale": args.scale,
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "results": {},
+    }
+    for name in selected:
+        # Every scenario starts from the seeded data with the same random sequence
+        with rolled_back(engine) as db:
+            scenario = build_scenarios(db, sizes, random.Random(args.seed))[name]
+            results["results"][name] = measure(scenario, args.iterations, args.warmup)
+        stats = results["results"][name]
+        print(f"{name:<16} {stats['ops_per_sec']:>10.1f}/s  p50={stats['p50_ms']:>8.3f} ms  p99={stats['p99_ms']:>8.3f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
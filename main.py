@@ -1,10 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api import api_router
 from redis import Redis
 from app.middleware.rate_limiter import RateLimitMiddleware
 from app.core.load_balancer import LoadBalancer
+from app.core.metrics import registry as metrics_registry
+from app.core.startup import autocomplete_lifespan
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
 
 # Initialize Redis client
 redis_client = Redis.from_url(settings.REDIS_URL)
@@ -17,7 +22,9 @@ app = FastAPI(
     description="A modern e-commerce platform API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # Build the product autocomplete index at startup and reload it periodically
+    lifespan=autocomplete_lifespan
 )
 
 # Configure CORS with restricted origins
@@ -30,7 +37,24 @@ app.add_middleware(
 )
 
 # Add Rate Limiting Middleware
-app.add_middleware(RateLimitMiddleware, redis_client=redis_client)
+app.add_middleware(
+    RateLimitMiddleware,
+    redis_client=redis_client,
+    exempt_paths=settings.RATE_LIMIT_EXEMPT_PATHS,
+    requests_per_minute=settings.RATE_LIMIT_REQUESTS_PER_MINUTE
+)
+
+# Account for SQL executed per request
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        debug=settings.DEBUG,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD
+    )
+
+# Add request metrics last so it wraps every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix="/api")
@@ -43,6 +67,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose request metrics in Prometheus text format"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
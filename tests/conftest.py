@@ -13,6 +13,12 @@ from app.db.base_class import Base
 from app.main import app
 from app.core.config import settings
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "postgres: needs a scratch PostgreSQL database at TEST_POSTGRES_URL; skipped without one"
+    )
+
 # Use in-memory SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
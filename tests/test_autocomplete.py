@@ -0,0 +1,75 @@
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.analytics.leaderboard import DAY_KEY, leaderboard
+from app.core import startup
+from app.core.autocomplete import PrefixIndex
+from app.core.celery import celery_app
+from app.crud.product import product as crud_product
+from app.schemas.product import ProductCreate
+
+ROWS = [
+    (1, "Zebra Keyboard", 50),
+    (2, "Zen Mouse", 40),
+    (3, "Zinc Stand", 30),
+    (4, "Zoom Webcam", 20),
+]
+
+def test_bump_reranks_memoized_prefixes():
+    """Test that sales re-rank memoized short prefixes instead of discarding them."""
+    index = PrefixIndex(max_suggestions=3)
+    index.load(ROWS)
+    assert [id for id, _ in index.suggest("z")] == [1, 2, 3]
+    memoized = index._top_cache["z"]
+
+    # A product cut from the memoized list overtakes the leader
+    index.bump(4, 100)
+    assert index._top_cache["z"] is memoized
+    assert [id for id, _ in index.suggest("z")] == [4, 1, 2]
+
+    # Sales of a listed product reorder it in place
+    index.bump(2, 100)
+    assert index._top_cache["z"] is memoized
+    assert [id for id, _ in index.suggest("z")] == [2, 4, 1]
+
+    # A cancellation may let an unlisted product back in, so the prefix is rescanned
+    index.bump(2, -200)
+    assert "z" not in index._top_cache
+    assert [id for id, _ in index.suggest("z")] == [4, 1, 3]
+
+def test_autocomplete_lifespan_load_and_refresh(monkeypatch):
+    """Test that an app with the lifespan loads the index at startup and reloads it periodically."""
+    loads = []
+    monkeypatch.setattr(startup, "load_product_autocomplete", lambda: loads.append(1))
+    monkeypatch.setattr(startup.settings, "AUTOCOMPLETE_REFRESH_SECONDS", 0.01)
+    app = FastAPI(lifespan=startup.autocomplete_lifespan)
+
+    with TestClient(app) as client:
+        assert len(loads) == 1
+        refresh = app.state.autocomplete_refresh
+        client.portal.call(startup.asyncio.sleep, 0.1)
+        assert len(loads) > 1
+    assert refresh.cancelled() or refresh.done()
+
+def test_load_autocomplete_ranks_by_leaderboard(db):
+    """Test that the index takes popularity from the best-seller leaderboard."""
+    quiet, busy = [
+        crud_product.create(db, obj_in=ProductCreate(
+            name=name, description="A xylophone", price=9.99, stock=10,
+            category="music", sku=f"XYLO-{index}"
+        ), seller_id=1)
+        for index, name in enumerate(["Xylo Quiet", "Xylo Busy"])
+    ]
+    redis = celery_app.backend.client
+    today = datetime.utcnow().date()
+    # Orders placed by other tests today may have sold the same product ids
+    for metric in ("units", "revenue"):
+        redis.zrem(DAY_KEY.format(metric, today.isoformat()), quiet.id, busy.id)
+    leaderboard.record([(busy.id, 5, 50.0)], today)
+    redis.delete(*redis.keys("bestsellers:*:window:*") or ["none"])
+    try:
+        crud_product.load_autocomplete(db)
+        assert [id for id, _ in crud_product.autocomplete("xylo")] == [busy.id, quiet.id]
+    finally:
+        leaderboard.record([(busy.id, 5, 50.0)], today, sign=-1)
+        redis.delete(*redis.keys("bestsellers:*:window:*") or ["none"])
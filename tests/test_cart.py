@@ -0,0 +1,93 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.main import app
+from app.api.deps import get_current_active_user
+from app.core.cart import carts
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.product import Product
+from app.models.user import User
+
+# Initialize TestClient
+client = TestClient(app, raise_server_exceptions=True)
+
+@pytest.fixture
+def cart_user(db: Session):
+    """Serves the cart routes as a test user against the test database."""
+    user = db.query(User).filter(User.email == "cart@example.com").first()
+    if user is None:
+        user = User(email="cart@example.com", hashed_password="not-used", full_name="Cart User")
+        db.add(user)
+        db.commit()
+    for product_id in (1, 2):
+        if db.get(Product, product_id) is None:
+            db.add(Product(
+                id=product_id, name=f"Cart Product {product_id}", price=5.0, stock=100,
+                category="test", sku=f"CART-{product_id}", seller_id=user.id
+            ))
+    db.commit()
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+    client.delete(f"{settings.API_V1_STR}/cart/")
+    yield user
+    app.dependency_overrides.clear()
+
+def test_cart_add_update_remove(cart_user):
+    """Test cart line changes against the Redis hash."""
+    response = client.post(f"{settings.API_V1_STR}/cart/items", json={"product_id": 1, "quantity": 2})
+    assert response.status_code == 200
+    client.post(f"{settings.API_V1_STR}/cart/items", json={"product_id": 1, "quantity": 1})
+    response = client.put(f"{settings.API_V1_STR}/cart/items/2", json={"quantity": 4})
+    items = {item["product_id"]: item["quantity"] for item in response.json()["items"]}
+    assert items == {1: 3, 2: 4}
+
+    response = client.delete(f"{settings.API_V1_STR}/cart/items/2")
+    assert response.json()["items"] == [{"product_id": 1, "quantity": 3}]
+
+def test_cart_checkout(cart_user):
+    """Test that checkout creates an order from the cart and empties it."""
+    client.post(f"{settings.API_V1_STR}/cart/items", json={"product_id": 1, "quantity": 1})
+    response = client.post(f"{settings.API_V1_STR}/cart/checkout", json={"shipping_address": "123 Test St"})
+    assert response.status_code == 200
+    assert response.json()["customer_id"] == cart_user.id
+    assert [item["product_id"] for item in response.json()["items"]] == [1]
+
+    response = client.get(f"{settings.API_V1_STR}/cart/")
+    assert response.json()["items"] == []
+
+    # Checking out an empty cart is rejected
+    response = client.post(f"{settings.API_V1_STR}/cart/checkout", json={"shipping_address": "123 Test St"})
+    assert response.status_code == 400
+
+def test_cart_checkout_idempotency_key(cart_user):
+    """Test that a retried checkout replays the order and keeps lines added meanwhile."""
+    client.post(f"{settings.API_V1_STR}/cart/items", json={"product_id": 1, "quantity": 1})
+    headers = {"Idempotency-Key": f"checkout-{uuid.uuid4()}"}
+    body = {"shipping_address": "123 Test St"}
+    response = client.post(f"{settings.API_V1_STR}/cart/checkout", json=body, headers=headers)
+    assert response.status_code == 200
+    order = response.json()
+
+    # The cart is empty now, but the retry is answered with the first order
+    response = client.post(f"{settings.API_V1_STR}/cart/checkout", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json() == order
+
+def test_cart_checkout_keeps_new_lines(cart_user, monkeypatch):
+    """Test that lines added while an order is placed stay in the cart."""
+    from app.api.v1 import cart as cart_api
+    client.post(f"{settings.API_V1_STR}/cart/items", json={"product_id": 1, "quantity": 1})
+
+    def create_order(**kwargs):
+        order = place_order(**kwargs)
+        carts.add(cart_user.id, 2, 3)
+        return order
+
+    place_order = cart_api.create_order
+    monkeypatch.setattr(cart_api, "create_order", create_order)
+    response = client.post(f"{settings.API_V1_STR}/cart/checkout", json={"shipping_address": "123 Test St"})
+    assert response.status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/cart/").json()["items"] == [{"product_id": 2, "quantity": 3}]
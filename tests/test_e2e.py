@@ -1,9 +1,12 @@
 import pytest
 import time
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.main import app
+from app.core.celery import celery_app
 from app.core.config import settings
+from app.middleware.rate_limiter import RateLimitMiddleware
 
 # Initialize TestClient with the correct parameter format
 client = TestClient(app, raise_server_exceptions=True)
@@ -110,3 +113,28 @@ def test_concurrent_order_processing(db: Session, test_user_token_headers):
     for response in responses:
         assert response.status_code == 200
         assert "id" in response.json()
+
+def test_rate_limit_headers(db: Session):
+    """Test that allowed responses carry rate limit headers."""
+    redis = celery_app.backend.client
+    limited_app = FastAPI()
+    limited_app.add_middleware(
+        RateLimitMiddleware,
+        redis_client=redis,
+        key_prefix="ratelimit-test:",
+        requests_per_minute=5
+    )
+
+    @limited_app.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    try:
+        response = TestClient(limited_app).get("/ping")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "5"
+        assert response.headers["X-RateLimit-Remaining"] == "4"
+        assert "X-RateLimit-Reset" in response.headers
+    finally:
+        for key in redis.scan_iter("ratelimit-test:*"):
+            redis.delete(key)
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.main import app
+from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.crud import crud_order
+from app.db.session import get_db
+from app.models.order import OrderStatus
+from app.models.payment import Payment, PaymentMethod, PaymentStatus
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderItemCreate
+
+# Initialize TestClient
+client = TestClient(app, raise_server_exceptions=True)
+
+@pytest.fixture
+def export_admin(db: Session):
+    """Serves the export routes to a superuser against the test database."""
+    admin = User(id=1, email="admin@example.com", is_active=True, is_superuser=True)
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    app.dependency_overrides[get_db] = lambda: db
+    yield admin
+    app.dependency_overrides.clear()
+
+def test_export_orders_ndjson(db: Session, export_admin):
+    """Test streaming the order history as NDJSON."""
+    product = Product(name="Exported Product", price=3.0, stock=10, category="test")
+    db.add(product)
+    db.commit()
+    order_in = OrderCreate(
+        items=[OrderItemCreate(product_id=product.id, quantity=1)],
+        shipping_address="123 Test St"
+    )
+    order = crud_order.create(db, obj_in=order_in, customer_id=1)
+
+    response = client.get(f"{settings.API_V1_STR}/exports/orders?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == 'attachment; filename="orders.ndjson"'
+    rows = {row["id"]: row for row in map(json.loads, response.text.splitlines())}
+    assert rows[order.id]["order_number"] == order.order_number
+    assert rows[order.id]["status"] == OrderStatus.PENDING.value
+
+def test_export_payments_csv(db: Session, export_admin):
+    """Test streaming the payment history as CSV."""
+    payment = Payment(
+        order_id=1, amount=12.5, payment_method=PaymentMethod.PAYPAL,
+        status=PaymentStatus.COMPLETED, transaction_id="TX-EXPORT-1"
+    )
+    db.add(payment)
+    db.commit()
+
+    response = client.get(f"{settings.API_V1_STR}/exports/payments?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.reader(io.StringIO(response.text))
+    assert next(reader)[:3] == ["id", "order_id", "amount"]
+    assert [str(payment.id), "1", "12.5"] in [row[:3] for row in reader]
+
+def test_export_invalid_format(db: Session, export_admin):
+    """Test requesting an unsupported export format."""
+    response = client.get(f"{settings.API_V1_STR}/exports/orders?format=xml")
+    assert response.status_code == 400
+
+def test_export_requires_superuser(db: Session, export_admin):
+    """Test that regular users cannot export."""
+    export_admin.is_superuser = False
+    response = client.get(f"{settings.API_V1_STR}/exports/orders")
+    assert response.status_code == 403
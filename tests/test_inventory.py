@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.celery import celery_app
+from app.core.inventory import EXPIRY_KEY, reservations
+from app.crud.order import order as crud_order
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.tasks import inventory as inventory_tasks
+
+redis = celery_app.backend.client
+
+@pytest.fixture
+def products(db: Session):
+    """A mirrored hot product and a regular one, each with 10 units."""
+    hot = Product(name="Hot Product", price=10.0, stock=10, category="test")
+    regular = Product(name="Regular Product", price=2.0, stock=10, category="test")
+    db.add_all([hot, regular])
+    db.commit()
+    reservations.mirror(hot.id, hot.stock)
+    yield hot, regular
+    reservations.unmirror(hot.id)
+
+def place_order(db: Session, lines) -> Order:
+    return crud_order.create(db, obj_in=OrderCreate(
+        items=[OrderItemCreate(product_id=product_id, quantity=quantity) for product_id, quantity in lines],
+        shipping_address="123 Test St"
+    ), customer_id=1)
+
+def test_reserve_then_confirm(db: Session, products):
+    """Test that reserved units leave the mirror at checkout and the table on confirmation."""
+    hot, regular = products
+    order = place_order(db, [(hot.id, 3), (regular.id, 2)])
+    reservation_id = order.reservation_id
+    assert reservation_id is not None
+    assert reservations.available(hot.id) == 7
+    db.refresh(hot)
+    db.refresh(regular)
+    assert (hot.stock, regular.stock) == (10, 8)
+
+    crud_order.confirm_reservation(db, db_obj=order)
+    db.refresh(hot)
+    assert order.reservation_id is None
+    assert hot.stock == 7
+    assert reservations.available(hot.id) == 7
+    # A committed reservation is closed, so a late sweep gives nothing back
+    assert reservations.release(reservation_id) == {}
+    assert reservations.available(hot.id) == 7
+
+def test_oversold_order_rejected(db: Session, products):
+    """Test that an order exceeding the mirrored stock is refused without touching either store."""
+    hot, regular = products
+    with pytest.raises(ValueError):
+        place_order(db, [(hot.id, 11), (regular.id, 1)])
+    assert reservations.available(hot.id) == 10
+    db.refresh(regular)
+    assert regular.stock == 10
+
+def test_expired_reservation_swept(db: Session, products, monkeypatch):
+    """Test that the sweeper cancels an unconfirmed order and restores both stores."""
+    hot, regular = products
+    order = place_order(db, [(hot.id, 4), (regular.id, 3)])
+    reservation_id = order.reservation_id
+    # Age the reservation past its TTL
+    redis.zadd(EXPIRY_KEY, {reservation_id: 0})
+    monkeypatch.setattr(inventory_tasks, "SessionLocal", sessionmaker(bind=db.get_bind()))
+
+    assert inventory_tasks.release_expired_reservations() >= 1
+    db.expire_all()
+    order = db.get(Order, order.id)
+    assert order.status == OrderStatus.CANCELLED
+    assert order.reservation_id is None
+    assert reservations.available(hot.id) == 10
+    assert db.get(Product, regular.id).stock == 10
+    assert db.get(Product, hot.id).stock == 10
+    assert reservation_id not in reservations.expired()
+
+def test_concurrent_reservations_never_oversell(products):
+    """Test that concurrent reservations beyond the mirrored stock are refused atomically."""
+    hot, _ = products
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: reservations.reserve({hot.id: 1}), range(25)))
+    granted = [result[0] for result in results if result is not None]
+    try:
+        assert len(granted) == 10
+        assert reservations.available(hot.id) == 0
+        assert reservations.reserve({hot.id: 1}) is None
+    finally:
+        for reservation_id in granted:
+            reservations.release(reservation_id)
+    assert reservations.available(hot.id) == 10
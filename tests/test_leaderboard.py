@@ -0,0 +1,108 @@
+from datetime import date, datetime, timedelta
+from app.analytics.leaderboard import DAY_KEY, BestSellerLeaderboard
+from app.core.celery import celery_app
+
+TODAY = date(2001, 3, 31)
+
+def test_leaderboard_windows_and_cancellation():
+    """Test rolling windows over daily sets and reversal on cancellation."""
+    redis = celery_app.backend.client
+    board = BestSellerLeaderboard(redis, windows=(7, 30), window_ttl=1)
+    try:
+        board.record([(1, 5, 50.0), (2, 3, 90.0)], TODAY)
+        board.record([(1, 2, 20.0)], TODAY - timedelta(days=3))
+        board.record([(3, 100, 100.0)], TODAY - timedelta(days=20))
+
+        week = board.top(7, limit=10, today=TODAY)
+        assert [(entry["product_id"], entry["units"]) for entry in week] == [(1, 7), (2, 3)]
+        assert week[0]["revenue"] == 70.0
+        month = board.top(30, limit=1, today=TODAY)
+        assert month[0]["product_id"] == 3
+        assert board.top(30, limit=10, by="revenue", today=TODAY)[0]["product_id"] == 3
+
+        # Cancelling reverses the lines on the day the order was placed
+        board.record([(2, 3, 90.0)], TODAY, sign=-1)
+        redis.delete(*redis.keys("bestsellers:*:window:*"))
+        week = board.top(7, limit=10, today=TODAY)
+        assert [entry["product_id"] for entry in week] == [1]
+    finally:
+        redis.delete(*redis.keys("bestsellers:*2001-0*"))
+
+def test_leaderboard_uses_charged_price_and_follows_status_updates(db):
+    """Test that revenue is the discounted line price and that cancelling through an update reverses it."""
+    from app.crud.order import order as crud_order
+    from app.models.order import Order, OrderStatus
+    from app.models.order_item import OrderItem
+    from app.models.product import Product
+    from app.schemas.order import OrderCreate, OrderItemCreate, OrderUpdate
+
+    redis = celery_app.backend.client
+    board = BestSellerLeaderboard(redis, windows=(7,), window_ttl=1)
+    try:
+        board.record_order(Order(created_at=datetime(2001, 3, 31), items=[
+            OrderItem(product_id=1, quantity=2, unit_price=10.0, subtotal=20.0, discount=5.0, final_price=15.0)
+        ]))
+        assert board.top(7, today=TODAY)[0]["revenue"] == 15.0
+    finally:
+        redis.delete(*redis.keys("bestsellers:*2001-0*"))
+
+    product = Product(name="Ranked Product", price=4.0, stock=10, category="test", sku="RANKED-1")
+    db.add(product)
+    db.commit()
+    key = DAY_KEY.format("units", datetime.utcnow().date().isoformat())
+    before = redis.zscore(key, product.id) or 0
+    order = crud_order.create(db, obj_in=OrderCreate(
+        items=[OrderItemCreate(product_id=product.id, quantity=3)],
+        shipping_address="123 Test St"
+    ), customer_id=1)
+    assert redis.zscore(key, product.id) == before + 3
+
+    crud_order.update(db, db_obj=order, obj_in=OrderUpdate(status=OrderStatus.CANCELLED))
+    assert (redis.zscore(key, product.id) or 0) == before
+    # Updates that leave the order cancelled change nothing
+    crud_order.update(db, db_obj=order, obj_in=OrderUpdate(shipping_address="456 Other St"))
+    assert (redis.zscore(key, product.id) or 0) == before
+
+def test_product_performance_serves_leaderboard(db):
+    """Test that the product-performance endpoint ranks the leaderboard by revenue with product names."""
+    from fastapi.testclient import TestClient
+    from app.analytics.leaderboard import WINDOW_KEY, leaderboard
+    from app.api.deps import get_current_user
+    from app.core.config import settings
+    from app.core.result_cache import result_cache
+    from app.db.session import get_db
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+
+    redis = celery_app.backend.client
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="analyst@example.com")
+    app.dependency_overrides[get_db] = lambda: db
+    product = Product(name="Top Seller", price=4.0, stock=10, category="test", sku="TOP-SELLER-1")
+    db.add(product)
+    db.commit()
+    today = datetime.utcnow().date()
+    cached = [result_cache.key("analytics:product-performance", {"limit": 1, "days": 7})] + [
+        WINDOW_KEY.format(metric, 7, today.isoformat()) for metric in ("units", "revenue")
+    ]
+    redis.delete(*cached)
+    # Orders placed by other tests today may have sold the same product id
+    for metric in ("units", "revenue"):
+        redis.zrem(DAY_KEY.format(metric, today.isoformat()), product.id)
+    leaderboard.record([(product.id, 2, 1e9)], today)
+    try:
+        response = client.get(f"{settings.API_V1_STR}/analytics/product-performance?limit=1&days=7")
+        assert response.status_code == 200
+        assert response.json() == [{
+            "product_id": product.id,
+            "product_name": "Top Seller",
+            "units_sold": 2,
+            "revenue": 1e9
+        }]
+        response = client.get(f"{settings.API_V1_STR}/analytics/product-performance?days=5")
+        assert response.status_code == 400
+    finally:
+        leaderboard.record([(product.id, 2, 1e9)], today, sign=-1)
+        redis.delete(*cached)
+        app.dependency_overrides.clear()
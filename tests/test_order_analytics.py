@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.analytics.order_analytics import OrderAnalytics
+from app.models.order import Order, OrderStatus
+from benchmarks.seed import seed
+
+np = pytest.importorskip("numpy")
+from app.analytics.columnar import ColumnarOrderFacts
+
+@pytest.fixture
+def analytics_db():
+    engine = create_engine("sqlite:///:memory:")
+    seed(engine, orders=500)
+    db = sessionmaker(bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def test_columnar_engine_matches_sql(analytics_db):
+    """Test that the columnar engine answers like the SQL path."""
+    sql = OrderAnalytics(analytics_db)
+    columnar = OrderAnalytics(analytics_db, facts=ColumnarOrderFacts())
+
+    assert columnar.get_order_volume_by_status() == sql.get_order_volume_by_status()
+    expected = sql.get_top_selling_products(limit=5)
+    actual = columnar.get_top_selling_products(limit=5)
+    assert [p["total_quantity"] for p in actual] == [p["total_quantity"] for p in expected]
+    assert [p["total_revenue"] for p in actual] == pytest.approx([p["total_revenue"] for p in expected])
+    assert columnar.get_order_volume_by_status(days=30) == sql.get_order_volume_by_status(days=30)
+
+    # SQLite cannot average timestamp differences, so the baseline is computed here
+    delivered = (
+        analytics_db.query(Order.created_at, Order.updated_at)
+        .filter(Order.status == OrderStatus.DELIVERED)
+        .all()
+    )
+    durations = [updated - created for created, updated in delivered]
+    metrics = columnar.get_order_processing_metrics()
+    assert metrics["min_processing_time"] == min(durations)
+    assert metrics["max_processing_time"] == max(durations)
+    assert metrics["avg_processing_time"].total_seconds() == pytest.approx(
+        (sum(durations, timedelta()) / len(durations)).total_seconds()
+    )
+    processing = analytics_db.query(Order).filter(Order.status == OrderStatus.PROCESSING)
+    assert metrics["orders_in_processing"] == processing.count()
+    recent = columnar.get_order_processing_metrics(days=30)
+    since = datetime.utcnow() - timedelta(days=30)
+    assert recent["orders_in_processing"] == processing.filter(Order.created_at >= since).count()
+
+def test_columnar_engine_refreshes_incrementally(analytics_db):
+    """Test that new and updated orders are picked up from the watermark."""
+    facts = ColumnarOrderFacts().refresh(analytics_db)
+    before = facts.volume_by_status()
+
+    order = analytics_db.query(Order).filter(Order.status == OrderStatus.PENDING).first()
+    order.status = OrderStatus.CANCELLED
+    order.updated_at = datetime.utcnow()
+    analytics_db.add(Order(
+        order_number="QS-NEW", user_id=1, total_amount=10.0,
+        status=OrderStatus.PENDING, shipping_address="1 Test St", created_at=datetime.utcnow()
+    ))
+    analytics_db.commit()
+
+    after = facts.refresh(analytics_db, force=True).volume_by_status()
+    assert after["cancelled"] == before["cancelled"] + 1
+    assert after["pending"] == before["pending"]
+    assert facts.orders.size == 501
+
+def test_columnar_snapshot_unchanged_by_refresh(analytics_db):
+    """Test that a query's snapshot is not touched by a later refresh."""
+    gap = analytics_db.query(Order).first()
+    gap_id = gap.id
+    for item in gap.items:
+        analytics_db.delete(item)
+    analytics_db.delete(gap)
+    analytics_db.commit()
+    facts = ColumnarOrderFacts().refresh(analytics_db)
+    snapshot = facts._snapshot
+    status = snapshot.orders["status"].copy()
+    order_pos = snapshot.items["order_pos"].copy()
+
+    order = analytics_db.query(Order).filter(Order.status == OrderStatus.PENDING).first()
+    order.status = OrderStatus.CANCELLED
+    order.updated_at = datetime.utcnow()
+    # An id below the newest one commits late, so the columns get re-sorted
+    analytics_db.add(Order(
+        id=gap_id, order_number="QS-LATE", user_id=1, total_amount=10.0,
+        status=OrderStatus.PENDING, shipping_address="1 Test St", created_at=datetime.utcnow()
+    ))
+    analytics_db.commit()
+    facts.refresh(analytics_db, force=True)
+
+    assert facts._snapshot is not snapshot
+    assert np.array_equal(snapshot.orders["status"], status)
+    assert np.array_equal(snapshot.items["order_pos"], order_pos)
+    assert np.all(np.diff(facts._snapshot.orders["id"]) > 0)
+    assert len(facts._snapshot.orders["id"]) == len(status) + 1
+
+def test_columnar_reload_drops_deleted_orders(analytics_db):
+    """Test that a full reload drops orders deleted since the last one."""
+    facts = ColumnarOrderFacts().refresh(analytics_db)
+    order = analytics_db.query(Order).first()
+    for item in order.items:
+        analytics_db.delete(item)
+    analytics_db.delete(order)
+    analytics_db.commit()
+
+    assert facts.refresh(analytics_db, force=True).orders.size == 500
+    facts.reload_interval = 0.001
+    assert facts.refresh(analytics_db, force=True).orders.size == 499
+    assert sum(facts.volume_by_status().values()) == 499
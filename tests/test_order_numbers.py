@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.core.celery import celery_app
+from app.core.order_numbers import (
+    MAX_SEQUENCE,
+    SnowflakeGenerator,
+    WorkerIdLease,
+    decode,
+    encode,
+)
+
+def generate(generator: SnowflakeGenerator, count: int) -> list:
+    return [generator.next_id() for _ in range(count)]
+
+def test_ids_unique_under_concurrent_generation():
+    """Test that threads sharing a generator never receive the same id."""
+    generator = SnowflakeGenerator(worker_id=7)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        batches = list(pool.map(lambda _: generate(generator, 50_000), range(8)))
+
+    ids = [id for batch in batches for id in batch]
+    assert len(set(ids)) == len(ids)
+    # Each thread sees strictly increasing ids
+    for batch in batches:
+        assert all(a < b for a, b in zip(batch, batch[1:]))
+
+def test_ids_unique_across_workers():
+    """Test that generators with different worker ids cannot collide."""
+    generators = [SnowflakeGenerator(worker_id=worker_id) for worker_id in range(4)]
+    threads, results = [], []
+    for generator in generators:
+        thread = threading.Thread(target=lambda g=generator: results.append(generate(g, 20_000)))
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [id for batch in results for id in batch]
+    assert len(set(ids)) == len(ids) == 80_000
+
+def test_ids_monotonic_when_clock_steps_back_or_stalls():
+    """Test that a frozen or rewound clock still yields increasing ids."""
+    now = [1_800_000_000_000_000_000]
+    generator = SnowflakeGenerator(worker_id=1, clock=lambda: now[0])
+    ids = generate(generator, MAX_SEQUENCE * 3)
+    now[0] -= 5_000_000_000
+    ids += generate(generator, 100)
+    assert all(a < b for a, b in zip(ids, ids[1:]))
+
+def test_encoding_round_trips_and_sorts():
+    """Test that encoded order numbers decode back and keep id order."""
+    generator = SnowflakeGenerator(worker_id=3)
+    ids = generate(generator, 1000)
+    numbers = [encode(id) for id in ids]
+    assert [decode(number) for number in numbers] == ids
+    assert numbers == sorted(numbers)
+    assert len({len(number) for number in numbers}) == 1
+
+def test_worker_id_leases_are_exclusive():
+    """Test that concurrent leases from Redis get distinct worker ids."""
+    redis = celery_app.backend.client
+    leases = [WorkerIdLease(redis, ttl=5) for _ in range(16)]
+    try:
+        worker_ids = [lease.acquire() for lease in leases]
+        assert len(set(worker_ids)) == len(worker_ids)
+        assert all(lease.renew() for lease in leases)
+    finally:
+        for lease in leases:
+            lease.release()
@@ -3,7 +3,11 @@ import time
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.main import app
+from app.api.deps import get_current_active_user
 from app.core.config import settings
+from app.db.session import get_db
+from app.models.product import Product
+from app.models.user import User
 from app.models.order import OrderStatus
 from app.schemas.order import OrderCreate, OrderItemCreate
 from app.crud import crud_order
@@ -11,6 +15,21 @@ from app.crud import crud_order
 # Initialize TestClient
 client = TestClient(app, raise_server_exceptions=True)
 
+@pytest.fixture
+def order_user(db: Session):
+    """Serves the order routes as a test user against the test database."""
+    user = db.query(User).filter(User.email == "orders@example.com").first()
+    if user is None:
+        user = User(email="orders@example.com", hashed_password="not-used", full_name="Order User")
+        db.add(user)
+    product = Product(name="Order Product", price=5.0, stock=100, category="test")
+    db.add(product)
+    db.commit()
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+    yield user, product
+    app.dependency_overrides.clear()
+
 def test_create_order(db: Session, test_user_token_headers):
     """Test creating a new order."""
     data = {
@@ -146,3 +165,112 @@ def test_get_nonexistent_order(db: Session, test_user_token_headers):
     )
     # Expecting a 404 not found error
     assert response.status_code == 404
+
+def test_create_order_idempotency_key(order_user, monkeypatch):
+    """Test that retrying with the same Idempotency-Key replays the first order."""
+    from app.core.idempotency import idempotency_store
+
+    user, product = order_user
+    data = {
+        "items": [{"product_id": product.id, "quantity": 1}],
+        "shipping_address": "123 Test St"
+    }
+    headers = {"Idempotency-Key": f"retry-{time.time()}"}
+    first = client.post(f"{settings.API_V1_STR}/orders/", headers=headers, json=data)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post(f"{settings.API_V1_STR}/orders/", headers=headers, json=data)
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # Reusing the key for a different order is rejected
+    data["shipping_address"] = "456 Other St"
+    response = client.post(f"{settings.API_V1_STR}/orders/", headers=headers, json=data)
+    assert response.status_code == 422
+
+    # A duplicate of a request still in flight gives up with 409 instead of executing
+    key = f"in-flight-{time.time()}"
+    monkeypatch.setattr(idempotency_store, "wait_timeout", 0.1)
+    idempotency_store.redis.set(f"idempotency:orders:{user.id}:{key}:lock", "other-request", ex=30)
+    response = client.post(f"{settings.API_V1_STR}/orders/", headers={"Idempotency-Key": key}, json=data)
+    assert response.status_code == 409
+
+def test_idempotency_response_kept_by_lock_holder():
+    """Test that a request whose lock expired does not overwrite the response of the one that took over."""
+    from app.core.idempotency import StoredResponse, idempotency_store
+
+    key = f"takeover-{time.time()}"
+    stored, token = idempotency_store.begin(key, "fingerprint")
+    assert stored is None and token
+    # The lock expires and a retry takes it over
+    idempotency_store.redis.set(f"idempotency:{key}:lock", "retry", ex=30)
+
+    assert not idempotency_store.complete(key, token, StoredResponse(200, b"{}", "fingerprint"))
+    assert idempotency_store.redis.get(f"idempotency:{key}") is None
+    idempotency_store.abort(key, token)
+    assert idempotency_store.redis.get(f"idempotency:{key}:lock") == b"retry"
+
+    assert idempotency_store.complete(key, "retry", StoredResponse(201, b"{}", "fingerprint"))
+    assert idempotency_store.begin(key, "fingerprint")[0].status_code == 201
+    assert idempotency_store.redis.get(f"idempotency:{key}:lock") is None
+
+def test_create_order_async_intake(db: Session, order_user, monkeypatch):
+    """Test that async intake acknowledges with 202 and materializes the order later."""
+    from sqlalchemy.orm import sessionmaker
+    from app.tasks import orders as order_tasks
+
+    monkeypatch.setattr(settings, "ORDER_INTAKE_ASYNC", True)
+    monkeypatch.setattr(order_tasks, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    user, product = order_user
+    data = {
+        "items": [{"product_id": product.id, "quantity": 1}],
+        "shipping_address": "123 Test St"
+    }
+    response = client.post(f"{settings.API_V1_STR}/orders/", json=data)
+    assert response.status_code == 202
+    reference = response.json()["reference"]
+
+    status = client.get(f"{settings.API_V1_STR}/orders/intake/{reference}")
+    assert status.json()["status"] == "queued"
+
+    order_tasks.materialize_order_intake()
+    status = client.get(f"{settings.API_V1_STR}/orders/intake/{reference}")
+    assert status.json()["status"] == "created"
+    order = crud_order.get(db, id=status.json()["order_id"])
+    assert order.user_id == user.id
+    assert [item.product_id for item in order.items] == [product.id]
+
+    # Orders that cannot be filled are refused before they are queued
+    data["items"][0]["quantity"] = 1000
+    response = client.post(f"{settings.API_V1_STR}/orders/", json=data)
+    assert response.status_code == 400
+
+def test_materialize_redelivered_intake_entry(db: Session, monkeypatch):
+    """Test that an entry redelivered after its order was committed does not create a second order."""
+    from sqlalchemy.orm import sessionmaker
+    from app.core.order_intake import STREAM_KEY, order_intake
+    from app.models.order import Order
+    from app.models.product import Product
+    from app.tasks import orders as order_tasks
+
+    monkeypatch.setattr(order_tasks, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    product = Product(name="Intake Product", price=5.0, stock=10, category="test", sku="INTAKE-1")
+    db.add(product)
+    db.commit()
+    order_in = OrderCreate(
+        items=[OrderItemCreate(product_id=product.id, quantity=1)],
+        shipping_address="123 Test St"
+    )
+    reference = order_intake.enqueue(1, order_in.model_dump())
+    order_number = order_intake.redis.xrevrange(STREAM_KEY, count=1)[0][1][b"order_number"].decode()
+
+    # A worker committed the order, then died before recording the outcome
+    order = crud_order.create(db, obj_in=order_in, customer_id=1, order_number=order_number)
+
+    order_tasks.materialize_order_intake()
+    status = order_intake.get_status(reference)
+    assert status["status"] == "created"
+    assert status["order_id"] == order.id
+    assert db.query(Order).filter(Order.order_number == order_number).count() == 1
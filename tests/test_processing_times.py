@@ -0,0 +1,110 @@
+import random
+from datetime import date
+import pytest
+from app.analytics.sketch import DDSketch
+
+ACCURACY = 0.01
+
+def exact_quantile(sorted_values, q):
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+@pytest.mark.parametrize("distribution", ["lognormal", "exponential", "uniform"])
+def test_sketch_quantiles_within_relative_accuracy(distribution):
+    """Test that sketch quantiles stay within the relative accuracy of exact percentiles."""
+    rng = random.Random(42)
+    generate = {
+        "lognormal": lambda: rng.lognormvariate(8, 1.5),
+        "exponential": lambda: rng.expovariate(1 / 3600),
+        "uniform": lambda: rng.uniform(60, 864000),
+    }[distribution]
+    values = [generate() for _ in range(50_000)]
+    sketch = DDSketch(ACCURACY)
+    sketch.update(values)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= ACCURACY * exact
+
+def test_merged_sketches_match_single_sketch():
+    """Test that merging per-day/per-worker sketches equals sketching all values at once."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(9, 1) for _ in range(20_000)]
+    whole = DDSketch(ACCURACY)
+    whole.update(values)
+
+    merged = DDSketch(ACCURACY)
+    for part in range(8):
+        shard = DDSketch(ACCURACY)
+        shard.update(values[part::8])
+        merged.merge(shard)
+
+    assert merged.count == whole.count
+    for q in (0.5, 0.9, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+def test_sketch_handles_zero_and_empty():
+    """Test zero durations and empty sketches."""
+    sketch = DDSketch(ACCURACY)
+    assert sketch.quantile(0.5) is None
+    sketch.update([0, 0, 0, 10])
+    assert sketch.quantile(0.5) == 0.0
+    assert abs(sketch.quantile(1.0) - 10) <= ACCURACY * 10
+
+def test_processing_time_percentiles_merge_days_and_workers():
+    """Test that percentiles over a range merge the sketches stored in Redis."""
+    from app.analytics.processing_times import ProcessingTimeSketches
+    from app.core.celery import celery_app
+
+    redis = celery_app.backend.client
+    store = ProcessingTimeSketches(redis, relative_accuracy=ACCURACY, retention_days=1)
+    rng = random.Random(3)
+    values = []
+    for day in (date(2001, 1, 1), date(2001, 1, 2)):
+        for worker in ("worker-a", "worker-b"):
+            for _ in range(500):
+                value = rng.uniform(60, 7200)
+                values.append(value)
+                store.record(value, day, worker)
+    try:
+        percentiles = store.percentiles(date(2001, 1, 1), date(2001, 1, 2))
+        values.sort()
+        exact = exact_quantile(values, 0.9)
+        assert abs(percentiles["p90"].total_seconds() - exact) <= ACCURACY * exact
+        assert store.sketch(date(2001, 1, 1), date(2001, 1, 1), workers=["worker-a"]).count == 500
+    finally:
+        redis.delete(*redis.keys("processing_times:2001-01-0*"))
+
+def test_processing_times_endpoint():
+    """Test that the processing-times endpoint reports percentiles per worker over a date range."""
+    from fastapi.testclient import TestClient
+    from app.analytics.processing_times import processing_times
+    from app.api.deps import get_current_user
+    from app.core.celery import celery_app
+    from app.core.config import settings
+    from app.main import app
+    from app.models.user import User
+
+    redis = celery_app.backend.client
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="analyst@example.com")
+    url = f"{settings.API_V1_STR}/analytics/processing-times"
+    for day in (date(2001, 2, 1), date(2001, 2, 2)):
+        for _ in range(100):
+            processing_times.record(3600, day, "worker-a")
+            processing_times.record(60, day, "worker-b")
+    try:
+        response = client.get(url, params={"start": "2001-02-01", "end": "2001-02-02", "worker": "worker-a"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["start"] == "2001-02-01" and body["end"] == "2001-02-02"
+        for name in ("p50", "p90", "p99"):
+            assert abs(body[name] - 3600) <= ACCURACY * 3600
+
+        body = client.get(url, params={"start": "2001-02-01", "end": "2001-02-02"}).json()
+        assert abs(body["p50"] - 60) <= ACCURACY * 60
+        assert client.get(url, params={"start": "2001-02-02", "end": "2001-02-01"}).status_code == 400
+    finally:
+        redis.delete(*redis.keys("processing_times:2001-02-0*"))
+        redis.delete(*redis.keys("results:analytics:processing-times:*"))
+        app.dependency_overrides.clear()
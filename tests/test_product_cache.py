@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.celery import celery_app
+from app.core.inventory import reservations
+from app.crud.product import PRODUCT_CACHE_KEY, product as crud_product
+from app.db.base_class import Base
+from app.models.product import Product
+
+redis = celery_app.backend.client
+
+def make_database():
+    path = os.path.join(tempfile.mkdtemp(), "products.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Product(id=424242, name="Hot product", description="", price=9.99, stock=100))
+        db.commit()
+    queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_product_reads(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM products" in statement:
+            queries.append(statement)
+
+    return Session, queries
+
+def burst(Session, product_id: int, concurrency: int = 50) -> list:
+    start = threading.Barrier(concurrency)
+    results = []
+
+    def request():
+        with Session() as db:
+            start.wait()
+            results.append(crud_product.get(db, id=product_id))
+
+    threads = [threading.Thread(target=request) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_expired_product_rebuilt_by_one_query():
+    """Load test: 50 concurrent requests after expiry cost a single database query."""
+    Session, queries = make_database()
+    key = PRODUCT_CACHE_KEY.format(424242)
+    try:
+        for _ in range(3):
+            redis.delete(key)  # Expire the entry
+            queries.clear()
+            results = burst(Session, 424242)
+            assert len(queries) == 1
+            assert all(result is not None and result.name == "Hot product" for result in results)
+    finally:
+        redis.delete(key)
+
+def test_missing_product_negatively_cached():
+    """Test that lookups of a nonexistent id stop reaching the database."""
+    Session, queries = make_database()
+    key = PRODUCT_CACHE_KEY.format(999999999)
+    redis.delete(key)
+    try:
+        results = burst(Session, 999999999)
+        assert results == [None] * 50
+        assert len(queries) == 1
+        assert redis.ttl(key) <= 30
+    finally:
+        redis.delete(key)
+
+def test_reservations_mirror_stock_from_the_row():
+    """Test that enabling reservations mirrors the stock in the database, not a cached copy."""
+    Session, queries = make_database()
+    key = PRODUCT_CACHE_KEY.format(424242)
+    reservations.unmirror(424242)
+    try:
+        with Session() as db:
+            crud_product.get(db, id=424242)  # Cached with 100 in stock
+            db.query(Product).filter(Product.id == 424242).update({Product.stock: 40})
+            db.commit()
+
+            assert crud_product.enable_reservations(db, id=424242)
+            assert reservations.available(424242) == 40
+            assert crud_product.enable_reservations(db, id=999999999) is None
+    finally:
+        reservations.unmirror(424242)
+        redis.delete(key)
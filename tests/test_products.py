@@ -1,8 +1,16 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from app.main import app
-from app.crud import crud_product
+from app.core.celery import celery_app
+from app.crud import crud_order, crud_product
+from app.crud.product import PRODUCT_CACHE_KEY
+from app.db.session import get_db
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.order import OrderCreate, OrderItemCreate
 from app.schemas.product import ProductCreate, ProductUpdate
 from app.core.config import settings
 
@@ -185,3 +193,218 @@ def test_search_products(db: Session):
     assert response.status_code == 200
     content = response.json()
     assert len(content) == 1
+
+def test_search_products_facets(db: Session):
+    """Test search ranking and per-category facet counts over active products."""
+    products = {
+        name: crud_product.create(db, obj_in=ProductCreate(
+            name=name, description=description, price=9.99, stock=10,
+            category=category, sku=f"FACET-{index}", is_active=is_active
+        ), seller_id=1)
+        for index, (name, description, category, is_active) in enumerate([
+            ("Quokka Quokka Lamp", "A lamp", "facet-lighting", True),
+            ("Desk Lamp", "Shaped like a quokka", "facet-lighting", True),
+            ("Quokka Mug", "A mug", "facet-kitchen", True),
+            ("Quokka Poster", "Retired", "facet-decor", False),
+        ])
+    }
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        response = client.get(f"{settings.API_V1_STR}/products/search?query=quokka")
+        assert response.status_code == 200
+        assert [product["id"] for product in response.json()] == [
+            products[name].id for name in ("Quokka Quokka Lamp", "Quokka Mug", "Desk Lamp")
+        ]
+        assert json.loads(response.headers["X-Search-Facets"]) == {"facet-lighting": 2, "facet-kitchen": 1}
+
+        # The category narrows the page but not the facets
+        response = client.get(f"{settings.API_V1_STR}/products/search?query=quokka&category=facet-kitchen")
+        assert [product["id"] for product in response.json()] == [products["Quokka Mug"].id]
+        assert json.loads(response.headers["X-Search-Facets"]) == {"facet-lighting": 2, "facet-kitchen": 1}
+
+        # Without a query, inactive products are left out of both the page and the facets
+        response = client.get(f"{settings.API_V1_STR}/products/search?category=facet-decor")
+        assert response.json() == []
+        facets = json.loads(response.headers["X-Search-Facets"])
+        assert "facet-decor" not in facets
+        assert facets["facet-lighting"] == 2
+    finally:
+        app.dependency_overrides.clear()
+
+def test_autocomplete_products(db: Session):
+    """Test prefix suggestions for product names."""
+    product_in = ProductCreate(
+        name="Zebra Keyboard",
+        description="A mechanical keyboard",
+        price=79.99,
+        stock=10,
+        category="accessories",
+        sku="ZEBRA-KB-1"
+    )
+    product = crud_product.create(db, obj_in=product_in)
+
+    response = client.get(f"{settings.API_V1_STR}/products/autocomplete?q=zeb")
+    assert response.status_code == 200
+    assert {"id": product.id, "name": "Zebra Keyboard"} in response.json()
+
+    # Suggestions also match later words in the name
+    response = client.get(f"{settings.API_V1_STR}/products/autocomplete?q=keyb")
+    assert product.id in [suggestion["id"] for suggestion in response.json()]
+
+def test_get_product_not_modified(db: Session):
+    """Test conditional GET with If-None-Match on a product."""
+    product_in = ProductCreate(
+        name="Cached Product",
+        description="A cached product",
+        price=19.99,
+        stock=10,
+        category="electronics",
+        sku="CACHED-1"
+    )
+    product = crud_product.create(db, obj_in=product_in, seller_id=1)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        response = client.get(f"{settings.API_V1_STR}/products/{product.id}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert "max-age" in response.headers["Cache-Control"]
+
+        response = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        # Updating the product invalidates the previous ETag
+        crud_product.update(db, db_obj=product, obj_in=ProductUpdate(price=29.99))
+        response = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+        # So does the stock taken by an order, and the body shows it
+        etag = response.headers["ETag"]
+        crud_order.create(db, obj_in=OrderCreate(
+            shipping_address="123 Test St",
+            items=[OrderItemCreate(product_id=product.id, quantity=3)]
+        ), customer_id=1)
+        response = client.get(
+            f"{settings.API_V1_STR}/products/{product.id}",
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.json()["stock"] == 7
+    finally:
+        app.dependency_overrides.clear()
+
+def test_listing_etag_follows_availability(db: Session):
+    """Test that sales move the listing ETag only when a product sells out or comes back."""
+    product = crud_product.create(db, obj_in=ProductCreate(
+        name="Listed Product", description="A listed product", price=5.0,
+        stock=4, category="listing-etag", sku="LISTED-1"
+    ), seller_id=1)
+    url = f"{settings.API_V1_STR}/products/?category=listing-etag"
+
+    def order(quantity: int):
+        return crud_order.create(db, obj_in=OrderCreate(
+            shipping_address="123 Test St",
+            items=[OrderItemCreate(product_id=product.id, quantity=quantity)]
+        ), customer_id=1)
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        etag = client.get(url).headers["ETag"]
+        product_etag = client.get(f"{settings.API_V1_STR}/products/{product.id}").headers["ETag"]
+
+        order(1)
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        response = client.get(f"{settings.API_V1_STR}/products/{product.id}", headers={"If-None-Match": product_etag})
+        assert response.status_code == 200
+
+        # Selling the last units changes what listings show
+        sold_out = order(3)
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        # And so does cancelling the order that sold it out
+        crud_order.cancel_order(db, db_obj=sold_out)
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+def test_update_and_delete_cached_product(db: Session):
+    """Test that writes after a cache hit go to the persistent row."""
+    product = crud_product.create(db, obj_in=ProductCreate(
+        name="Cached Writable", description="A cached product", price=10.0,
+        stock=5, category="cache-writes", sku="CACHED-WRITE-1"
+    ), seller_id=1)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=1, email="seller@example.com")
+    try:
+        url = f"{settings.API_V1_STR}/products/{product.id}"
+        # Two reads, so the second is served from the cache
+        client.get(url)
+        assert client.get(url).status_code == 200
+        assert celery_app.backend.client.exists(PRODUCT_CACHE_KEY.format(product.id))
+
+        response = client.put(url, json={"price": 12.5})
+        assert response.status_code == 200
+        assert response.json()["price"] == 12.5
+
+        client.get(url)
+        assert client.delete(url).status_code == 200
+        assert client.get(url).status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+def test_read_products_batch(db: Session):
+    """Test fetching several products in one request, in the requested order, cold and from cache."""
+    created = [
+        crud_product.create(db, obj_in=ProductCreate(
+            name=f"Batch product {i}",
+            description="Batch fetch",
+            price=10.0 + i,
+            stock=5,
+            category="batch",
+            sku=f"BATCH-{i}"
+        ), seller_id=1).id
+        for i in range(3)
+    ]
+    redis = celery_app.backend.client
+    redis.delete(*[PRODUCT_CACHE_KEY.format(id) for id in created])
+    queries = []
+
+    def count_product_reads(conn, cursor, statement, parameters, context, executemany):
+        if "FROM products" in statement:
+            queries.append(statement)
+
+    requested = [created[2], 99999999, created[0], created[1]]
+    app.dependency_overrides[get_db] = lambda: db
+    event.listen(db.get_bind(), "before_cursor_execute", count_product_reads)
+    try:
+        response = client.get(
+            f"{settings.API_V1_STR}/products/batch",
+            params={"ids": ",".join(map(str, requested))},
+        )
+        assert response.status_code == 200
+        assert [product["id"] for product in response.json()] == [created[2], created[0], created[1]]
+        assert len(queries) == 1
+
+        # The second request is served from the cache with the same body
+        cached = client.get(
+            f"{settings.API_V1_STR}/products/batch",
+            params={"ids": ",".join(map(str, requested))},
+        )
+        assert cached.status_code == 200
+        assert cached.json() == response.json()
+        assert len(queries) == 1
+
+        response = client.get(f"{settings.API_V1_STR}/products/batch", params={"ids": "1,abc"})
+        assert response.status_code == 400
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count_product_reads)
+        app.dependency_overrides.clear()
+        redis.delete(*[PRODUCT_CACHE_KEY.format(id) for id in requested])
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Query, Session
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.payment import Payment, PaymentStatus
+from app.models.product import LOW_STOCK_THRESHOLD, Product
+
+def explain(db: Session, query: Query) -> str:
+    """EXPLAIN QUERY PLAN for a query, as one line per plan step"""
+    compiled = query.statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    # SQLite plans at prepare time, so parameter values do not matter
+    params = (None,) * len(compiled.positiontup or ())
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return "\n".join(row[-1] for row in rows)
+
+def test_user_notifications_uses_user_updated_index(db: Session):
+    """Test that a user's orders by recency come from (user_id, updated_at DESC)."""
+    query = (
+        db.query(Order)
+        .filter(Order.user_id == 1)
+        .order_by(Order.updated_at.desc())
+        .offset(0)
+        .limit(10)
+    )
+    plan = explain(db, query)
+    assert "USING INDEX ix_orders_user_id_updated_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_dashboard_status_and_recent_counts_use_indexes(db: Session):
+    """Test that dashboard counts search the status and created_at indexes."""
+    pending = db.query(func.count(Order.id)).filter(Order.status == OrderStatus.PENDING)
+    assert "ix_orders_status_created_at" in explain(db, pending)
+
+    recent = db.query(func.count(Order.id)).filter(Order.created_at >= datetime.utcnow() - timedelta(days=30))
+    assert "ix_orders_created_at" in explain(db, recent)
+
+def test_product_sales_join_uses_product_index(db: Session):
+    """Test that analytics joins probe order_items by product_id."""
+    query = (
+        db.query(Product.id, Product.name, func.sum(OrderItem.quantity))
+        .join(OrderItem)
+        .group_by(Product.id, Product.name)
+    )
+    assert "USING INDEX ix_order_items_product_id" in explain(db, query)
+
+def test_payments_by_status_use_status_index(db: Session):
+    """Test that get_by_status searches the payments status index."""
+    query = db.query(Payment).filter(Payment.status == PaymentStatus.PENDING)
+    assert "USING INDEX ix_payments_status" in explain(db, query)
+
+def test_low_stock_count_uses_partial_index(db: Session):
+    """Test that the low-stock scan only reads the partial index."""
+    query = db.query(func.count(Product.id)).filter(
+        Product.stock < literal(LOW_STOCK_THRESHOLD, literal_execute=True)
+    )
+    assert "ix_products_low_stock" in explain(db, query)
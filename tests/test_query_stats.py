@@ -0,0 +1,26 @@
+from sqlalchemy import create_engine, text
+from app.db.query_stats import QueryStats, current_query_stats, install_query_hooks
+
+def test_query_stats_counts_statements():
+    """Test that statements are only counted while a request is active."""
+    engine = create_engine("sqlite:///:memory:")
+    install_query_hooks(engine)
+    stats = QueryStats()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))  # Outside of a request, not counted
+        token = current_query_stats.set(stats)
+        try:
+            for i in range(6):
+                conn.execute(text("SELECT :value"), {"value": i})
+            # The same lookup repeated is not an N+1
+            for _ in range(6):
+                conn.execute(text("SELECT :value + 1"), {"value": 1})
+            conn.execute(text("SELECT 2"))
+        finally:
+            current_query_stats.reset(token)
+
+    assert stats.count == 13
+    assert stats.duration > 0
+    suspects = stats.n_plus_one_suspects(threshold=5)
+    assert list(suspects.values()) == [6]
@@ -0,0 +1,63 @@
+import csv
+import os
+from sqlalchemy.orm import Session
+from app.core.reconciliation import read_settlement, reconcile_settlement
+from app.crud import crud_payment
+from app.models.payment import PaymentMethod, PaymentStatus
+from app.schemas.payment import PaymentCreate
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "settlement.csv")
+
+def _payment(db: Session, transaction_id: str, amount: float, status: PaymentStatus):
+    payment = crud_payment.create(
+        db,
+        obj_in=PaymentCreate(order_id=1, amount=amount, payment_method=PaymentMethod.CREDIT_CARD)
+    )
+    return crud_payment.update(db, db_obj=payment, obj_in={"transaction_id": transaction_id, "status": status})
+
+def test_reconcile_settlement_fixture(db: Session, tmp_path):
+    """Test that settled payments are updated in bulk and mismatches reported."""
+    settled = _payment(db, "TX-RECON-1", 25.00, PaymentStatus.PENDING)
+    declined = _payment(db, "TX-RECON-2", 40.00, PaymentStatus.PENDING)
+    mismatched = _payment(db, "TX-RECON-3", 50.00, PaymentStatus.PENDING)
+    refunded = _payment(db, "TX-RECON-4", 15.50, PaymentStatus.COMPLETED)
+    report_path = str(tmp_path / "report.csv")
+
+    # Three lines per chunk puts the repeated TX-RECON-1 in a later chunk
+    summary = reconcile_settlement(db, FIXTURE, report_path, chunk_size=3)
+
+    assert summary["lines"] == 7
+    assert summary["updated"] == 3
+    assert "matched" not in summary
+    assert summary["duplicate"] == 1
+    assert summary["amount_mismatch"] == 1
+    assert summary["unknown_transaction"] == 1
+    assert summary["malformed"] == 1
+    for payment in (settled, declined, mismatched, refunded):
+        db.refresh(payment)
+    assert settled.status == PaymentStatus.COMPLETED
+    assert declined.status == PaymentStatus.FAILED
+    assert mismatched.status == PaymentStatus.PENDING
+    assert refunded.status == PaymentStatus.REFUNDED
+
+    with open(report_path, newline="") as report:
+        rows = list(csv.DictReader(report))
+    assert {(row["transaction_id"], row["reason"]) for row in rows} == {
+        ("TX-RECON-3", "amount_mismatch"),
+        ("TX-RECON-404", "unknown_transaction"),
+        ("TX-RECON-1", "duplicate"),
+        ("", "malformed"),
+    }
+
+def test_read_settlement_ndjson(tmp_path):
+    """Test that NDJSON lines stream with their line numbers."""
+    path = tmp_path / "settlement.ndjson"
+    path.write_text(
+        '{"transaction_id": "TX-1", "amount": 10.0, "status": "settled"}\n'
+        "\n"
+        "not json\n"
+    )
+    assert list(read_settlement(str(path))) == [
+        (1, {"transaction_id": "TX-1", "amount": 10.0, "status": "settled"}),
+        (3, None),
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import time
+from app.core.celery import celery_app
+from app.core.result_cache import ResultCache
+
+redis = celery_app.backend.client
+
+def test_concurrent_misses_compute_once():
+    """Test that concurrent requests for an expired entry share one computation."""
+    cache = ResultCache(redis, stale_ttl=0)
+    params = {"run": time.time()}
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"total": 42}
+
+    async def burst():
+        return await asyncio.gather(*[
+            cache.get_or_compute("test", params, compute, ttl=60) for _ in range(50)
+        ])
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1
+    assert all(result == {"total": 42} for result in results)
+
+def test_stale_value_served_while_recomputing():
+    """Test stale-while-revalidate while another worker holds the recompute lock."""
+    cache = ResultCache(redis, stale_ttl=300)
+    params = {"run": time.time()}
+    key = cache.key("test", params)
+    redis.set(key, json.dumps({"value": "stale", "fresh_until": time.time() - 1}), ex=60)
+    redis.set(f"{key}:lock", 1, ex=60)
+
+    async def compute():
+        raise AssertionError("must not recompute while another worker holds the lock")
+
+    try:
+        assert asyncio.run(cache.get_or_compute("test", params, compute, ttl=60)) == "stale"
+    finally:
+        redis.delete(key, f"{key}:lock")
+
+def test_cached_endpoint_reuses_result(db):
+    """Test that a second request to a cached analytics endpoint is answered from Redis."""
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from app.api.deps import get_current_user
+    from app.core.config import settings
+    from app.core.result_cache import result_cache
+    from app.db.session import get_db
+    from app.main import app
+    from app.models.order import Order, OrderStatus
+    from app.models.user import User
+
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="analyst@example.com")
+    app.dependency_overrides[get_db] = lambda: db
+    key = result_cache.key("analytics:sales-trends", {"days": 30})
+    url = f"{settings.API_V1_STR}/analytics/sales-trends"
+    redis.delete(key)
+    try:
+        first = client.get(url)
+        assert first.status_code == 200
+
+        db.add(Order(
+            order_number=f"QS-TRENDS-{time.time()}", user_id=1, total_amount=10.0,
+            status=OrderStatus.PENDING, shipping_address="123 Test St", created_at=datetime.utcnow()
+        ))
+        db.commit()
+        assert client.get(url).json() == first.json()
+
+        redis.delete(key)
+        recomputed = client.get(url).json()
+        assert sum(day["order_count"] for day in recomputed) == sum(day["order_count"] for day in first.json()) + 1
+    finally:
+        redis.delete(key)
+        app.dependency_overrides.clear()
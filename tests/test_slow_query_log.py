@@ -0,0 +1,42 @@
+from sqlalchemy import create_engine, text
+from app.db.slow_query_log import SlowQueryLog, _is_read_only
+
+def test_slow_queries_are_buffered():
+    """Test that statements over the threshold land in the ring buffer."""
+    engine = create_engine("sqlite:///:memory:")
+    log = SlowQueryLog(threshold_ms=0, buffer_size=3)
+    log.install(engine)
+
+    with engine.connect() as conn:
+        for i in range(5):
+            conn.execute(text("SELECT :value"), {"value": i})
+
+    entries = log.recent()
+    assert len(entries) == 3
+    assert "4" in entries[0]["parameters"]
+    # EXPLAIN capture is PostgreSQL only
+    assert all(entry["plan"] is None for entry in entries)
+    assert entries[0]["call_site"] is None
+
+def test_fast_queries_are_not_logged():
+    """Test that statements under the threshold are ignored."""
+    engine = create_engine("sqlite:///:memory:")
+    log = SlowQueryLog(threshold_ms=10000)
+    log.install(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert log.recent() == []
+
+def test_only_read_only_queries_are_analyzed():
+    """Test that statements which write or lock rows are not run again by EXPLAIN ANALYZE."""
+    assert _is_read_only("SELECT id, updated_at FROM orders WHERE id = %(id)s")
+    assert _is_read_only("WITH recent AS (SELECT id FROM orders) SELECT count(*) FROM recent")
+    assert not _is_read_only(
+        "WITH moved AS (DELETE FROM orders WHERE id = %(id)s RETURNING *) SELECT count(*) FROM moved"
+    )
+    assert not _is_read_only("WITH src AS (SELECT 1) INSERT INTO orders_archive SELECT * FROM src")
+    assert not _is_read_only("SELECT * FROM products WHERE id = %(id)s FOR UPDATE")
+    assert not _is_read_only("SELECT * INTO orders_copy FROM orders")
+    assert not _is_read_only("UPDATE products SET stock = stock - 1")
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from app.analytics.uniques import DistinctCounters
+from app.core.celery import celery_app
+
+TODAY = date(2001, 5, 31)
+
+def test_distinct_counts_merge_days():
+    """Test that daily sketches merge into weekly and monthly distinct counts."""
+    redis = celery_app.backend.client
+    counters = DistinctCounters(redis, retention_days=1, range_ttl=1)
+    try:
+        # 10 customers per day, half of them repeat buyers
+        for offset in range(30):
+            day = TODAY - timedelta(days=offset)
+            for customer in range(10):
+                customer_id = customer if customer < 5 else 1000 + offset * 10 + customer
+                counters.record(customer_id, [customer_id % 7], day)
+
+        assert counters.count("customers", 1, TODAY) == 10
+        weekly = counters.count("customers", 7, TODAY)
+        assert abs(weekly - (5 + 7 * 5)) <= 1
+        monthly = counters.count("customers", 30, TODAY)
+        assert abs(monthly - (5 + 30 * 5)) / (5 + 30 * 5) < 0.03
+        assert counters.count("products", 30, TODAY) == 7
+    finally:
+        redis.delete(*redis.keys("uniques:*2001-0*"))
+
+def test_dashboard_serves_distinct_counts(db):
+    """Test that the dashboard endpoint reports buyers and products recorded in the sketches."""
+    import time
+    from datetime import datetime
+    from fastapi.testclient import TestClient
+    from app.analytics.uniques import RANGE_KEY, distinct_counters
+    from app.api.deps import get_current_user
+    from app.core.config import settings
+    from app.core.result_cache import result_cache
+    from app.db.session import get_db
+    from app.main import app
+    from app.models.user import User
+
+    redis = celery_app.backend.client
+    client = TestClient(app)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="analyst@example.com")
+    app.dependency_overrides[get_db] = lambda: db
+    today = datetime.utcnow().date()
+    cached = [result_cache.key("analytics:dashboard", {})] + [
+        RANGE_KEY.format(metric, (today - timedelta(days=days - 1)).isoformat(), today.isoformat())
+        for metric in ("customers", "products") for days in (7, 30)
+    ]
+
+    def dashboard():
+        redis.delete(*cached)
+        response = client.get(f"{settings.API_V1_STR}/analytics/dashboard")
+        assert response.status_code == 200
+        return response.json()
+
+    try:
+        before = dashboard()
+        run = int(time.time() * 1000)
+        for customer_id in (run, run + 1, run + 2):
+            distinct_counters.record(customer_id, [run], today)
+        after = dashboard()
+
+        for window in ("daily", "weekly", "monthly"):
+            assert after["unique_customers"][window] - before["unique_customers"][window] == 3
+            assert after["unique_products"][window] - before["unique_products"][window] == 1
+    finally:
+        redis.delete(*cached)
+        app.dependency_overrides.clear()